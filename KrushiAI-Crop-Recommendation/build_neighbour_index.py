@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Build the Nearest Historical Records Index
+Indexes Crop_recommendation.csv plus any growing-history CSV files (same
+N, P, K, temperature, humidity, ph, rainfall and label columns) into the
+persisted KD-tree read by crop_neighbours.NeighbourIndex, then times
+single-request lookups against it.
+
+Usage:
+    python build_neighbour_index.py
+    python build_neighbour_index.py --history farm_history_2023.csv farm_history_2024.csv
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from crop_neighbours import NeighbourIndex, build_neighbour_index
+from crop_utils import FEATURE_NAMES
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def benchmark(index, queries, k):
+    """Median milliseconds per single-request lookup"""
+    timings = []
+    for row in queries:
+        start = time.perf_counter()
+        index.kneighbors(row, k)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1e3
+
+def main():
+    """Build the index and report its lookup latency"""
+    parser = argparse.ArgumentParser(description="Build the nearest historical records index")
+    parser.add_argument('--data', default='Crop_recommendation.csv')
+    parser.add_argument('--history', nargs='*', default=[], help="Growing-history CSV files with a 'label' column")
+    parser.add_argument('--output', default='neighbour_index')
+    parser.add_argument('--leaf-size', type=int, default=40)
+    parser.add_argument('--k', type=int, default=5, help="Neighbours per lookup in the benchmark")
+    args = parser.parse_args()
+
+    columns = FEATURE_NAMES + ['label']
+    try:
+        sources = {'dataset': pd.read_csv(args.data, usecols=columns)}
+        if args.history:
+            sources['history'] = pd.concat([pd.read_csv(path, usecols=columns) for path in args.history],
+                                           ignore_index=True)
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not read the records: {str(e)}")
+        return False
+
+    start = time.perf_counter()
+    meta = build_neighbour_index(sources, args.output, leaf_size=args.leaf_size)
+    logger.info(f"Indexed {meta['count']} records from {', '.join(meta['sources'])} "
+                f"in {time.perf_counter() - start:.2f}s")
+
+    index = NeighbourIndex(args.output)
+    rng = np.random.default_rng(0)
+    queries = index.records[rng.integers(0, len(index), 500)] * rng.uniform(0.9, 1.1, (500, len(FEATURE_NAMES)))
+    logger.info(f"Lookup of {args.k} neighbours: {benchmark(index, queries, args.k):.3f} ms per request")
+    logger.info(f"✓ Neighbour index saved to {args.output}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,157 @@
+"""
+Confidence-Based Model Cascade
+Answers each request with the cheapest bundled model whose top probability
+clears its calibrated threshold, and escalates the remaining rows to the
+next, more expensive model. The thresholds are chosen by
+evaluate_cascade.py and stored in crop_cascade.json.
+"""
+
+import json
+import logging
+import os
+import pickle
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from crop_neighbours import NeighbourIndex, use_neighbour_index
+from crop_utils import to_frame
+
+logger = logging.getLogger(__name__)
+
+def load_pickled_model(path: str):
+    """Unpickle a bundled model (XGBoost.pkl needs the optional xgboost package)"""
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+def crop_names(models) -> List[str]:
+    """Sorted crop names known to the models (the LabelEncoder order used for XGBoost)"""
+    return sorted({str(crop) for model in models for crop in model.classes_
+                   if not isinstance(crop, (int, np.integer))})
+
+class CascadeStage:
+    """One model of the cascade with its class columns aligned to the cascade's"""
+
+    def __init__(self, name: str, model, classes: Sequence[str], min_confidence: Optional[float] = None):
+        """
+        Args:
+            name: Display name of the stage
+            model: Fitted classifier with predict_proba
+            classes: Crop names in cascade column order
+            min_confidence: Top probability needed to answer; None for the last stage
+        """
+        self.name = name
+        self.model = model
+        self.min_confidence = min_confidence
+        model_classes = np.asarray(model.classes_)
+        if np.issubdtype(model_classes.dtype, np.integer):
+            # XGBoost was fitted on LabelEncoder codes, i.e. positions in the sorted crop names
+            self._columns = model_classes
+        else:
+            position = {crop: i for i, crop in enumerate(classes)}
+            self._columns = np.array([position[str(crop)] for crop in model_classes])
+        self._n_classes = len(classes)
+
+    def predict_proba(self, rows: np.ndarray) -> np.ndarray:
+        """Probabilities in cascade column order"""
+        probabilities = np.zeros((len(rows), self._n_classes))
+        probabilities[:, self._columns] = self.model.predict_proba(to_frame(rows))
+        return probabilities
+
+class CropModelCascade:
+    """
+    Sequence of models from cheapest to most accurate
+
+    Exposes classes_ and predict_proba, so it can be used wherever a single
+    model is.
+    """
+
+    def __init__(self, stages: List[CascadeStage], classes: Sequence[str]):
+        """
+        Args:
+            stages: Stages from cheapest to most accurate; the last one answers everything left
+            classes: Crop names in the column order the stages were aligned to
+        """
+        self.stages = stages
+        self.classes_ = np.asarray(classes)
+        self.stage_counts = [0] * len(stages)
+
+    @classmethod
+    def from_config(cls, config_path: str, neighbour_index=None) -> "CropModelCascade":
+        """
+        Build the cascade described by a crop_cascade.json file
+
+        Model paths are relative to the configuration file. A
+        KNeighborsClassifier stage answers from a neighbour index only when
+        the thresholds were calibrated with one ('neighbour_index' in the
+        configuration); neighbour_index is an already loaded index to use
+        instead of opening the recorded directory.
+        """
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+        base_dir = os.path.dirname(os.path.abspath(config_path))
+        if not config.get('neighbour_index'):
+            neighbour_index = None
+        elif neighbour_index is None:
+            neighbour_index = NeighbourIndex(os.path.join(base_dir, config['neighbour_index']))
+        models = [
+            (stage, use_neighbour_index(load_pickled_model(os.path.join(base_dir, stage['path'])), neighbour_index))
+            for stage in config['stages']
+        ]
+
+        classes = crop_names([model for _, model in models])
+        stages = [
+            CascadeStage(stage['name'], model, classes, stage.get('min_confidence') if i < len(models) - 1 else None)
+            for i, (stage, model) in enumerate(models)
+        ]
+        logger.info("Crop cascade: " + " → ".join(
+            f"{stage.name}" + (f" (≥{stage.min_confidence:.2f})" if stage.min_confidence is not None else "")
+            for stage in stages
+        ))
+        return cls(stages, classes)
+
+    def predict_with_stage(self, rows) -> Dict[str, np.ndarray]:
+        """
+        Probabilities and the index of the stage that answered every row
+
+        Args:
+            rows: Array or DataFrame of inputs in FEATURE_NAMES order
+
+        Returns:
+            Dictionary with 'probabilities' (rows, classes) and 'stage' (rows,)
+        """
+        rows = np.atleast_2d(np.asarray(rows, dtype=float))
+        probabilities = np.zeros((len(rows), len(self.classes_)))
+        answered_by = np.full(len(rows), -1)
+        pending = np.arange(len(rows))
+
+        for index, stage in enumerate(self.stages):
+            if len(pending) == 0:
+                break
+            stage_probabilities = stage.predict_proba(rows[pending])
+            if stage.min_confidence is None:
+                accepted = np.ones(len(pending), dtype=bool)
+            else:
+                accepted = stage_probabilities.max(axis=1) >= stage.min_confidence
+            probabilities[pending[accepted]] = stage_probabilities[accepted]
+            answered_by[pending[accepted]] = index
+            self.stage_counts[index] += int(accepted.sum())
+            pending = pending[~accepted]
+
+        return {'probabilities': probabilities, 'stage': answered_by}
+
+    def predict_proba(self, rows) -> np.ndarray:
+        """Crop probabilities for input rows"""
+        return self.predict_with_stage(rows)['probabilities']
+
+    def predict(self, rows) -> np.ndarray:
+        """Most likely crop for input rows"""
+        return self.classes_[self.predict_proba(rows).argmax(axis=1)]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Rows answered by every stage so far"""
+        total = sum(self.stage_counts)
+        return [
+            {'stage': stage.name, 'answered': count, 'share': count / total if total else 0.0}
+            for stage, count in zip(self.stages, self.stage_counts)
+        ]
@@ -0,0 +1,170 @@
+"""
+Nearest Historical Records Index
+Finds the rows of Crop_recommendation.csv (and any growing history added
+to the index) whose conditions are closest to a request. A KD-tree is
+built once over standardized features, so a lookup visits a few leaves
+instead of scanning every row, and stays well under a millisecond with
+millions of records. The same index backs the k-nearest-neighbours model.
+
+Index layout (one directory):
+    meta.json    - feature names, standardization, label and source names
+    tree.pkl     - sklearn KDTree over the standardized features
+    records.npy  - original feature values as float64 (memory-mapped)
+    labels.npy   - label code of every record
+    sources.npy  - source code of every record
+"""
+
+import json
+import logging
+import os
+import pickle
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree, KNeighborsClassifier
+
+from crop_utils import FEATURE_NAMES
+
+logger = logging.getLogger(__name__)
+
+def build_neighbour_index(sources: Dict[str, pd.DataFrame], index_dir: str, leaf_size: int = 40) -> Dict[str, Any]:
+    """
+    Standardize the records, build the KD-tree and write an index directory
+
+    Args:
+        sources: Mapping of source name (e.g. 'dataset', 'history') to a
+            DataFrame with FEATURE_NAMES columns and a 'label' column
+        index_dir: Output directory
+        leaf_size: KD-tree leaf size
+
+    Returns:
+        The index metadata
+    """
+    frames = [frame.dropna(subset=FEATURE_NAMES + ['label']) for frame in sources.values()]
+    records = np.concatenate([frame[FEATURE_NAMES].to_numpy(dtype=np.float64) for frame in frames])
+    label_values = np.concatenate([frame['label'].astype(str).to_numpy() for frame in frames])
+    source_codes = np.concatenate([np.full(len(frame), code, dtype=np.int16) for code, frame in enumerate(frames)])
+
+    label_names, label_codes = np.unique(label_values, return_inverse=True)
+    mean = records.mean(axis=0, dtype=np.float64)
+    scale = np.maximum(records.std(axis=0, dtype=np.float64), 1e-8)
+    tree = KDTree((records - mean) / scale, leaf_size=leaf_size)
+
+    os.makedirs(index_dir, exist_ok=True)
+    with open(os.path.join(index_dir, 'tree.pkl'), 'wb') as f:
+        pickle.dump(tree, f, protocol=pickle.HIGHEST_PROTOCOL)
+    np.save(os.path.join(index_dir, 'records.npy'), records)
+    np.save(os.path.join(index_dir, 'labels.npy'), label_codes.astype(np.int16))
+    np.save(os.path.join(index_dir, 'sources.npy'), source_codes)
+
+    meta = {
+        'features': FEATURE_NAMES,
+        'count': int(len(records)),
+        'mean': mean.tolist(),
+        'scale': scale.tolist(),
+        'labels': label_names.tolist(),
+        'sources': list(sources),
+        'source_counts': {name: int(len(frame)) for name, frame in zip(sources, frames)},
+        'leaf_size': leaf_size
+    }
+    with open(os.path.join(index_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    logger.info(f"Neighbour index with {len(records)} records written to {index_dir}")
+    return meta
+
+class NeighbourIndex:
+    """Persisted KD-tree over standardized crop records"""
+
+    def __init__(self, index_dir: str):
+        with open(os.path.join(index_dir, 'meta.json'), 'r') as f:
+            self.meta = json.load(f)
+        with open(os.path.join(index_dir, 'tree.pkl'), 'rb') as f:
+            self.tree = pickle.load(f)
+        self.records = np.load(os.path.join(index_dir, 'records.npy'), mmap_mode='r')
+        self.labels = np.load(os.path.join(index_dir, 'labels.npy'))
+        self.sources = np.load(os.path.join(index_dir, 'sources.npy'))
+        self.label_names = np.array(self.meta['labels'])
+        self.source_names = self.meta['sources']
+        self.mean = np.array(self.meta['mean'])
+        self.scale = np.array(self.meta['scale'])
+
+    def __len__(self):
+        return self.meta['count']
+
+    def kneighbors(self, rows, k: int = 5):
+        """
+        Distances and record positions of the k nearest records for every row
+
+        Args:
+            rows: Array or DataFrame of inputs in FEATURE_NAMES order
+            k: Number of neighbours
+
+        Returns:
+            (distances, positions), both of shape (rows, k), nearest first;
+            distances are in standardized units
+        """
+        rows = np.atleast_2d(np.asarray(rows, dtype=float))
+        return self.tree.query((rows - self.mean) / self.scale, k=min(k, len(self)))
+
+    def nearest_records(self, inputs, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        The k most similar historical records to one set of conditions
+
+        Args:
+            inputs: Values in FEATURE_NAMES order
+            k: Number of records
+
+        Returns:
+            Records with their feature values, 'label', 'source' and 'distance'
+        """
+        distances, positions = self.kneighbors(inputs, k)
+        records = []
+        for distance, position in zip(distances[0], positions[0]):
+            record = dict(zip(FEATURE_NAMES, self.records[position].tolist()))
+            record['label'] = str(self.label_names[self.labels[position]])
+            record['source'] = self.source_names[self.sources[position]]
+            record['distance'] = float(distance)
+            records.append(record)
+        return records
+
+class IndexedKNNClassifier:
+    """
+    k-nearest-neighbours classifier answering from a NeighbourIndex
+
+    Uses the n_neighbors and weights of the bundled KNeighborsClassifier,
+    but votes among the indexed records in standardized feature space
+    instead of the raw training split the pickled model holds.
+    """
+
+    def __init__(self, index: NeighbourIndex, n_neighbors: int = 5, weights: str = 'uniform'):
+        self.index = index
+        self.n_neighbors = n_neighbors
+        self.weights = weights
+        self.classes_ = index.label_names
+
+    @classmethod
+    def from_model(cls, model: KNeighborsClassifier, index: NeighbourIndex) -> "IndexedKNNClassifier":
+        """Take the neighbour count and weighting of a fitted KNeighborsClassifier"""
+        return cls(index, n_neighbors=model.n_neighbors, weights=model.weights)
+
+    def predict_proba(self, rows) -> np.ndarray:
+        """Share of (optionally distance-weighted) neighbour votes per crop"""
+        distances, positions = self.index.kneighbors(rows, self.n_neighbors)
+        if self.weights == 'distance':
+            votes = 1.0 / np.maximum(distances, 1e-12)
+        else:
+            votes = np.ones_like(distances)
+        probabilities = np.zeros((len(positions), len(self.classes_)))
+        np.add.at(probabilities, (np.arange(len(positions))[:, np.newaxis], self.index.labels[positions]), votes)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def predict(self, rows) -> np.ndarray:
+        """Most likely crop for input rows"""
+        return self.classes_[self.predict_proba(rows).argmax(axis=1)]
+
+def use_neighbour_index(model, index: Optional[NeighbourIndex]):
+    """Route a KNeighborsClassifier through the shared index; other models are returned unchanged"""
+    if index is not None and isinstance(model, KNeighborsClassifier):
+        return IndexedKNNClassifier.from_model(model, index)
+    return model
@@ -0,0 +1,317 @@
+"""
+Crop Recommendation Utilities
+Helpers shared by the web app for ranking crops with the trained model and
+for exploring how the recommendation reacts to changes in each input.
+"""
+
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Model inputs in training order (column names of Crop_recommendation.csv)
+FEATURE_NAMES = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
+FEATURE_LABELS = {
+    'N': 'Nitrogen (kg/ha)',
+    'P': 'Phosphorus (kg/ha)',
+    'K': 'Potassium (kg/ha)',
+    'temperature': 'Temperature (°C)',
+    'humidity': 'Humidity (%)',
+    'ph': 'pH Level',
+    'rainfall': 'Rainfall (mm)'
+}
+# Valid range of every input, as accepted by the web app's input fields
+FEATURE_RANGES = {
+    'N': (0.0, 140.0),
+    'P': (0.0, 145.0),
+    'K': (0.0, 205.0),
+    'temperature': (0.0, 51.0),
+    'humidity': (0.0, 100.0),
+    'ph': (0.0, 14.0),
+    'rainfall': (0.0, 500.0)
+}
+# Input resolution of every feature (the step of its input field); predictions are memoized per grid cell
+FEATURE_STEPS = {
+    'N': 1.0,
+    'P': 1.0,
+    'K': 1.0,
+    'temperature': 0.1,
+    'humidity': 0.1,
+    'ph': 0.1,
+    'rainfall': 0.1
+}
+_STEPS = np.array([FEATURE_STEPS[name] for name in FEATURE_NAMES])
+
+def to_frame(rows: np.ndarray) -> pd.DataFrame:
+    """Wrap input rows in a DataFrame with the feature names the model was fitted with"""
+    return pd.DataFrame(np.atleast_2d(rows), columns=FEATURE_NAMES)
+
+def top_k_crops(model, inputs: Sequence[float], k: int = 3) -> List[Tuple[str, float]]:
+    """
+    Most suitable crops for one set of conditions
+
+    Args:
+        model: Fitted classifier with predict_proba, or a MemoizedCropModel
+        inputs: Values in FEATURE_NAMES order
+        k: Number of crops to return
+
+    Returns:
+        (crop, probability) pairs, best first
+    """
+    rows = np.asarray(inputs, dtype=float).reshape(1, -1)
+    # The memo takes plain arrays, which skips building a DataFrame on cache hits
+    probabilities = model.predict_proba(rows if isinstance(model, MemoizedCropModel) else to_frame(rows))[0]
+    order = np.argsort(probabilities)[::-1][:k]
+    return [(model.classes_[i], float(probabilities[i])) for i in order]
+
+def sensitivity_grid(inputs: Sequence[float], steps: int = 25) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Copies of the inputs with one feature at a time swept over its range
+
+    Args:
+        inputs: Values in FEATURE_NAMES order
+        steps: Grid points per feature
+
+    Returns:
+        (rows, values): rows has shape (features * steps, features), where
+        block i varies feature i; values has shape (features, steps)
+    """
+    base = np.asarray(inputs, dtype=float)
+    values = np.array([np.linspace(*FEATURE_RANGES[name], steps) for name in FEATURE_NAMES])
+    rows = np.tile(base, (len(FEATURE_NAMES), steps, 1))
+    feature_index = np.arange(len(FEATURE_NAMES))
+    rows[feature_index, :, feature_index] = values
+    return rows.reshape(-1, len(FEATURE_NAMES)), values
+
+def sensitivity_analysis(model, inputs: Sequence[float], steps: int = 25) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Crop probabilities as each input is varied over its range
+
+    All perturbed inputs are scored in a single predict_proba call, which is
+    orders of magnitude faster than one call per grid point for tree
+    ensembles.
+
+    Args:
+        model: Fitted classifier with predict_proba
+        inputs: Values in FEATURE_NAMES order
+        steps: Grid points per feature
+
+    Returns:
+        Mapping of feature name to {'values': (steps,), 'probabilities':
+        (steps, classes)} arrays
+    """
+    rows, values = sensitivity_grid(inputs, steps)
+    probabilities = model.predict_proba(to_frame(rows)).reshape(len(FEATURE_NAMES), steps, -1)
+    return {
+        name: {'values': values[i], 'probabilities': probabilities[i]}
+        for i, name in enumerate(FEATURE_NAMES)
+    }
+
+def recommendation_ranges(values: np.ndarray, probabilities: np.ndarray, classes: Sequence[str]) -> List[Tuple[float, float, str]]:
+    """
+    Split a swept feature into stretches with the same recommended crop
+
+    Args:
+        values: Grid values of the feature
+        probabilities: Crop probabilities at each grid value
+        classes: Crop names in the model's class order
+
+    Returns:
+        (start value, end value, crop) for every stretch
+    """
+    best = probabilities.argmax(axis=1)
+    # Grid positions where the recommended crop changes
+    boundaries = np.flatnonzero(np.diff(best)) + 1
+    starts = np.concatenate([[0], boundaries])
+    ends = np.concatenate([boundaries - 1, [len(best) - 1]])
+    return [(float(values[start]), float(values[end]), classes[best[start]]) for start, end in zip(starts, ends)]
+
+# Inputs that are forecasts for the coming season rather than measurements
+CLIMATE_FEATURES = ['temperature', 'humidity', 'rainfall']
+
+def sample_climate_ranges(ranges: Dict[str, Tuple[float, float, float]], n: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Draw climate scenarios from expected ranges
+
+    Args:
+        ranges: Mapping of feature name to (low, most likely, high); values
+            follow a triangular distribution over the range
+        n: Number of scenarios
+        seed: Random seed, so repeated runs give the same answer
+
+    Returns:
+        Mapping of feature name to n sampled values
+    """
+    rng = np.random.default_rng(seed)
+    samples = {}
+    for name, (low, likely, high) in ranges.items():
+        low, high = min(low, high), max(low, high)
+        if high - low < 1e-9:
+            samples[name] = np.full(n, float(low))
+        else:
+            samples[name] = rng.triangular(low, min(max(likely, low), high), high, n)
+    return samples
+
+def sample_climate_history(history: pd.DataFrame, n: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Draw climate scenarios by resampling past seasons
+
+    Args:
+        history: One row per past season with CLIMATE_FEATURES columns
+        n: Number of scenarios
+        seed: Random seed
+
+    Returns:
+        Mapping of feature name to n sampled values; whole seasons are drawn
+        together, so correlations between the features are kept
+    """
+    seasons = history[CLIMATE_FEATURES].dropna().to_numpy(dtype=float)
+    if len(seasons) == 0:
+        raise ValueError("No complete seasons with " + ", ".join(CLIMATE_FEATURES))
+    picks = np.random.default_rng(seed).integers(0, len(seasons), n)
+    return {name: seasons[picks, i] for i, name in enumerate(CLIMATE_FEATURES)}
+
+def scenario_analysis(model, inputs: Sequence[float], samples: Dict[str, np.ndarray],
+                      quantile: float = 0.1) -> Dict[str, Any]:
+    """
+    Crop recommendations across sampled scenarios
+
+    The scenarios replace the sampled features of the inputs and are scored
+    in a single predict_proba call.
+
+    Args:
+        model: Fitted classifier with predict_proba
+        inputs: Values in FEATURE_NAMES order (the point estimates)
+        samples: Mapping of feature name to sampled values, all of one length
+        quantile: Lower quantile of a crop's probability used for the robust choice
+
+    Returns:
+        Dictionary with a per-crop DataFrame ('crops': share of scenarios in
+        which the crop is recommended, mean and lower-quantile probability,
+        best first), the 'robust_choice' (highest lower-quantile probability)
+        and the number of 'scenarios'
+    """
+    n = len(next(iter(samples.values())))
+    rows = np.tile(np.asarray(inputs, dtype=float), (n, 1))
+    for name, values in samples.items():
+        rows[:, FEATURE_NAMES.index(name)] = values
+
+    probabilities = model.predict_proba(to_frame(rows))
+    recommended = np.bincount(probabilities.argmax(axis=1), minlength=probabilities.shape[1]) / n
+    crops = pd.DataFrame({
+        'crop': model.classes_,
+        'recommended_share': recommended,
+        'mean_probability': probabilities.mean(axis=0),
+        'low_probability': np.quantile(probabilities, quantile, axis=0)
+    }).sort_values(['recommended_share', 'mean_probability'], ascending=False).reset_index(drop=True)
+    crops = crops[(crops['recommended_share'] > 0) | (crops['mean_probability'] >= 0.01)]
+
+    robust = crops.loc[crops['low_probability'].idxmax(), 'crop']
+    return {'crops': crops, 'robust_choice': robust, 'scenarios': n}
+
+def quantize(rows: np.ndarray) -> np.ndarray:
+    """Integer grid cell of every input row, at the resolution of FEATURE_STEPS"""
+    return np.rint(np.atleast_2d(np.asarray(rows, dtype=float)) / _STEPS).astype(np.int64)
+
+class MemoizedCropModel:
+    """
+    Bounded LRU memo of crop probabilities in front of a fitted classifier
+
+    Inputs are snapped to the resolution of the app's input fields, so the
+    same conditions always hit the same entry and repeated requests are
+    answered from a dictionary instead of walking every tree of the forest.
+    Exposes classes_ and predict_proba, so it can be used wherever the model
+    is.
+    """
+
+    def __init__(self, model, capacity: int = 10000):
+        self.model = model
+        self.classes_ = model.classes_
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[int, ...], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _score(self, cells: List[Tuple[int, ...]]) -> np.ndarray:
+        """Run the model once for a list of grid cells"""
+        return self.model.predict_proba(to_frame(np.array(cells, dtype=float) * _STEPS))
+
+    def _store(self, cells: List[Tuple[int, ...]], probabilities: np.ndarray):
+        """Add results, evicting the least recently used entries when full (caller holds the lock)"""
+        for cell, row in zip(cells, probabilities):
+            row.flags.writeable = False
+            self._entries[cell] = row
+            self._entries.move_to_end(cell)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def predict_proba(self, rows) -> np.ndarray:
+        """
+        Crop probabilities for input rows, scoring only rows not seen before
+
+        Args:
+            rows: Array or DataFrame of inputs in FEATURE_NAMES order
+
+        Returns:
+            Array of shape (rows, classes)
+        """
+        cells = [tuple(cell) for cell in quantize(rows).tolist()]
+        results: List[Any] = [None] * len(cells)
+        with self._lock:
+            for i, cell in enumerate(cells):
+                row = self._entries.get(cell)
+                if row is not None:
+                    self._entries.move_to_end(cell)
+                    results[i] = row
+            self.hits += sum(row is not None for row in results)
+        missing = [i for i, row in enumerate(results) if row is None]
+
+        if missing:
+            # Misses are scored together in one call, outside the lock
+            missing_cells = list(dict.fromkeys(cells[i] for i in missing))
+            probabilities = self._score(missing_cells)
+            scored = dict(zip(missing_cells, probabilities))
+            for i in missing:
+                results[i] = scored[cells[i]]
+            with self._lock:
+                self.misses += len(missing)
+                self._store(missing_cells, probabilities)
+        return np.vstack(results)
+
+    def predict(self, rows) -> np.ndarray:
+        """Most likely crop for input rows"""
+        return self.classes_[self.predict_proba(rows).argmax(axis=1)]
+
+    def warm(self, rows, limit: int = 1000) -> int:
+        """
+        Pre-compute the most frequent inputs, e.g. from a request log
+
+        Args:
+            rows: Array or DataFrame of past inputs in FEATURE_NAMES order
+            limit: Number of distinct grid cells to pre-compute
+
+        Returns:
+            Number of cells added
+        """
+        counts = Counter(tuple(cell) for cell in quantize(rows).tolist())
+        with self._lock:
+            cells = [cell for cell, _ in counts.most_common(min(limit, self.capacity)) if cell not in self._entries]
+        if not cells:
+            return 0
+        probabilities = self._score(cells)
+        with self._lock:
+            self._store(cells, probabilities)
+        return len(cells)
+
+    def stats(self) -> Dict[str, Any]:
+        """Memo size and hit statistics"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Calibrate and Evaluate the Crop Model Cascade
+Scores Crop_recommendation.csv with every model of the cascade, picks for
+each cheap stage the lowest confidence threshold that keeps the cascade's
+accuracy within a tolerance of the final model, and reports accuracy,
+agreement with the final model and latency per stage. Stages that are not
+faster per request than the final model are left out. The thresholds are
+written to crop_cascade.json, which webapp.py loads when it exists.
+
+The bundled models were trained on a split of this same dataset, so the
+accuracy figures are optimistic; the agreement and latency figures are what
+the cascade changes.
+
+Usage:
+    python evaluate_cascade.py
+    python evaluate_cascade.py --stages NBClassifier.pkl DecisionTree.pkl RF.pkl --tolerance 0.005
+    python evaluate_cascade.py --stages NBClassifier.pkl XGBoost.pkl    # needs xgboost
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from crop_cascade import CascadeStage, CropModelCascade, crop_names, load_pickled_model
+from crop_neighbours import NeighbourIndex, use_neighbour_index
+from crop_utils import FEATURE_NAMES
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def single_row_latency(stage, rows, repeats):
+    """Median seconds for one-row predictions, as served to a single user"""
+    timings = []
+    for row in rows[:repeats]:
+        start = time.perf_counter()
+        stage.predict_proba(row[np.newaxis])
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+def choose_threshold(confidence, stage_correct, downstream_correct, min_accuracy):
+    """
+    Lowest confidence threshold that keeps accuracy at or above min_accuracy
+
+    The stage must also be at least as accurate as the cascade behind it on
+    the rows it accepts, so the tolerance is never spent on rows the stage
+    gets wrong and the later models would get right.
+
+    Returns:
+        (threshold, share of rows answered by the stage), or (None, 0.0) if
+        the stage cannot answer anything without losing accuracy
+    """
+    best = (None, 0.0)
+    for threshold in np.unique(np.quantile(confidence, np.linspace(0, 1, 201))):
+        answered = confidence >= threshold
+        if not answered.any() or np.mean(stage_correct[answered]) < np.mean(downstream_correct[answered]):
+            continue
+        accuracy = float(np.mean(np.where(answered, stage_correct, downstream_correct)))
+        share = float(np.mean(answered))
+        if accuracy >= min_accuracy and share > best[1]:
+            best = (float(threshold), share)
+    return best
+
+def main():
+    """Calibrate the cascade thresholds and report per-stage agreement and latency"""
+    parser = argparse.ArgumentParser(description="Calibrate and evaluate the crop model cascade")
+    parser.add_argument('--data', default='Crop_recommendation.csv')
+    parser.add_argument('--stages', nargs='+', default=['NBClassifier.pkl', 'RF.pkl'],
+                        help="Model files from cheapest to most accurate; the last one answers the rest")
+    parser.add_argument('--tolerance', type=float, default=0.002, help="Allowed accuracy drop vs the final model")
+    parser.add_argument('--repeats', type=int, default=200, help="Single-row predictions timed per model")
+    parser.add_argument('--neighbour-index', help="Answer KNeighborsClassifier stages from this index directory")
+    parser.add_argument('--output', default='crop_cascade.json')
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data)
+    rows = df[FEATURE_NAMES].to_numpy(dtype=float)
+    labels = df['label'].to_numpy()
+
+    neighbour_index = NeighbourIndex(args.neighbour_index) if args.neighbour_index else None
+    models = []
+    for path in args.stages:
+        try:
+            models.append((path, use_neighbour_index(load_pickled_model(path), neighbour_index)))
+        except (OSError, ImportError) as e:
+            # XGBoost.pkl cannot be unpickled without the xgboost package
+            logger.warning(f"Skipping {path}: {str(e)}")
+    if len(models) < 2:
+        logger.error("A cascade needs at least two loadable models")
+        return False
+
+    classes = crop_names([model for _, model in models])
+    stages = [CascadeStage(os.path.splitext(os.path.basename(path))[0], model, classes) for path, model in models]
+
+    # Score everything once per model
+    probabilities, batch_seconds, single_seconds = [], [], []
+    for stage in stages:
+        start = time.perf_counter()
+        probabilities.append(stage.predict_proba(rows))
+        batch_seconds.append(time.perf_counter() - start)
+        single_seconds.append(single_row_latency(stage, rows, args.repeats))
+    label_idx = np.searchsorted(classes, labels)
+    correct = [p.argmax(axis=1) == label_idx for p in probabilities]
+    final_accuracy = float(np.mean(correct[-1]))
+    min_accuracy = final_accuracy - args.tolerance
+
+    # Calibrate from the last cheap stage backwards, each against the cascade behind it
+    downstream_correct = correct[-1]
+    thresholds = [None] * len(stages)
+    for index in range(len(stages) - 2, -1, -1):
+        if single_seconds[index] >= single_seconds[-1]:
+            logger.warning(f"{stages[index].name} is not faster than {stages[-1].name} per request and is left out")
+            continue
+        confidence = probabilities[index].max(axis=1)
+        threshold, _ = choose_threshold(confidence, correct[index], downstream_correct, min_accuracy)
+        thresholds[index] = threshold
+        if threshold is not None:
+            downstream_correct = np.where(confidence >= threshold, correct[index], downstream_correct)
+
+    kept = [i for i in range(len(stages)) if i == len(stages) - 1 or thresholds[i] is not None]
+    for i in set(range(len(stages))) - set(kept):
+        if single_seconds[i] < single_seconds[-1]:
+            logger.warning(f"{stages[i].name} cannot answer within the tolerance and is left out")
+    for i in kept:
+        stages[i].min_confidence = thresholds[i]
+    cascade = CropModelCascade([stages[i] for i in kept], classes)
+
+    start = time.perf_counter()
+    result = cascade.predict_with_stage(rows)
+    cascade_seconds = time.perf_counter() - start
+    cascade_pred = result['probabilities'].argmax(axis=1)
+    final_pred = probabilities[-1].argmax(axis=1)
+
+    report = []
+    for position, i in enumerate(kept):
+        answered = result['stage'] == position
+        stage_report = {
+            'name': stages[i].name,
+            'path': os.path.relpath(os.path.abspath(models[i][0]), os.path.dirname(os.path.abspath(args.output))),
+            'min_confidence': thresholds[i],
+            'answered_share': round(float(np.mean(answered)), 4),
+            'accuracy_on_answered': round(float(np.mean(cascade_pred[answered] == label_idx[answered])), 4) if answered.any() else None,
+            'agreement_with_final': round(float(np.mean(cascade_pred[answered] == final_pred[answered])), 4) if answered.any() else None,
+            'model_accuracy': round(float(np.mean(correct[i])), 4),
+            'batch_us_per_row': round(batch_seconds[i] / len(rows) * 1e6, 2),
+            'single_row_ms': round(single_seconds[i] * 1e3, 3)
+        }
+        report.append(stage_report)
+        logger.info(f"{stage_report['name']:>22}: threshold {thresholds[i] if thresholds[i] is not None else '-'}, "
+                    f"answers {stage_report['answered_share']:.1%}, "
+                    f"agreement with final {stage_report['agreement_with_final']}, "
+                    f"{stage_report['single_row_ms']:.2f} ms/request, {stage_report['batch_us_per_row']:.1f} µs/row batched")
+
+    cascade_accuracy = float(np.mean(cascade_pred == label_idx))
+    agreement = float(np.mean(cascade_pred == final_pred))
+    logger.info(f"Cascade accuracy {cascade_accuracy:.2%} vs final model {final_accuracy:.2%}, "
+                f"agreement {agreement:.2%}")
+    logger.info(f"Batch time {cascade_seconds * 1e3:.1f} ms for the cascade vs "
+                f"{batch_seconds[-1] * 1e3:.1f} ms for {stages[-1].name} alone")
+
+    output_dir = os.path.dirname(os.path.abspath(args.output))
+    config = {
+        'stages': [{'name': item['name'], 'path': item['path'], 'min_confidence': item['min_confidence']}
+                   for item in report],
+        # The KNN threshold only holds when serving answers from the same index
+        'neighbour_index': os.path.relpath(os.path.abspath(args.neighbour_index), output_dir) if args.neighbour_index else None,
+        'expected_accuracy': round(cascade_accuracy, 4),
+        'final_model_accuracy': round(final_accuracy, 4),
+        'agreement_with_final': round(agreement, 4),
+        'report': report
+    }
+    with open(args.output, 'w') as f:
+        json.dump(config, f, indent=2)
+    logger.info(f"✓ Cascade configuration saved to {args.output}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Score Soil Survey Files Out of Core
+Streams a soil health card export (CSV or Parquet) in fixed-size chunks,
+validates the crop and fertilizer features of every row, scores each chunk
+with one vectorized call per model (RF.pkl for crops, Fertilizer_RF.pkl for
+fertilizers) and appends the results to the output file as it goes, so
+memory use stays constant however large the file is. Chunks can be scored
+in several worker processes; results are still written in input order.
+
+Crop scoring needs the columns N, P, K, temperature, humidity, ph and
+rainfall; fertilizer scoring needs Temperature, Humidity, Moisture,
+Soil Type, Crop Type, Nitrogen, Potassium and Phosphorous (the columns of
+Fertilizer_recommendation.csv). A model whose columns are missing is
+skipped. Rows that fail validation keep empty results and list the reasons
+in validation_errors.
+
+Parquet input/output and faster CSV parsing need the optional pyarrow
+package.
+
+Usage:
+    python score_soil_survey.py soil_cards.csv scored.csv
+    python score_soil_survey.py soil_cards.parquet scored.parquet --workers 4 --chunk-rows 200000
+"""
+
+import argparse
+import logging
+import os
+import pickle
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from crop_utils import FEATURE_NAMES, FEATURE_RANGES
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FERTILIZER_FEATURES = ['Temperature', 'Humidity', 'Moisture', 'Soil Type', 'Crop Type',
+                       'Nitrogen', 'Potassium', 'Phosphorous']
+# Valid ranges, as enforced by the fertilizer app's validate_inputs
+FERTILIZER_RANGES = {
+    'Temperature': (0, 60),
+    'Humidity': (0, 100),
+    'Moisture': (0, 100),
+    'Nitrogen': (0, 300),
+    'Potassium': (0, 300),
+    'Phosphorous': (0, 300)
+}
+RESULT_COLUMNS = ['crop_recommendation', 'crop_confidence', 'fertilizer_recommendation',
+                  'fertilizer_confidence', 'validation_errors']
+
+def normalize_columns(frame):
+    """Strip header whitespace and fix the 'Temparature' typo of the fertilizer dataset"""
+    frame.columns = frame.columns.str.strip()
+    return frame.rename(columns={'Temparature': 'Temperature'})
+
+class SurveyScorer:
+    """Validates and scores survey chunks with the crop and fertilizer models"""
+
+    def __init__(self, crop_model_path, fertilizer_dir):
+        with open(crop_model_path, 'rb') as f:
+            self.crop_model = pickle.load(f)
+
+        def load(name):
+            with open(os.path.join(fertilizer_dir, name), 'rb') as f:
+                return pickle.load(f)
+        self.fertilizer_model = load('Fertilizer_RF.pkl')
+        self.soil_encoder = load('soil_encoder.pkl')
+        self.crop_encoder = load('crop_encoder.pkl')
+        self.fertilizer_encoder = load('fertilizer_encoder.pkl')
+        try:
+            self.scaler = load('feature_scaler.pkl')
+        except OSError:
+            self.scaler = None
+
+    @staticmethod
+    def _numeric(frame, columns, ranges, errors, prefix):
+        """Coerce columns to numbers and flag missing or out-of-range values"""
+        values = frame[columns].apply(pd.to_numeric, errors='coerce')
+        valid = np.ones(len(frame), dtype=bool)
+        for column in columns:
+            low, high = ranges[column]
+            bad = values[column].isna().to_numpy() | ~values[column].between(low, high).to_numpy()
+            for i in np.flatnonzero(bad):
+                errors[i].append(f"{prefix}: {column} missing or outside {low}-{high}")
+            valid &= ~bad
+        return values, valid
+
+    def _score_crops(self, frame, result, errors):
+        """Recommend a crop for every valid row in one predict_proba call"""
+        values, valid = self._numeric(frame, FEATURE_NAMES, FEATURE_RANGES, errors, 'crop')
+        if valid.any():
+            probabilities = self.crop_model.predict_proba(values[valid])
+            best = probabilities.argmax(axis=1)
+            result.loc[valid, 'crop_recommendation'] = self.crop_model.classes_[best]
+            result.loc[valid, 'crop_confidence'] = probabilities[np.arange(len(best)), best].round(4)
+
+    def _score_fertilizers(self, frame, result, errors):
+        """Recommend a fertilizer for every valid row in one predict_proba call"""
+        numeric_columns = list(FERTILIZER_RANGES)
+        values, valid = self._numeric(frame, numeric_columns, FERTILIZER_RANGES, errors, 'fertilizer')
+
+        features = values.reindex(columns=FERTILIZER_FEATURES)
+        for column, encoder in (('Soil Type', self.soil_encoder), ('Crop Type', self.crop_encoder)):
+            names = frame[column].astype(str).str.strip()
+            known = names.isin(encoder.classes_).to_numpy()
+            for i in np.flatnonzero(~known):
+                errors[i].append(f"fertilizer: unknown {column} '{names.iloc[i]}'")
+            features.loc[known, column] = encoder.transform(names[known])
+            valid &= known
+
+        if valid.any():
+            features = features[valid].astype(float)
+            if self.scaler is not None:
+                features = self.scaler.transform(features)
+            probabilities = self.fertilizer_model.predict_proba(np.asarray(features))
+            best = probabilities.argmax(axis=1)
+            labels = self.fertilizer_encoder.inverse_transform(self.fertilizer_model.classes_[best])
+            result.loc[valid, 'fertilizer_recommendation'] = labels
+            result.loc[valid, 'fertilizer_confidence'] = probabilities[np.arange(len(best)), best].round(4)
+
+    def score(self, frame):
+        """
+        Score one chunk
+
+        Args:
+            frame: Survey rows with normalized column names
+
+        Returns:
+            The chunk with the RESULT_COLUMNS appended
+        """
+        result = pd.DataFrame(index=frame.index, columns=RESULT_COLUMNS, dtype=object)
+        result['crop_confidence'] = np.nan
+        result['fertilizer_confidence'] = np.nan
+        errors = [[] for _ in range(len(frame))]
+
+        if set(FEATURE_NAMES) <= set(frame.columns):
+            self._score_crops(frame, result, errors)
+        if set(FERTILIZER_FEATURES) <= set(frame.columns):
+            self._score_fertilizers(frame, result, errors)
+
+        result['validation_errors'] = ['; '.join(row_errors) for row_errors in errors]
+        # Fixed dtypes give every chunk the same Parquet schema, even when a column is all empty
+        result = result.astype({'crop_recommendation': 'string', 'fertilizer_recommendation': 'string',
+                                'validation_errors': 'string', 'crop_confidence': float,
+                                'fertilizer_confidence': float})
+        return pd.concat([frame, result], axis=1)
+
+# Each worker process loads the models once
+_scorer = None
+
+def _init_worker(crop_model_path, fertilizer_dir):
+    global _scorer
+    _scorer = SurveyScorer(crop_model_path, fertilizer_dir)
+
+def _score_in_worker(frame):
+    return _scorer.score(frame)
+
+def read_chunks(path, chunk_rows):
+    """Yield the input file as DataFrames of at most chunk_rows rows"""
+    if path.lower().endswith('.parquet'):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("Reading Parquet needs the pyarrow package")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield normalize_columns(batch.to_pandas())
+    elif PYARROW_AVAILABLE:
+        # Multi-threaded streaming CSV parser; block size roughly matches chunk_rows
+        options = pa_csv.ReadOptions(block_size=max(1 << 20, chunk_rows * 64))
+        # Types are otherwise inferred from the first block, and a later non-numeric
+        # value would abort the read; validated columns are read as text and
+        # coerced row by row in SurveyScorer instead
+        header = pd.read_csv(path, nrows=0).columns
+        validated = set(FEATURE_NAMES) | set(FERTILIZER_FEATURES)
+        convert = pa_csv.ConvertOptions(column_types={
+            column: pa.string() for column in header
+            if normalize_columns(pd.DataFrame(columns=[column])).columns[0] in validated
+        })
+        for batch in pa_csv.open_csv(path, read_options=options, convert_options=convert):
+            yield normalize_columns(batch.to_pandas())
+    else:
+        for frame in pd.read_csv(path, chunksize=chunk_rows):
+            yield normalize_columns(frame)
+
+def total_rows(path):
+    """Row count from Parquet metadata, or None when it cannot be known without reading the file"""
+    if path.lower().endswith('.parquet') and PYARROW_AVAILABLE:
+        return pq.ParquetFile(path).metadata.num_rows
+    return None
+
+class ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.lower().endswith('.parquet')
+        if self.parquet and not PYARROW_AVAILABLE:
+            raise ImportError("Writing Parquet needs the pyarrow package")
+        self._writer = None
+        self._first = True
+
+    def write(self, frame):
+        if self.parquet:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            frame.to_csv(self.path, mode='w' if self._first else 'a', header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+def main():
+    """Stream, validate and score a soil survey file"""
+    parser = argparse.ArgumentParser(description="Score large soil survey files chunk by chunk")
+    parser.add_argument('input', help="CSV or Parquet file")
+    parser.add_argument('output', help="CSV or Parquet file for the scored rows")
+    parser.add_argument('--chunk-rows', type=int, default=100000)
+    parser.add_argument('--workers', type=int, default=0, help="Scoring processes (0 scores in this process)")
+    parser.add_argument('--crop-model', default='RF.pkl')
+    parser.add_argument('--fertilizer-dir', default=os.path.join('..', 'KrushiAI-Fertilizer-Recommendation'))
+    args = parser.parse_args()
+
+    try:
+        chunks = read_chunks(args.input, args.chunk_rows)
+        writer = ChunkWriter(args.output)
+        expected = total_rows(args.input)
+        if args.workers > 0:
+            executor = ProcessPoolExecutor(args.workers, initializer=_init_worker,
+                                           initargs=(args.crop_model, args.fertilizer_dir))
+            submit = lambda frame: executor.submit(_score_in_worker, frame)
+        else:
+            executor = None
+            scorer = SurveyScorer(args.crop_model, args.fertilizer_dir)
+            submit = scorer.score
+    except (OSError, ImportError) as e:
+        logger.error(f"Could not start scoring: {str(e)}")
+        return False
+
+    start = time.perf_counter()
+    rows = invalid = 0
+
+    def collect(scored):
+        nonlocal rows, invalid
+        writer.write(scored)
+        rows += len(scored)
+        invalid += int((scored['validation_errors'] != '').sum())
+        rate = rows / max(time.perf_counter() - start, 1e-9)
+        progress = f" ({rows / expected:.1%})" if expected else ""
+        logger.info(f"Scored {rows:,} rows{progress} at {rate:,.0f} rows/s")
+
+    try:
+        if executor is None:
+            for frame in chunks:
+                collect(submit(frame))
+        else:
+            # Bounded queue of in-flight chunks keeps memory constant and output in order
+            pending = deque()
+            for frame in chunks:
+                pending.append(submit(frame))
+                if len(pending) >= 2 * args.workers:
+                    collect(pending.popleft().result())
+            while pending:
+                collect(pending.popleft().result())
+    except (OSError, ImportError, ValueError) as e:
+        logger.error(f"Scoring failed: {str(e)}")
+        return False
+    finally:
+        writer.close()
+        if executor is not None:
+            executor.shutdown()
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"✓ {rows:,} rows scored in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s), "
+                f"{invalid:,} with validation errors, written to {args.output}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
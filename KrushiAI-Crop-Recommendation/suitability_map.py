@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Crop Suitability Maps from Gridded Soil and Climate Layers
+Runs RF.pkl over seven aligned rasters (N, P, K, temperature, humidity, pH
+and rainfall) and writes, for every cell, the most suitable crop, its
+probability, and one probability layer per crop.
+
+The grid is processed in square tiles. Inputs are read through memory maps
+(.npy) or windowed reads (GeoTIFF, needs the optional rasterio package),
+and outputs are memory-mapped .npy files that worker processes fill in
+place, so memory use depends on the tile size and not on the grid size.
+Cells where any layer is nodata or non-finite are skipped.
+
+Output directory:
+    suitability.npy    - uint8 crop index per cell (255 = nodata)
+    confidence.npy     - uint8 probability of that crop, in percent (255 = nodata)
+    probabilities.npy  - uint8 (crops, rows, cols) probability layers in percent
+    suitability.tif    - the crop index map with the input georeferencing (GeoTIFF inputs only)
+    meta.json          - crop names, grid shape and run statistics
+
+Usage:
+    python suitability_map.py --bands N.npy P.npy K.npy temperature.npy humidity.npy ph.npy rainfall.npy \\
+        --output district_map --workers 8
+    python suitability_map.py --bands N.tif P.tif K.tif temp.tif humidity.tif ph.tif rain.tif --nodata -9999
+"""
+
+import argparse
+import json
+import logging
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from crop_utils import FEATURE_NAMES, to_frame
+
+try:
+    import rasterio
+    from rasterio.windows import Window
+    RASTERIO_AVAILABLE = True
+except ImportError:
+    RASTERIO_AVAILABLE = False
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+NODATA_CODE = 255
+
+class RasterBand:
+    """One input layer read window by window"""
+
+    def __init__(self, path):
+        self.path = path
+        self.nodata = None
+        self.profile = None
+        if path.lower().endswith(('.tif', '.tiff')):
+            if not RASTERIO_AVAILABLE:
+                raise ImportError("Reading GeoTIFF layers needs the rasterio package")
+            self._dataset = rasterio.open(path)
+            self.shape = (self._dataset.height, self._dataset.width)
+            self.nodata = self._dataset.nodata
+            self.profile = self._dataset.profile
+            self._array = None
+        else:
+            self._array = np.load(path, mmap_mode='r')
+            if self._array.ndim != 2:
+                raise ValueError(f"{path} must be a 2-D array, got shape {self._array.shape}")
+            self.shape = self._array.shape
+
+    def read(self, rows, cols):
+        """Values of a window as float64"""
+        if self._array is not None:
+            return np.asarray(self._array[rows, cols], dtype=np.float64)
+        window = Window(cols.start, rows.start, cols.stop - cols.start, rows.stop - rows.start)
+        return self._dataset.read(1, window=window).astype(np.float64)
+
+def tile_windows(shape, tile_size):
+    """Row and column slices covering the grid"""
+    return [
+        (slice(row, min(row + tile_size, shape[0])), slice(col, min(col + tile_size, shape[1])))
+        for row in range(0, shape[0], tile_size)
+        for col in range(0, shape[1], tile_size)
+    ]
+
+# Each worker process opens the layers, outputs and model once
+_state = {}
+
+def _init_worker(band_paths, nodata, model_path, output_dir):
+    with open(model_path, 'rb') as f:
+        _state['model'] = pickle.load(f)
+    _state['bands'] = [RasterBand(path) for path in band_paths]
+    _state['nodata'] = nodata
+    _state['outputs'] = {
+        name: np.load(os.path.join(output_dir, f"{name}.npy"), mmap_mode='r+')
+        for name in ('suitability', 'confidence', 'probabilities')
+    }
+
+def _score_tile(window):
+    """Score the valid cells of one tile and write them to the output maps"""
+    rows, cols = window
+    bands, outputs = _state['bands'], _state['outputs']
+    layers = [band.read(rows, cols) for band in bands]
+    stack = np.stack(layers, axis=-1).reshape(-1, len(bands))
+
+    valid = np.isfinite(stack).all(axis=1)
+    for i, band in enumerate(bands):
+        for nodata in (_state['nodata'], band.nodata):
+            if nodata is not None:
+                valid &= stack[:, i] != nodata
+
+    shape = layers[0].shape
+    suitability = np.full(stack.shape[0], NODATA_CODE, dtype=np.uint8)
+    confidence = np.full(stack.shape[0], NODATA_CODE, dtype=np.uint8)
+    n_classes = outputs['probabilities'].shape[0]
+    probabilities = np.full((stack.shape[0], n_classes), NODATA_CODE, dtype=np.uint8)
+
+    if valid.any():
+        scores = _state['model'].predict_proba(to_frame(stack[valid]))
+        best = scores.argmax(axis=1)
+        suitability[valid] = best
+        confidence[valid] = np.rint(scores[np.arange(len(best)), best] * 100)
+        probabilities[valid] = np.rint(scores * 100)
+
+    outputs['suitability'][rows, cols] = suitability.reshape(shape)
+    outputs['confidence'][rows, cols] = confidence.reshape(shape)
+    outputs['probabilities'][:, rows, cols] = probabilities.T.reshape((n_classes,) + shape)
+    return int(valid.sum()), int(valid.size)
+
+def main():
+    """Build the suitability maps tile by tile"""
+    parser = argparse.ArgumentParser(description="Crop suitability maps from gridded soil and climate layers")
+    parser.add_argument('--bands', nargs=len(FEATURE_NAMES), required=True, metavar='PATH',
+                        help=f"Aligned layers in the order {', '.join(FEATURE_NAMES)} (.npy or GeoTIFF)")
+    parser.add_argument('--output', default='suitability_map', help="Output directory")
+    parser.add_argument('--model', default='RF.pkl')
+    parser.add_argument('--nodata', type=float, help="Nodata value of the layers (NaN cells are always skipped)")
+    parser.add_argument('--tile-size', type=int, default=512)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    try:
+        bands = [RasterBand(path) for path in args.bands]
+        with open(args.model, 'rb') as f:
+            classes = [str(crop) for crop in pickle.load(f).classes_]
+    except (OSError, ImportError, ValueError) as e:
+        logger.error(f"Could not open the inputs: {str(e)}")
+        return False
+
+    shape = bands[0].shape
+    mismatched = [band.path for band in bands if band.shape != shape]
+    if mismatched:
+        logger.error(f"Layers are not aligned with {args.bands[0]} {shape}: {', '.join(mismatched)}")
+        return False
+
+    os.makedirs(args.output, exist_ok=True)
+    for name, output_shape in (('suitability', shape), ('confidence', shape),
+                               ('probabilities', (len(classes),) + shape)):
+        np.lib.format.open_memmap(os.path.join(args.output, f"{name}.npy"), mode='w+',
+                                  dtype=np.uint8, shape=output_shape).flush()
+
+    windows = tile_windows(shape, args.tile_size)
+    logger.info(f"Scoring a {shape[0]}x{shape[1]} grid ({shape[0] * shape[1]:,} cells) in {len(windows)} tiles "
+                f"with {args.workers} workers")
+
+    start = time.perf_counter()
+    valid_cells = cells = 0
+    initargs = (args.bands, args.nodata, args.model, args.output)
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=initargs) as executor:
+        for done, (tile_valid, tile_cells) in enumerate(executor.map(_score_tile, windows), start=1):
+            valid_cells += tile_valid
+            cells += tile_cells
+            if done % max(1, len(windows) // 20) == 0 or done == len(windows):
+                rate = cells / max(time.perf_counter() - start, 1e-9)
+                logger.info(f"{done}/{len(windows)} tiles ({cells / (shape[0] * shape[1]):.0%}) at {rate:,.0f} cells/s")
+    elapsed = time.perf_counter() - start
+
+    # Share of valid cells per recommended crop, without loading the whole map at once
+    suitability = np.load(os.path.join(args.output, 'suitability.npy'), mmap_mode='r')
+    counts = np.zeros(NODATA_CODE + 1, dtype=np.int64)
+    for rows, cols in tile_windows(shape, args.tile_size * 4):
+        counts += np.bincount(suitability[rows, cols].ravel(), minlength=NODATA_CODE + 1)
+    crop_cells = {crop: int(counts[i]) for i, crop in enumerate(classes) if counts[i]}
+
+    if bands[0].profile is not None:
+        profile = dict(bands[0].profile, dtype='uint8', count=1, nodata=NODATA_CODE)
+        with rasterio.open(os.path.join(args.output, 'suitability.tif'), 'w', **profile) as dst:
+            dst.write(np.asarray(suitability), 1)
+
+    meta = {
+        'crops': classes,
+        'shape': list(shape),
+        'nodata_code': NODATA_CODE,
+        'probability_scale': 'percent',
+        'bands': dict(zip(FEATURE_NAMES, args.bands)),
+        'valid_cells': valid_cells,
+        'crop_cells': dict(sorted(crop_cells.items(), key=lambda item: -item[1])),
+        'seconds': round(elapsed, 1)
+    }
+    with open(os.path.join(args.output, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    logger.info(f"✓ {valid_cells:,} of {shape[0] * shape[1]:,} cells scored in {elapsed:.1f}s "
+                f"({cells / max(elapsed, 1e-9):,.0f} cells/s), maps saved to {args.output}")
+    for crop, count in list(meta['crop_cells'].items())[:5]:
+        logger.info(f"  {crop}: {count / max(valid_cells, 1):.1%} of the area")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
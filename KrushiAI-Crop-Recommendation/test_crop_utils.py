@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the crop recommendation utilities
+Run with: python -m pytest test_crop_utils.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from crop_utils import (FEATURE_NAMES, FEATURE_RANGES, MemoizedCropModel, quantize, recommendation_ranges,
+                        sensitivity_analysis, sensitivity_grid, to_frame, top_k_crops)
+
+INPUTS = [90, 42, 43, 20.9, 82.0, 6.5, 202.9]
+
+@pytest.fixture(scope="module")
+def model():
+    data = pd.read_csv('Crop_recommendation.csv')
+    return RandomForestClassifier(n_estimators=20, random_state=0).fit(data[FEATURE_NAMES], data['label'])
+
+def test_top_k_crops_are_ranked(model):
+    """Top crops come best first and agree with predict_proba"""
+    crops = top_k_crops(model, INPUTS, k=3)
+    probabilities = model.predict_proba(to_frame(np.array(INPUTS)))[0]
+    assert len(crops) == 3
+    assert [p for _, p in crops] == sorted((p for _, p in crops), reverse=True)
+    assert crops[0] == (model.classes_[np.argmax(probabilities)], pytest.approx(probabilities.max()))
+
+def test_sensitivity_grid_shape():
+    """One block of rows per feature, steps rows per block"""
+    rows, values = sensitivity_grid(INPUTS, steps=11)
+    assert rows.shape == (len(FEATURE_NAMES) * 11, len(FEATURE_NAMES))
+    assert values.shape == (len(FEATURE_NAMES), 11)
+
+def test_sensitivity_grid_varies_one_feature_per_block():
+    """Each block sweeps its feature monotonically over its range and keeps the others fixed"""
+    rows, values = sensitivity_grid(INPUTS, steps=11)
+    blocks = rows.reshape(len(FEATURE_NAMES), 11, len(FEATURE_NAMES))
+    for i, name in enumerate(FEATURE_NAMES):
+        swept = blocks[i, :, i]
+        np.testing.assert_array_equal(swept, values[i])
+        assert np.all(np.diff(swept) > 0)
+        assert (swept[0], swept[-1]) == FEATURE_RANGES[name]
+        others = np.delete(blocks[i], i, axis=1)
+        np.testing.assert_array_equal(others, np.tile(np.delete(INPUTS, i), (11, 1)))
+
+def test_sensitivity_analysis_matches_single_predictions(model):
+    """The batched sweep gives the same probabilities as scoring rows one by one"""
+    analysis = sensitivity_analysis(model, INPUTS, steps=5)
+    assert list(analysis) == FEATURE_NAMES
+    rows, _ = sensitivity_grid(INPUTS, steps=5)
+    expected = np.vstack([model.predict_proba(to_frame(row)) for row in rows[:5]])
+    np.testing.assert_allclose(analysis['N']['probabilities'], expected)
+
+def test_recommendation_ranges_cover_the_sweep():
+    values = np.linspace(0, 10, 6)
+    probabilities = np.array([[0.9, 0.1], [0.8, 0.2], [0.3, 0.7], [0.2, 0.8], [0.6, 0.4], [0.7, 0.3]])
+    assert recommendation_ranges(values, probabilities, ['rice', 'maize']) == [
+        (0.0, 2.0, 'rice'), (4.0, 6.0, 'maize'), (8.0, 10.0, 'rice')
+    ]
+
+def test_quantize_snaps_to_input_steps():
+    cells = quantize([[90.4, 42, 43, 20.94, 82.0, 6.5, 202.91], [90, 42, 43, 20.9, 82.0, 6.5, 202.9]])
+    np.testing.assert_array_equal(cells[0], cells[1])
+
+def test_memoized_model_hits_and_matches(model):
+    """Repeated and near-identical inputs are served from the memo with the model's answer"""
+    memo = MemoizedCropModel(model, capacity=100)
+    first = memo.predict_proba(np.array([INPUTS]))
+    again = memo.predict_proba(np.array([[90.2] + INPUTS[1:]]))
+    np.testing.assert_allclose(first, model.predict_proba(to_frame(np.array(INPUTS))))
+    np.testing.assert_array_equal(first, again)
+    assert memo.stats()['hits'] == 1
+    assert memo.stats()['misses'] == 1
+    assert memo.predict(np.array([INPUTS]))[0] == model.predict(to_frame(np.array(INPUTS)))[0]
+
+def test_memoized_model_is_bounded(model):
+    """The least recently used cells are evicted once the memo is full"""
+    memo = MemoizedCropModel(model, capacity=3)
+    rows = np.array([[n] + INPUTS[1:] for n in range(10, 15)], dtype=float)
+    memo.predict_proba(rows)
+    assert memo.stats()['entries'] == 3
+    memo.predict_proba(rows[-1:])
+    assert memo.stats()['hits'] == 1
+    assert memo.warm(rows, limit=5) == 2
@@ -3,9 +3,18 @@ import streamlit as st
 import numpy as np
 import pandas as pd
 import pickle
+import json
 import os
+from io import BytesIO
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
+from crop_utils import (FEATURE_NAMES, FEATURE_LABELS, CLIMATE_FEATURES, MemoizedCropModel, top_k_crops,
+                        sensitivity_analysis, recommendation_ranges, sample_climate_ranges, sample_climate_history,
+                        scenario_analysis)
+from crop_cascade import CropModelCascade
+from crop_neighbours import NeighbourIndex, build_neighbour_index
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -27,7 +36,7 @@ st.markdown("""
         background-color: #1a1a1a;
         color: #ffffff;
     }
-    .stButton>button {
+    .stButton>button, .stFormSubmitButton>button {
         background-color: #4CAF50;
         color: white;
         font-weight: bold;
@@ -38,7 +47,7 @@ st.markdown("""
         box-shadow: 0 2px 4px rgba(76, 175, 80, 0.3);
         transition: all 0.3s ease;
     }
-    .stButton>button:hover {
+    .stButton>button:hover, .stFormSubmitButton>button:hover {
         background-color: #45a049;
         box-shadow: 0 4px 8px rgba(76, 175, 80, 0.4);
         transform: translateY(-1px);
@@ -117,15 +126,23 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Read the logo once per server process instead of on every rerun
+@st.cache_resource
+def load_logo():
+    try:
+        with open("crop.png", "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
 # Display header with logo
 col1, col2 = st.columns([1, 3])
 with col1:
     # Display Images
-    from PIL import Image
-    try:
-        img = Image.open("crop.png")
-        st.image(img, width=150)
-    except:
+    logo = load_logo()
+    if logo is not None:
+        st.image(logo, width=150)
+    else:
         st.write("🌱")
 
 with col2:
@@ -136,17 +153,170 @@ with col2:
 def load_data():
     return pd.read_csv('Crop_recommendation.csv')
 
-# Load the model
+# Optional cheap-first model cascade calibrated by evaluate_cascade.py
+CASCADE_CONFIG_PATH = os.environ.get("KRUSHIAI_CROP_CASCADE", "crop_cascade.json")
+
+# KD-tree over the dataset (and growing history) built by build_neighbour_index.py
+NEIGHBOUR_INDEX_DIR = os.environ.get("KRUSHIAI_CROP_NEIGHBOURS", "neighbour_index")
+SIMILAR_RECORDS = 5
+
+# Load the neighbour index, building it from the dataset on first start
+@st.cache_resource
+def load_neighbour_index():
+    try:
+        if not os.path.exists(os.path.join(NEIGHBOUR_INDEX_DIR, 'meta.json')):
+            build_neighbour_index({'dataset': load_data()}, NEIGHBOUR_INDEX_DIR)
+        return NeighbourIndex(NEIGHBOUR_INDEX_DIR)
+    except (OSError, ValueError, KeyError) as e:
+        st.warning(f"Similar records unavailable, could not load {NEIGHBOUR_INDEX_DIR}: {e}")
+        return None
+
+# Load the model; the batched analyses always score with the Random Forest
 @st.cache_resource
 def load_model():
     return pickle.load(open('RF.pkl', 'rb'))
 
+# Load the cascade used for the single-row Predict call, if one has been calibrated
+@st.cache_resource
+def load_cascade():
+    if not os.path.exists(CASCADE_CONFIG_PATH):
+        return None
+    try:
+        with open(CASCADE_CONFIG_PATH, 'r') as f:
+            uses_index = bool(json.load(f).get('neighbour_index'))
+        # The KNN stage answers from the index only if its threshold was calibrated that way
+        return CropModelCascade.from_config(CASCADE_CONFIG_PATH,
+                                            neighbour_index=load_neighbour_index() if uses_index else None)
+    except (OSError, ImportError, KeyError, ValueError) as e:
+        st.warning(f"Model cascade disabled, could not load {CASCADE_CONFIG_PATH}: {e}")
+        return None
+
+# Memoized predictions shared by all sessions; the optional request log seeds it with the most common inputs
+PREDICTION_MEMO_SIZE = int(os.environ.get("KRUSHIAI_CROP_MEMO_SIZE", "10000"))
+REQUEST_LOG_PATH = os.environ.get("KRUSHIAI_CROP_REQUEST_LOG", "")
+
+@st.cache_resource
+def load_memoized_model():
+    memo = MemoizedCropModel(load_model(), capacity=PREDICTION_MEMO_SIZE)
+    if REQUEST_LOG_PATH and os.path.exists(REQUEST_LOG_PATH):
+        try:
+            memo.warm(pd.read_csv(REQUEST_LOG_PATH, usecols=FEATURE_NAMES)[FEATURE_NAMES].to_numpy(),
+                      limit=PREDICTION_MEMO_SIZE // 2)
+        except (OSError, ValueError, pd.errors.ParserError):
+            pass
+    return memo
+
+# The cascade only pays off one row at a time, so it answers the Predict call alone
+@st.cache_resource
+def load_prediction_model():
+    cascade = load_cascade()
+    if cascade is None:
+        return load_memoized_model()
+    return MemoizedCropModel(cascade, capacity=PREDICTION_MEMO_SIZE)
+
+def log_request(inputs):
+    if not REQUEST_LOG_PATH:
+        return
+    try:
+        write_header = not os.path.exists(REQUEST_LOG_PATH)
+        with open(REQUEST_LOG_PATH, 'a') as f:
+            if write_header:
+                f.write(','.join(FEATURE_NAMES) + '\n')
+            f.write(','.join(f"{value:g}" for value in inputs) + '\n')
+    except OSError:
+        pass
+
+# Render the crop distribution chart once per dataset; keyed by the counts
+@st.cache_data
+def render_crop_distribution(crop_labels, crop_values):
+    plt.style.use('dark_background')
+    fig, ax = plt.subplots(figsize=(12, 6), facecolor='#1a1a1a')
+    try:
+        sns.barplot(x=list(crop_labels), y=list(crop_values), ax=ax, palette='viridis')
+        ax.set_facecolor('#2d2d2d')
+        ax.set_title('Distribution of Crops in Dataset', color='white', fontsize=14, fontweight='bold')
+        ax.set_xlabel('Crop Type', color='white', fontweight='bold')
+        ax.set_ylabel('Number of Records', color='white', fontweight='bold')
+        ax.tick_params(colors='white')
+        ax.spines['bottom'].set_color('white')
+        ax.spines['top'].set_color('white')
+        ax.spines['right'].set_color('white')
+        ax.spines['left'].set_color('white')
+        plt.setp(ax.get_xticklabels(), rotation=90, color='white')
+        plt.setp(ax.get_yticklabels(), color='white')
+        fig.tight_layout()
+        buffer = BytesIO()
+        fig.savefig(buffer, format='png', facecolor=fig.get_facecolor())
+        return buffer.getvalue()
+    finally:
+        # Free the figure; pyplot keeps every open figure alive otherwise
+        plt.close(fig)
+
+# Number of crops listed with the recommendation, and grid points per input in the sensitivity panel
+TOP_K = 3
+SENSITIVITY_STEPS = 25
+CROP_COLORS = ['#4CAF50', '#FFC107', '#1976D2', '#F44336', '#9C27B0']
+
 # Function to make predictions
 def predict_crop(nitrogen, phosphorus, potassium, temperature, humidity, ph, rainfall):
-    model = load_model()
-    prediction = model.predict(np.array([nitrogen, phosphorus, potassium, temperature, humidity, ph, rainfall]).reshape(1, -1))
+    model = load_prediction_model()
+    inputs = [nitrogen, phosphorus, potassium, temperature, humidity, ph, rainfall]
+    log_request(inputs)
+    prediction = model.predict(np.array([inputs]))
     return prediction
 
+# All perturbed inputs go through one predict_proba call; cached per set of inputs
+@st.cache_data
+def run_sensitivity_analysis(inputs):
+    return sensitivity_analysis(load_model(), inputs, SENSITIVITY_STEPS)
+
+@st.cache_data
+def render_sensitivity_chart(inputs, crops):
+    analysis = run_sensitivity_analysis(inputs)
+    class_index = {crop: i for i, crop in enumerate(load_model().classes_)}
+    plt.style.use('dark_background')
+    fig, axes = plt.subplots(2, 4, figsize=(14, 6.5), facecolor='#1a1a1a')
+    try:
+        for ax, name, value in zip(axes.flat, FEATURE_NAMES, inputs):
+            ax.set_facecolor('#2d2d2d')
+            for crop, color in zip(crops, CROP_COLORS):
+                ax.plot(analysis[name]['values'], analysis[name]['probabilities'][:, class_index[crop]],
+                        color=color, linewidth=2, label=crop)
+            ax.axvline(value, color='white', linestyle='--', linewidth=1, alpha=0.7)
+            ax.set_title(FEATURE_LABELS[name], color='white', fontsize=11, fontweight='bold')
+            ax.set_ylim(0, 1)
+            ax.tick_params(colors='white', labelsize=8)
+        # The spare panel holds the legend
+        legend_ax = axes.flat[-1]
+        legend_ax.axis('off')
+        handles, labels = axes.flat[0].get_legend_handles_labels()
+        legend_ax.legend(handles, labels, loc='center', title='Probability of', frameon=False)
+        fig.tight_layout()
+        buffer = BytesIO()
+        fig.savefig(buffer, format='png', facecolor=fig.get_facecolor())
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+# Share of sampled seasons in which each crop comes out on top
+@st.cache_data
+def render_scenario_chart(crop_labels, shares):
+    plt.style.use('dark_background')
+    fig, ax = plt.subplots(figsize=(8, 0.5 * len(crop_labels) + 1.5), facecolor='#1a1a1a')
+    try:
+        ax.barh(list(crop_labels)[::-1], [share * 100 for share in shares][::-1], color='#4CAF50')
+        ax.set_facecolor('#2d2d2d')
+        ax.set_title('Recommended Crop Across Scenarios', color='white', fontsize=14, fontweight='bold')
+        ax.set_xlabel('Share of scenarios (%)', color='white', fontweight='bold')
+        ax.set_xlim(0, 100)
+        ax.tick_params(colors='white')
+        fig.tight_layout()
+        buffer = BytesIO()
+        fig.savefig(buffer, format='png', facecolor=fig.get_facecolor())
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
 # Dictionary with crop information
 crop_info = {
     'rice': "Rice thrives in warm, humid conditions with abundant water. Ideal for lowland areas with good irrigation.",
@@ -176,7 +346,7 @@ crop_info = {
 ## Streamlit code for the web app interface
 def main():
     # Create tabs for different sections
-    tab1, tab2, tab3 = st.tabs(["🔮 Prediction", "📊 Dataset Info", "ℹ️ About"])
+    tab1, tab_weather, tab2, tab3 = st.tabs(["🔮 Prediction", "🌦️ Season Outlook", "📊 Dataset Info", "ℹ️ About"])
     
     with tab1:
         st.markdown("### Get Your Crop Recommendation")
@@ -186,18 +356,20 @@ def main():
         col1, col2 = st.columns([1, 1])
         
         with col1:
-            st.subheader("Soil Parameters")
-            nitrogen = st.number_input("🧪 Nitrogen (kg/ha)", min_value=0.0, max_value=140.0, value=50.0, step=1.0)
-            phosphorus = st.number_input("🧪 Phosphorus (kg/ha)", min_value=0.0, max_value=145.0, value=50.0, step=1.0)
-            potassium = st.number_input("🧪 Potassium (kg/ha)", min_value=0.0, max_value=205.0, value=50.0, step=1.0)
-            ph = st.number_input("🧪 pH Level", min_value=0.0, max_value=14.0, value=6.5, step=0.1)
-            
-            st.subheader("Climate Parameters")
-            temperature = st.number_input("🌡️ Temperature (°C)", min_value=0.0, max_value=51.0, value=25.0, step=0.1)
-            humidity = st.number_input("💧 Humidity (%)", min_value=0.0, max_value=100.0, value=60.0, step=0.1)
-            rainfall = st.number_input("🌧️ Rainfall (mm)", min_value=0.0, max_value=500.0, value=100.0, step=0.1)
-            
-            predict_button = st.button("🔮 Predict Crop")
+            # A form, so editing a value does not rerun the app until submitted
+            with st.form("crop_inputs"):
+                st.subheader("Soil Parameters")
+                nitrogen = st.number_input("🧪 Nitrogen (kg/ha)", min_value=0.0, max_value=140.0, value=50.0, step=1.0)
+                phosphorus = st.number_input("🧪 Phosphorus (kg/ha)", min_value=0.0, max_value=145.0, value=50.0, step=1.0)
+                potassium = st.number_input("🧪 Potassium (kg/ha)", min_value=0.0, max_value=205.0, value=50.0, step=1.0)
+                ph = st.number_input("🧪 pH Level", min_value=0.0, max_value=14.0, value=6.5, step=0.1)
+                
+                st.subheader("Climate Parameters")
+                temperature = st.number_input("🌡️ Temperature (°C)", min_value=0.0, max_value=51.0, value=25.0, step=0.1)
+                humidity = st.number_input("💧 Humidity (%)", min_value=0.0, max_value=100.0, value=60.0, step=0.1)
+                rainfall = st.number_input("🌧️ Rainfall (mm)", min_value=0.0, max_value=500.0, value=100.0, step=0.1)
+                
+                predict_button = st.form_submit_button("🔮 Predict Crop")
         
         with col2:
             st.subheader("Recommendation Results")
@@ -223,31 +395,123 @@ def main():
                             st.markdown("### Crop Information")
                             st.info(crop_info[recommended_crop])
                         
-                        # Display parameter importance visualization
-                        st.markdown("### Parameter Importance")
+                        # Display the next best crops with their probabilities
+                        st.markdown("### Top Recommendations")
+                        input_values = (nitrogen, phosphorus, potassium, temperature, humidity, ph, rainfall)
+                        top_crops = top_k_crops(load_memoized_model(), input_values, TOP_K)
+                        for crop, probability in top_crops:
+                            st.progress(probability, text=f"**{crop.title()}** · {probability:.0%}")
+                        
+                        # Closest records from the dataset and growing history
+                        neighbour_index = load_neighbour_index()
+                        if neighbour_index is not None:
+                            st.markdown("### Similar Historical Records")
+                            similar = pd.DataFrame(neighbour_index.nearest_records(input_values, SIMILAR_RECORDS))
+                            similar = similar[['label'] + FEATURE_NAMES + ['source', 'distance']]
+                            similar['distance'] = similar['distance'].round(2)
+                            st.dataframe(similar.rename(columns={'label': 'Crop', **FEATURE_LABELS}),
+                                         hide_index=True, use_container_width=True)
                         
-                        # Create a simple visualization of the input parameters
-                        param_names = ['Nitrogen', 'Phosphorus', 'Potassium', 'Temperature', 'Humidity', 'pH', 'Rainfall']
-                        param_values = [nitrogen, phosphorus, potassium, temperature, humidity, ph, rainfall]
+                        # Show how the recommendation changes as each input is varied
+                        st.markdown("### Sensitivity Analysis")
+                        st.caption("Probability of the top crops as one parameter at a time is varied over its range; "
+                                   "the dashed line marks your value.")
+                        st.image(render_sensitivity_chart(input_values, tuple(crop for crop, _ in top_crops)),
+                                 use_column_width=True)
                         
-                        # Set dark theme for matplotlib
-                        plt.style.use('dark_background')
-                        fig, ax = plt.subplots(figsize=(10, 5), facecolor='#1a1a1a')
-                        bars = ax.bar(param_names, param_values, color=['#1976D2', '#4CAF50', '#FFC107', '#F44336', '#9C27B0', '#00BCD4', '#3F51B5'])
-                        ax.set_title('Your Input Parameters', color='white', fontsize=14, fontweight='bold')
-                        ax.set_ylabel('Value', color='white', fontweight='bold')
-                        ax.set_facecolor('#2d2d2d')
-                        ax.tick_params(colors='white')
-                        ax.spines['bottom'].set_color('white')
-                        ax.spines['top'].set_color('white')
-                        ax.spines['right'].set_color('white')
-                        ax.spines['left'].set_color('white')
-                        plt.xticks(rotation=45, color='white')
-                        plt.yticks(color='white')
-                        plt.tight_layout()
-                        st.pyplot(fig)
+                        analysis = run_sensitivity_analysis(input_values)
+                        classes = load_model().classes_
+                        ranges = [
+                            {
+                                'Parameter': FEATURE_LABELS[name],
+                                'Recommended crop': ' → '.join(
+                                    f"{crop} ({low:.4g}–{high:.4g})"
+                                    for low, high, crop in recommendation_ranges(
+                                        analysis[name]['values'], analysis[name]['probabilities'], classes)
+                                )
+                            }
+                            for name in FEATURE_NAMES
+                        ]
+                        st.dataframe(pd.DataFrame(ranges), hide_index=True, use_container_width=True)
             else:
                 st.info("Fill in the parameters and click 'Predict Crop' to get your recommendation.")
+    
+    with tab_weather:
+        st.markdown("### Plan for an Uncertain Season")
+        st.write("Weather for the coming season is a guess. Give the range you expect, or upload past seasons, "
+                 "and see how often each crop comes out on top across thousands of possible seasons.")
+        
+        col1, col2 = st.columns([1, 1])
+        
+        with col1:
+            with st.form("weather_inputs"):
+                st.subheader("Soil Parameters")
+                w_nitrogen = st.number_input("🧪 Nitrogen (kg/ha)", min_value=0.0, max_value=140.0, value=50.0, step=1.0, key="w_nitrogen")
+                w_phosphorus = st.number_input("🧪 Phosphorus (kg/ha)", min_value=0.0, max_value=145.0, value=50.0, step=1.0, key="w_phosphorus")
+                w_potassium = st.number_input("🧪 Potassium (kg/ha)", min_value=0.0, max_value=205.0, value=50.0, step=1.0, key="w_potassium")
+                w_ph = st.number_input("🧪 pH Level", min_value=0.0, max_value=14.0, value=6.5, step=0.1, key="w_ph")
+                
+                st.subheader("Expected Climate")
+                source = st.radio("Scenarios from", ["Expected ranges", "Past seasons (CSV)"], horizontal=True)
+                temperature_range = st.slider("🌡️ Temperature (°C)", 0.0, 51.0, (20.0, 30.0), step=0.5)
+                humidity_range = st.slider("💧 Humidity (%)", 0.0, 100.0, (50.0, 80.0), step=1.0)
+                rainfall_range = st.slider("🌧️ Rainfall (mm)", 0.0, 500.0, (60.0, 160.0), step=5.0)
+                history_file = st.file_uploader("Past seasons (CSV with temperature, humidity and rainfall columns)",
+                                                type=["csv"])
+                n_scenarios = st.select_slider("Scenarios", options=[500, 1000, 2000, 5000, 10000], value=2000)
+                
+                weather_button = st.form_submit_button("🌦️ Run Scenarios")
+        
+        with col2:
+            st.subheader("Season Outlook")
+            if weather_button:
+                try:
+                    if source == "Past seasons (CSV)":
+                        if history_file is None:
+                            raise ValueError("Upload a CSV of past seasons first.")
+                        history = pd.read_csv(history_file)
+                        history.columns = history.columns.str.strip().str.lower()
+                        samples = sample_climate_history(history, n_scenarios)
+                    else:
+                        # Most likely value in the middle of each range
+                        ranges = dict(zip(CLIMATE_FEATURES, (temperature_range, humidity_range, rainfall_range)))
+                        samples = sample_climate_ranges(
+                            {name: (low, (low + high) / 2, high) for name, (low, high) in ranges.items()},
+                            n_scenarios
+                        )
+                    
+                    # Climate inputs are replaced by the sampled scenarios
+                    base_inputs = (w_nitrogen, w_phosphorus, w_potassium, 0.0, 0.0, w_ph, 0.0)
+                    with st.spinner('Evaluating scenarios...'):
+                        outlook = scenario_analysis(load_model(), base_inputs, samples)
+                except (KeyError, ValueError, pd.errors.ParserError) as e:
+                    st.error(f"Could not run the scenarios: {e}")
+                else:
+                    crops = outlook['crops']
+                    robust = crops[crops['crop'] == outlook['robust_choice']].iloc[0]
+                    st.markdown(f"""
+                    <div style="background-color:#2d5a2d; padding:20px; border-radius:10px; margin-bottom:20px; border: 2px solid #4CAF50; box-shadow: 0 4px 8px rgba(76, 175, 80, 0.3);">
+                        <h3 style="color:#81C784; text-align:center; margin-bottom:10px; font-weight:bold;">🛡️ Robust Choice</h3>
+                        <h2 style="color:#A5D6A7; text-align:center; text-transform:uppercase; font-size:2.5rem; margin:0; text-shadow: 0 2px 4px rgba(0,0,0,0.3);">{robust['crop']}</h2>
+                        <p style="color:#ffffff; text-align:center; margin-top:10px;">Top pick in {robust['recommended_share']:.0%} of {outlook['scenarios']:,} scenarios,
+                        and still {robust['low_probability']:.0%} suitable in the worst 10% of seasons</p>
+                    </div>
+                    """, unsafe_allow_html=True)
+                    
+                    top = crops[crops['recommended_share'] > 0].head(8)
+                    st.image(render_scenario_chart(tuple(top['crop']), tuple(top['recommended_share'].round(4))),
+                             use_column_width=True)
+                    
+                    table = crops.rename(columns={
+                        'crop': 'Crop',
+                        'recommended_share': 'Recommended in',
+                        'mean_probability': 'Average suitability',
+                        'low_probability': 'Suitability in a bad season'
+                    })
+                    st.dataframe(table.style.format({column: '{:.0%}' for column in table.columns[1:]}),
+                                 hide_index=True, use_container_width=True)
+            else:
+                st.info("Set your soil values and expected weather, then click 'Run Scenarios'.")
                 
     with tab2:
         st.markdown("### Dataset Information")
@@ -263,23 +527,9 @@ def main():
         
         # Show distribution of crops in the dataset
         st.subheader("Crop Distribution")
-        plt.style.use('dark_background')
-        fig, ax = plt.subplots(figsize=(12, 6), facecolor='#1a1a1a')
         crop_counts = df['label'].value_counts()
-        sns.barplot(x=crop_counts.index, y=crop_counts.values, ax=ax, palette='viridis')
-        ax.set_facecolor('#2d2d2d')
-        ax.set_title('Distribution of Crops in Dataset', color='white', fontsize=14, fontweight='bold')
-        ax.set_xlabel('Crop Type', color='white', fontweight='bold')
-        ax.set_ylabel('Number of Records', color='white', fontweight='bold')
-        ax.tick_params(colors='white')
-        ax.spines['bottom'].set_color('white')
-        ax.spines['top'].set_color('white')
-        ax.spines['right'].set_color('white')
-        ax.spines['left'].set_color('white')
-        plt.xticks(rotation=90, color='white')
-        plt.yticks(color='white')
-        plt.tight_layout()
-        st.pyplot(fig)
+        st.image(render_crop_distribution(tuple(crop_counts.index), tuple(crop_counts.values.tolist())),
+                 use_column_width=True)
         
     with tab3:
         st.markdown("### About KrushiAI")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Build the Similar Case Embedding Index
+Embeds every labelled training/validation image with the disease CNN and
+writes a quantized, memory-mappable index (see embedding_index.py) that the
+app uses to show the closest confirmed cases next to each prediction. Small
+thumbnails of the references are stored in the index, since the dataset is
+not deployed with the app.
+
+Usage:
+    python build_embedding_index.py --data-dir Dataset1 --output embedding_index
+    python build_embedding_index.py --thumbnail-size 0   # labels only, no previews
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from embedding_index import EmbeddingIndex, build_index
+from utils import ImageProcessor, ModelPredictor
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+def list_images(data_dir, splits):
+    """Collect (path, label) pairs from class-named sub-folders"""
+    items = []
+    for split in splits:
+        split_dir = os.path.join(data_dir, split)
+        for label in sorted(os.listdir(split_dir)):
+            class_dir = os.path.join(split_dir, label)
+            if not os.path.isdir(class_dir):
+                continue
+            for name in sorted(os.listdir(class_dir)):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    items.append((os.path.join(class_dir, name), label))
+    return items
+
+def make_thumbnail(image_array, size):
+    """JPEG thumbnail of a preprocessed image array"""
+    image = Image.fromarray(np.clip(image_array * 255.0, 0, 255).astype(np.uint8))
+    image.thumbnail((size, size), Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG', quality=80)
+    return buffer.getvalue()
+
+def embed_images(predictor, items, batch_size, thumbnail_size=0):
+    """
+    Embed images in batches using the serving preprocessing
+
+    Returns:
+        (embeddings, thumbnails); thumbnails is None when thumbnail_size is 0
+    """
+    processor = ImageProcessor(target_size=predictor.input_size)
+    embeddings = []
+    thumbnails = [] if thumbnail_size > 0 else None
+    for start in range(0, len(items), batch_size):
+        batch = np.concatenate([processor.preprocess_image(path) for path, _ in items[start:start + batch_size]])
+        embeddings.append(predictor.embed(batch))
+        if thumbnails is not None:
+            thumbnails.extend(make_thumbnail(image_array, thumbnail_size) for image_array in batch)
+        if (start // batch_size) % 50 == 0:
+            logger.info(f"Embedded {min(start + batch_size, len(items))}/{len(items)} images")
+    return np.concatenate(embeddings), thumbnails
+
+def main():
+    """Embed the reference images and write the index"""
+    parser = argparse.ArgumentParser(description="Build the similar-case embedding index")
+    parser.add_argument('--data-dir', default='Dataset1', help="Dataset root with class-named sub-folders per split")
+    parser.add_argument('--splits', nargs='+', default=['train', 'valid'])
+    parser.add_argument('--model', default='trained_plant_disease_model.keras')
+    parser.add_argument('--output', default='embedding_index')
+    parser.add_argument('--clusters', type=int, default=256, help="IVF clusters for approximate search")
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--thumbnail-size', type=int, default=64,
+                        help="Side of the reference thumbnails stored in the index (0 to skip them)")
+    args = parser.parse_args()
+
+    items = list_images(args.data_dir, args.splits)
+    logger.info(f"Found {len(items)} reference images")
+
+    predictor = ModelPredictor(args.model)
+    embeddings, thumbnails = embed_images(predictor, items, args.batch_size, args.thumbnail_size)
+    meta = build_index(embeddings, [label for _, label in items], args.output, n_clusters=args.clusters,
+                       thumbnails=thumbnails)
+    logger.info(f"✓ Index with {meta['count']} x {meta['dimensions']} int8 codes saved to {args.output}")
+
+    # Quick timing of both search modes
+    index = EmbeddingIndex(args.output)
+    for mode in ('exact', 'approximate'):
+        start = time.perf_counter()
+        index.search(embeddings[0], k=5, mode=mode)
+        logger.info(f"{mode} search: {(time.perf_counter() - start) * 1000:.1f} ms")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
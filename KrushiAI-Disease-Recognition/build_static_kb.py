@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Build the Static Disease Knowledge Base
+Renders every entry of the disease database to plain HTML and JSON so the
+knowledge base can be browsed next to the explore/ and guide/ pages without
+a running Streamlit process. Searching and filtering happen in the browser
+against a pre-built token index (search-index.json).
+
+Only index.html, diseases.json and search-index.json are generated; the
+stylesheet and script in the output directory are maintained by hand.
+
+Usage:
+    python build_static_kb.py --output ../disease-database
+"""
+
+import argparse
+import html
+import json
+import logging
+import os
+import re
+import sys
+from collections import Counter
+
+from disease_info import get_all_diseases, get_disease_info
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SEVERITY_ORDER = ['Critical', 'High', 'Medium', 'Low', 'None']
+LIST_SECTIONS = [
+    ('symptoms', 'Symptoms', 'fa-search'),
+    ('causes', 'Causes', 'fa-bug'),
+    ('treatment', 'Treatment', 'fa-prescription-bottle'),
+    ('prevention', 'Prevention', 'fa-shield-alt')
+]
+# Fields whose words are searchable in the browser
+SEARCH_FIELDS = ['name', 'scientific_name', 'plant', 'description', 'symptoms', 'causes', 'treatment', 'prevention']
+STOP_WORDS = {'a', 'an', 'and', 'are', 'as', 'at', 'by', 'for', 'from', 'in', 'is', 'it', 'of', 'on', 'or',
+              'the', 'to', 'with'}
+
+def load_entries():
+    """Collect all database entries through the public disease_info API"""
+    entries = []
+    for key in get_all_diseases():
+        info = get_disease_info(key)
+        entries.append({'id': key, **info})
+    return entries
+
+def tokenize(text):
+    """Lower-case word tokens without stop words"""
+    return [token for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in STOP_WORDS]
+
+def build_search_index(entries):
+    """
+    Build the client-side search index
+
+    Returns:
+        Dictionary with a token -> entry positions map and facet counts
+    """
+    terms = {}
+    for position, entry in enumerate(entries):
+        for field in SEARCH_FIELDS:
+            value = entry.get(field, '')
+            text = ' '.join(value) if isinstance(value, list) else value
+            for token in set(tokenize(text)):
+                postings = terms.setdefault(token, [])
+                if not postings or postings[-1] != position:
+                    postings.append(position)
+
+    return {
+        'count': len(entries),
+        'terms': dict(sorted(terms.items())),
+        'plants': dict(sorted(Counter(entry.get('plant', '') for entry in entries if entry.get('plant')).items())),
+        'severities': {level: count for level, count in
+                       sorted(Counter(entry.get('severity', 'Unknown') for entry in entries).items(),
+                              key=lambda item: SEVERITY_ORDER.index(item[0]) if item[0] in SEVERITY_ORDER else 99)}
+    }
+
+def render_card(position, entry):
+    """Render one disease as an HTML card"""
+    esc = html.escape
+    severity = entry.get('severity', 'Unknown')
+    sections = []
+    for field, title, icon in LIST_SECTIONS:
+        items = entry.get(field)
+        if items:
+            sections.append(
+                f'<h4><i class="fas {icon}"></i> {title}</h4>\n'
+                '<ul>' + ''.join(f'<li>{esc(item)}</li>' for item in items) + '</ul>'
+            )
+
+    scientific_name = entry.get('scientific_name')
+    return f"""
+        <article class="disease-card severity-{esc(severity.lower())}" id="{esc(entry['id'])}" data-index="{position}"
+                 data-plant="{esc(entry.get('plant', ''))}" data-severity="{esc(severity)}">
+          <h3>{esc(entry.get('name', 'Unknown'))}</h3>
+          {f'<p class="scientific">{esc(scientific_name)}</p>' if scientific_name else ''}
+          <p><strong>Plant:</strong> {esc(entry.get('plant', 'N/A'))}</p>
+          <p><strong>Severity:</strong> <span class="severity">{esc(severity)}</span></p>
+          <p class="description">{esc(entry.get('description', ''))}</p>
+          <details>
+            <summary>View Details</summary>
+            {''.join(sections)}
+          </details>
+        </article>"""
+
+def render_page(entries, index):
+    """Render the knowledge base page with every card pre-rendered"""
+    plant_options = ''.join(f'<option value="{html.escape(plant)}">{html.escape(plant)} ({count})</option>'
+                            for plant, count in index['plants'].items())
+    severity_options = ''.join(f'<option value="{html.escape(level)}">{html.escape(level)} ({count})</option>'
+                               for level, count in index['severities'].items())
+    cards = ''.join(render_card(position, entry) for position, entry in enumerate(entries))
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+  <head>
+    <meta charset="UTF-8" />
+    <meta http-equiv="X-UA-Compatible" content="IE=edge" />
+    <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+    <title>Plant Disease Database - KrushiAI</title>
+    <link rel="stylesheet" href="../guide/styles.css" />
+    <link rel="stylesheet" href="styles.css" />
+    <link
+      rel="stylesheet"
+      href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.4/css/all.min.css"
+    />
+  </head>
+
+  <body>
+    <!-- Generated by KrushiAI-Disease-Recognition/build_static_kb.py - do not edit by hand -->
+    <header class="header">
+      <div class="logo">
+        <h1>KrushiAI</h1>
+      </div>
+
+      <nav class="navbar">
+        <a href="../index.html">Home</a>
+        <a href="../guide/index.html">Guide</a>
+        <a href="index.html" class="active">Disease Database</a>
+        <a href="../explore/index.html" class="btn">EXPLORE NOW</a>
+      </nav>
+
+      <div class="fas fa-bars" id="menu-btn"></div>
+    </header>
+
+    <section class="kb-section">
+      <div class="heading">
+        <h1>Plant Disease Database</h1>
+        <p class="kb-subtitle">Symptoms, causes, treatment and prevention for {len(entries)} plant conditions</p>
+      </div>
+
+      <div class="kb-filters">
+        <select id="plant-filter">
+          <option value="All">All plants</option>
+          {plant_options}
+        </select>
+        <select id="severity-filter">
+          <option value="All">All severities</option>
+          {severity_options}
+        </select>
+        <input type="search" id="search-box" placeholder="Search diseases, symptoms, treatments..." />
+      </div>
+      <p class="kb-count" id="result-count">Found {len(entries)} diseases</p>
+
+      <div class="kb-grid" id="disease-grid">{cards}
+      </div>
+    </section>
+
+    <script src="script.js"></script>
+  </body>
+</html>
+"""
+
+def main():
+    """Render the knowledge base to the output directory"""
+    parser = argparse.ArgumentParser(description="Render the disease knowledge base to static HTML/JSON")
+    parser.add_argument('--output', default=os.path.join('..', 'disease-database'), help="Output directory")
+    args = parser.parse_args()
+
+    entries = load_entries()
+    index = build_search_index(entries)
+
+    os.makedirs(args.output, exist_ok=True)
+    with open(os.path.join(args.output, 'diseases.json'), 'w', encoding='utf-8') as f:
+        json.dump(entries, f, indent=2, ensure_ascii=False)
+    with open(os.path.join(args.output, 'search-index.json'), 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'), ensure_ascii=False)
+    with open(os.path.join(args.output, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(render_page(entries, index))
+
+    logger.info(f"✓ Rendered {len(entries)} diseases ({len(index['terms'])} search terms) to {args.output}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Calibrate the Two-Stage Prediction Cascade
+Runs the fast low-resolution model and the full model over the validation
+set and picks the confidence/entropy thresholds that let the fast model
+answer as many images as possible while keeping cascade accuracy within a
+tolerance of the full model. Images go through the serving preprocessing,
+and the thresholds must hold both for unrestricted predictions and for
+predictions masked to the image's plant. The result is written to
+cascade_config.json, which ModelPredictor.load_cascade_config reads.
+
+Usage:
+    python distill_student.py --image-size 64 --output fast_plant_disease_model.keras
+    python calibrate_cascade.py --fast-model fast_plant_disease_model.keras
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+import numpy as np
+import tensorflow as tf
+
+from disease_info import get_disease_info
+from utils import ImageProcessor, ModelPredictor, ends_in_softmax
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+# Calibration settings returned by collect_predictions, in order
+SETTINGS = ('unrestricted', 'plant_masked')
+
+def list_images(directory):
+    """Collect (path, label) pairs from class-named sub-folders"""
+    items = []
+    for label in sorted(os.listdir(directory)):
+        class_dir = os.path.join(directory, label)
+        if not os.path.isdir(class_dir):
+            continue
+        for name in sorted(os.listdir(class_dir)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                items.append((os.path.join(class_dir, name), label))
+    return items
+
+def prediction_stats(predictor, fast_outputs, full_outputs, labels, plants=None, fast_from_logits=False):
+    """
+    Fast-stage confidence/entropy and correctness of both stages, as served
+
+    Args:
+        predictor: ModelPredictor wrapping the full model
+        fast_outputs: Raw fast-model outputs, one row per image
+        full_outputs: Raw full-model outputs, one row per image
+        labels: Index into class_names of every image
+        plants: Plant selected for every image, or None for unrestricted predictions
+        fast_from_logits: Whether the fast model outputs logits rather than probabilities
+    """
+    fast_probs, full_probs = [], []
+    for i, (fast_row, full_row) in enumerate(zip(fast_outputs, full_outputs)):
+        fast_row = predictor._to_probabilities(fast_row, from_logits=fast_from_logits)
+        full_row = predictor._to_probabilities(full_row)
+        if plants is not None:
+            indices = predictor.get_plant_class_indices(plants[i])
+            fast_row = predictor._restrict_to_classes(fast_row, indices)
+            full_row = predictor._restrict_to_classes(full_row, indices)
+        fast_probs.append(fast_row)
+        full_probs.append(full_row)
+
+    fast_probs, full_probs = np.stack(fast_probs), np.stack(full_probs)
+    return {
+        'confidence': fast_probs.max(axis=1),
+        'entropy': -np.sum(fast_probs * np.log(fast_probs + 1e-8), axis=1),
+        'fast_correct': np.argmax(fast_probs, axis=1) == labels,
+        'full_correct': np.argmax(full_probs, axis=1) == labels
+    }
+
+def collect_predictions(predictor, fast_model, directory, batch_size):
+    """
+    Score a labelled image folder with both models using the serving pipeline
+
+    Images are decoded, enhanced and LANCZOS-resized by ImageProcessor
+    exactly as ModelPredictor.predict_image does. Statistics are returned
+    for unrestricted predictions and for predictions masked to each image's
+    plant, as served when the user picks what they are growing.
+
+    Returns:
+        List of statistics dictionaries, one per setting
+    """
+    processor = ImageProcessor(target_size=predictor.input_size)
+    fast_size = tuple(fast_model.input_shape[1:3])
+    items = [(path, label) for path, label in list_images(directory) if label in predictor.class_names]
+
+    fast_outputs, full_outputs = [], []
+    for start in range(0, len(items), batch_size):
+        images = [processor.load_image(path) for path, _ in items[start:start + batch_size]]
+        fast_batch = np.concatenate([processor.to_array(image, fast_size) for image in images])
+        full_batch = np.concatenate([processor.to_array(image) for image in images])
+        fast_outputs.append(fast_model.predict(fast_batch, verbose=0))
+        full_outputs.append(predictor.model.predict(full_batch, verbose=0))
+        if (start // batch_size) % 20 == 0:
+            logger.info(f"Scored {min(start + batch_size, len(items))}/{len(items)} images")
+
+    fast_outputs, full_outputs = np.concatenate(fast_outputs), np.concatenate(full_outputs)
+    labels = np.array([predictor.class_names.index(label) for _, label in items])
+    plants = [get_disease_info(label).get('plant') for _, label in items]
+    fast_from_logits = not ends_in_softmax(fast_model)
+    return [
+        prediction_stats(predictor, fast_outputs, full_outputs, labels, fast_from_logits=fast_from_logits),
+        prediction_stats(predictor, fast_outputs, full_outputs, labels, plants, fast_from_logits=fast_from_logits)
+    ]
+
+def choose_thresholds(settings, tolerance):
+    """
+    Grid-search the thresholds that maximise the fast-stage share
+
+    The cascade must stay within the tolerance of the full model in every
+    setting (unrestricted and plant-masked).
+
+    Returns:
+        Dictionary with the chosen thresholds and their expected effect
+    """
+    full_accuracy = [float(np.mean(stats['full_correct'])) for stats in settings]
+    best = {
+        'min_confidence': 1.0,
+        'max_entropy': 0.0,
+        'fast_fraction': 0.0,
+        'accuracy': full_accuracy
+    }
+
+    confidence = np.concatenate([stats['confidence'] for stats in settings])
+    entropy = np.concatenate([stats['entropy'] for stats in settings])
+    confidence_grid = np.unique(np.quantile(confidence, np.linspace(0, 1, 101)))
+    entropy_grid = np.unique(np.quantile(entropy, np.linspace(0, 1, 51)))
+    for min_confidence in confidence_grid:
+        for max_entropy in entropy_grid:
+            accuracy, fractions = [], []
+            for stats in settings:
+                answered_fast = (stats['confidence'] >= min_confidence) & (stats['entropy'] <= max_entropy)
+                accuracy.append(float(np.mean(np.where(answered_fast, stats['fast_correct'], stats['full_correct']))))
+                fractions.append(float(np.mean(answered_fast)))
+            fast_fraction = float(np.mean(fractions))
+            if (all(acc >= full - tolerance for acc, full in zip(accuracy, full_accuracy))
+                    and fast_fraction > best['fast_fraction']):
+                best = {
+                    'min_confidence': float(min_confidence),
+                    'max_entropy': float(max_entropy),
+                    'fast_fraction': fast_fraction,
+                    'accuracy': accuracy
+                }
+
+    best['full_accuracy'] = full_accuracy
+    return best
+
+def main():
+    """Calibrate and save the cascade configuration"""
+    parser = argparse.ArgumentParser(description="Calibrate the fast/full model cascade")
+    parser.add_argument('--fast-model', required=True, help="Small low-resolution model")
+    parser.add_argument('--full-model', default='trained_plant_disease_model.keras')
+    parser.add_argument('--data-dir', default='Dataset1', help="Dataset root with a valid/ folder")
+    parser.add_argument('--tolerance', type=float, default=0.002, help="Allowed accuracy drop vs the full model")
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--output', default='cascade_config.json')
+    args = parser.parse_args()
+
+    fast_model = tf.keras.models.load_model(args.fast_model)
+    predictor = ModelPredictor(args.full_model)
+    settings = collect_predictions(predictor, fast_model, os.path.join(args.data_dir, 'valid'), args.batch_size)
+    best = choose_thresholds(settings, args.tolerance)
+
+    config = {
+        # Relative to the configuration file, which is how load_cascade_config resolves it
+        'fast_model_path': os.path.relpath(os.path.abspath(args.fast_model),
+                                           os.path.dirname(os.path.abspath(args.output))),
+        'min_confidence': best['min_confidence'],
+        'max_entropy': best['max_entropy'],
+        'expected_fast_fraction': round(best['fast_fraction'], 4),
+        'expected_accuracy': {name: round(acc, 4) for name, acc in zip(SETTINGS, best['accuracy'])},
+        'full_model_accuracy': {name: round(acc, 4) for name, acc in zip(SETTINGS, best['full_accuracy'])}
+    }
+    with open(args.output, 'w') as f:
+        json.dump(config, f, indent=2)
+
+    logger.info(f"Fast model answers {best['fast_fraction']:.1%} of images")
+    for name, accuracy, full_accuracy in zip(SETTINGS, best['accuracy'], best['full_accuracy']):
+        logger.info(f"Cascade accuracy ({name}) {accuracy:.2%} vs full model {full_accuracy:.2%}")
+    logger.info(f"✓ Cascade configuration saved to {args.output}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,86 @@
+"""
+Client-Side Resizing Image Uploader
+Streamlit component that downscales and re-encodes a photo in the browser
+(client_uploader/index.html) so only a few hundred kilobytes travel over
+slow mobile links instead of the full camera image. The server receives the
+reduced JPEG bytes and uses them unchanged.
+"""
+
+import base64
+import hashlib
+import os
+from io import BytesIO
+from typing import List, Optional, Union
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+_COMPONENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "client_uploader")
+_client_uploader = components.declare_component("client_uploader", path=_COMPONENT_DIR)
+
+class ResizedUpload(BytesIO):
+    """Uploaded image bytes with the attributes of Streamlit's UploadedFile used by the app"""
+
+    def __init__(self, name: str, data: bytes, width: int, height: int, original_bytes: int):
+        super().__init__(data)
+        self.name = name
+        self.type = "image/jpeg" if name.lower().endswith((".jpg", ".jpeg")) else "image/png"
+        self.size = len(data)
+        self.width = width
+        self.height = height
+        self.original_bytes = original_bytes
+        # Stable per image content, like UploadedFile.file_id is per upload
+        self.file_id = hashlib.sha1(data).hexdigest()
+
+def _to_upload(value: dict) -> ResizedUpload:
+    """Rebuild an upload from the component's JSON value"""
+    return ResizedUpload(
+        name=value["name"],
+        data=base64.b64decode(value["data"]),
+        width=value["width"],
+        height=value["height"],
+        original_bytes=value["original_bytes"]
+    )
+
+def _claim(value: dict, claimed: dict) -> ResizedUpload:
+    """Upload for a component value entry, reusing the one this session already decoded"""
+    if value["data"] not in claimed:
+        claimed[value["data"]] = _to_upload(value)
+    return claimed[value["data"]]
+
+def client_image_uploader(max_side: int = 1024, quality: float = 0.85, multiple: bool = False,
+                          batch_size: int = 1, key: str = None) -> Union[Optional[ResizedUpload], List[ResizedUpload]]:
+    """
+    Render the uploader and return the resized image(s) once chosen
+
+    Args:
+        max_side: Longest side of the image after resizing in the browser
+        quality: JPEG quality used by the browser encoder (0-1)
+        multiple: Accept several images at once
+        batch_size: With multiple=True, send the photos to the app every
+            batch_size photos instead of once all are resized
+        key: Streamlit widget key
+
+    Returns:
+        With multiple=False, a ResizedUpload or None until the user picks an
+        image; with multiple=True, a (possibly empty) list of the
+        ResizedUpload received so far, each with a batch_total attribute
+        giving the number of photos in the selection (the browser sends
+        them batch by batch as they are resized)
+    """
+    value = _client_uploader(max_side=max_side, quality=quality, multiple=multiple, batch_size=batch_size,
+                             key=key, default=None)
+
+    # Streamlit resends the value on every rerun; photos already decoded are kept with the session
+    state_key = f"_client_uploads_{key}"
+    entries = (value or {}).get("files", []) if multiple else ([value] if value else [])
+    previous = st.session_state.get(state_key, {})
+    claimed = {entry["data"]: previous[entry["data"]] for entry in entries if entry["data"] in previous}
+    uploads = [_claim(entry, claimed) for entry in entries]
+    st.session_state[state_key] = claimed
+
+    if multiple:
+        for upload in uploads:
+            upload.batch_total = (value or {}).get("total", len(entries))
+        return uploads
+    return uploads[0] if uploads else None
@@ -0,0 +1,244 @@
+"""
+Full-Text Search over the Disease Knowledge Base
+Builds an inverted index once over disease names, scientific names,
+symptoms, causes and treatments, and answers ranked, typo-tolerant queries
+with plant and severity facet counts.
+
+Ranking uses BM25 with per-field weights. Misspelled words are matched via
+a symmetric-delete dictionary (as in SymSpell): every vocabulary term is
+stored under all variants with up to MAX_EDIT_DISTANCE characters deleted,
+so a query word only needs its own deletes looked up instead of being
+compared against the whole vocabulary.
+"""
+
+import math
+import re
+from bisect import bisect_left
+from collections import Counter
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from disease_info import get_all_diseases, get_disease_info
+
+# Field weights for ranking; matches in the name count most
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'scientific_name': 2.5,
+    'symptoms': 1.0,
+    'causes': 1.0,
+    'treatment': 0.8
+}
+STOP_WORDS = {'a', 'an', 'and', 'are', 'as', 'at', 'by', 'for', 'from', 'in', 'is', 'it', 'of', 'on', 'or',
+              'the', 'to', 'with'}
+MAX_EDIT_DISTANCE = 2
+# Words shorter than this only tolerate one typo, and very short words none
+MIN_LENGTH_PER_DISTANCE = {1: 4, 2: 8}
+# Score multipliers for inexact matches
+PREFIX_WEIGHT = 0.8
+FUZZY_WEIGHT = 0.6
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens without stop words"""
+    return [token for token in re.findall(r"\w+", text.lower()) if token not in STOP_WORDS]
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """All variants of a word with up to max_distance characters removed"""
+    variants = {word}
+    for distance in range(1, min(max_distance, len(word) - 1) + 1):
+        for positions in combinations(range(len(word)), distance):
+            variants.add(''.join(char for i, char in enumerate(word) if i not in positions))
+    return variants
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein (optimal string alignment) distance, capped at limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+def _allowed_distance(word: str) -> int:
+    """Typos tolerated for a query word of this length"""
+    allowed = 0
+    for distance, min_length in MIN_LENGTH_PER_DISTANCE.items():
+        if len(word) >= min_length:
+            allowed = max(allowed, distance)
+    return min(allowed, MAX_EDIT_DISTANCE)
+
+class DiseaseSearchIndex:
+    """
+    Inverted index with BM25 ranking, typo tolerance and facet counts
+    """
+
+    def __init__(self, entries: Dict[str, Dict[str, Any]], k1: float = 1.2, b: float = 0.75):
+        """
+        Args:
+            entries: Mapping of disease key to disease information dictionary
+            k1: BM25 term frequency saturation
+            b: BM25 length normalisation
+        """
+        self.k1 = k1
+        self.b = b
+        self.keys = list(entries)
+
+        # term -> {document position: field-weighted term frequency}
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.doc_lengths: List[float] = []
+        for position, key in enumerate(self.keys):
+            info = entries[key]
+            length = 0.0
+            for field, weight in FIELD_WEIGHTS.items():
+                value = info.get(field, '')
+                text = ' '.join(value) if isinstance(value, list) else value
+                tokens = tokenize(text)
+                length += weight * len(tokens)
+                for token in tokens:
+                    doc_weights = self.postings.setdefault(token, {})
+                    doc_weights[position] = doc_weights.get(position, 0.0) + weight
+            self.doc_lengths.append(length)
+
+        self.average_length = sum(self.doc_lengths) / max(len(self.doc_lengths), 1)
+        count = len(self.keys)
+        self.idf = {
+            term: math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+        self.vocabulary = sorted(self.postings)
+
+        # Symmetric-delete dictionary for typo tolerance
+        self._delete_map: Dict[str, Set[str]] = {}
+        for term in self.vocabulary:
+            for variant in _deletes(term, _allowed_distance(term)):
+                self._delete_map.setdefault(variant, set()).add(term)
+
+        # Facets: plant and severity of every document, and the documents of every value
+        self.doc_plants = [entries[key].get('plant', '') for key in self.keys]
+        self.doc_severities = [entries[key].get('severity', 'Unknown') for key in self.keys]
+        self.plants: Dict[str, List[int]] = {}
+        self.severities: Dict[str, List[int]] = {}
+        for position in range(len(self.keys)):
+            if self.doc_plants[position]:
+                self.plants.setdefault(self.doc_plants[position], []).append(position)
+            self.severities.setdefault(self.doc_severities[position], []).append(position)
+        self.plant_counts = {plant: len(docs) for plant, docs in sorted(self.plants.items())}
+        self.severity_counts = {severity: len(docs) for severity, docs in self.severities.items()}
+
+    @classmethod
+    def from_database(cls) -> "DiseaseSearchIndex":
+        """Build the index from the disease_info knowledge base"""
+        return cls({key: get_disease_info(key) for key in get_all_diseases()})
+
+    def __len__(self):
+        return len(self.keys)
+
+    def expand_term(self, word: str) -> List[Tuple[str, float]]:
+        """
+        Vocabulary terms a query word should match
+
+        Args:
+            word: Lower-case query word
+
+        Returns:
+            (term, score multiplier) pairs: the exact term, terms it is a
+            prefix of, and terms within the allowed edit distance
+        """
+        matches = {}
+        if word in self.postings:
+            matches[word] = 1.0
+
+        # Prefix matches support search-as-you-type
+        if len(word) >= 3:
+            position = bisect_left(self.vocabulary, word)
+            while position < len(self.vocabulary) and self.vocabulary[position].startswith(word):
+                matches.setdefault(self.vocabulary[position], PREFIX_WEIGHT)
+                position += 1
+
+        allowed = _allowed_distance(word)
+        if allowed and not matches:
+            candidates = set()
+            for variant in _deletes(word, allowed):
+                candidates |= self._delete_map.get(variant, set())
+            for term in candidates:
+                distance = _edit_distance(word, term, allowed)
+                if distance <= allowed:
+                    matches.setdefault(term, FUZZY_WEIGHT ** distance)
+        return list(matches.items())
+
+    def _filter_positions(self, plant: Optional[str], severity: Optional[str]) -> Optional[Set[int]]:
+        """Document positions allowed by the facet filters, or None for all"""
+        allowed = None
+        if plant:
+            allowed = set(self.plants.get(plant, []))
+        if severity:
+            by_severity = set(self.severities.get(severity, []))
+            allowed = by_severity if allowed is None else allowed & by_severity
+        return allowed
+
+    def search(self, query: str = '', plant: Optional[str] = None, severity: Optional[str] = None,
+               limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Ranked search with optional facet filters
+
+        Args:
+            query: Free-text query; empty returns every entry in database order
+            plant: Only return diseases of this plant
+            severity: Only return diseases with this severity
+            limit: Maximum number of results
+
+        Returns:
+            Dictionary with 'results' as (disease key, score) pairs, facet
+            counts over the matches, and the words that matched nothing
+        """
+        allowed = self._filter_positions(plant, severity)
+        words = tokenize(query)
+        unmatched = []
+
+        if not words:
+            positions = range(len(self.keys)) if allowed is None else sorted(allowed)
+            ranked = [(position, 0.0) for position in positions]
+        else:
+            scores: Dict[int, float] = {}
+            matched_words: Dict[int, int] = {}
+            for word in words:
+                expansions = self.expand_term(word)
+                if not expansions:
+                    unmatched.append(word)
+                    continue
+                word_scores: Dict[int, float] = {}
+                for term, multiplier in expansions:
+                    idf = self.idf[term]
+                    for position, frequency in self.postings[term].items():
+                        if allowed is not None and position not in allowed:
+                            continue
+                        norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[position] / self.average_length)
+                        score = multiplier * idf * frequency * (self.k1 + 1) / (frequency + norm)
+                        # A word counts once per document, via its best-matching term
+                        word_scores[position] = max(word_scores.get(position, 0.0), score)
+                for position, score in word_scores.items():
+                    scores[position] = scores.get(position, 0.0) + score
+                    matched_words[position] = matched_words.get(position, 0) + 1
+
+            # Documents matching every query word rank ahead of partial matches
+            ranked = sorted(scores.items(), key=lambda item: (-matched_words[item[0]], -item[1]))
+
+        plant_counts = Counter(self.doc_plants[position] for position, _ in ranked if self.doc_plants[position])
+        severity_counts = Counter(self.doc_severities[position] for position, _ in ranked)
+
+        if limit is not None:
+            ranked = ranked[:limit]
+        return {
+            'results': [(self.keys[position], score) for position, score in ranked],
+            'plant_counts': dict(sorted(plant_counts.items())),
+            'severity_counts': dict(severity_counts),
+            'unmatched': unmatched
+        }
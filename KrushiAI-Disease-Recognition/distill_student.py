@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Knowledge Distillation for the Plant Disease Classifier
+Trains a compact student CNN (depthwise-separable convolutions and global
+pooling) against the soft labels of trained_plant_disease_model.keras and
+reports accuracy, latency and size for teacher and student.
+
+The exported student takes the same input and produces the same 38-way
+softmax as the teacher, so it can be served by ModelPredictor directly:
+    KRUSHIAI_MODEL_PATH=student_plant_disease_model.keras streamlit run main.py
+
+Usage:
+    python distill_student.py --data-dir Dataset1 --epochs 10
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+NUM_CLASSES = 38
+
+def load_dataset(directory, batch_size, shuffle):
+    """Load an image folder the same way the teacher was trained"""
+    dataset = tf.keras.utils.image_dataset_from_directory(
+        directory,
+        labels="inferred",
+        label_mode="categorical",
+        color_mode="rgb",
+        batch_size=batch_size,
+        image_size=(128, 128),
+        shuffle=shuffle,
+        interpolation="bilinear"
+    )
+    # Match the normalisation applied by ImageProcessor at serving time
+    return dataset.map(lambda x, y: (x / 255.0, y)).prefetch(tf.data.AUTOTUNE)
+
+def build_student(image_size, width=1.0):
+    """
+    Build the compact student network
+
+    Args:
+        image_size: Input resolution (square)
+        width: Multiplier applied to every layer's filter count
+
+    Returns:
+        Keras model ending in a 38-way softmax
+    """
+    def filters(n):
+        return max(8, int(n * width))
+
+    inputs = tf.keras.layers.Input(shape=(image_size, image_size, 3))
+    x = tf.keras.layers.Conv2D(filters(24), 3, strides=2, padding='same', use_bias=False)(inputs)
+    x = tf.keras.layers.BatchNormalization()(x)
+    x = tf.keras.layers.ReLU()(x)
+
+    for n, stride in [(48, 1), (96, 2), (96, 1), (192, 2), (192, 1), (256, 2)]:
+        x = tf.keras.layers.SeparableConv2D(filters(n), 3, strides=stride, padding='same', use_bias=False)(x)
+        x = tf.keras.layers.BatchNormalization()(x)
+        x = tf.keras.layers.ReLU()(x)
+
+    x = tf.keras.layers.GlobalAveragePooling2D()(x)
+    x = tf.keras.layers.Dropout(0.2)(x)
+    outputs = tf.keras.layers.Dense(NUM_CLASSES, activation='softmax')(x)
+    return tf.keras.Model(inputs, outputs, name='student')
+
+def soften(probabilities, temperature):
+    """Apply a softmax temperature to a probability distribution"""
+    return tf.nn.softmax(tf.math.log(probabilities + 1e-8) / temperature)
+
+def distill(teacher, student, train_set, epochs, temperature, alpha, learning_rate):
+    """
+    Train the student on a mix of hard labels and teacher soft labels
+
+    Args:
+        alpha: Weight of the hard-label loss (1 - alpha goes to distillation)
+    """
+    image_size = student.input_shape[1]
+    optimizer = tf.keras.optimizers.Adam(learning_rate=learning_rate)
+    hard_loss_fn = tf.keras.losses.CategoricalCrossentropy()
+    soft_loss_fn = tf.keras.losses.KLDivergence()
+
+    @tf.function
+    def train_step(images, labels):
+        teacher_probs = teacher(images, training=False)
+        student_images = tf.image.resize(images, (image_size, image_size))
+        with tf.GradientTape() as tape:
+            student_probs = student(student_images, training=True)
+            hard_loss = hard_loss_fn(labels, student_probs)
+            soft_loss = soft_loss_fn(
+                soften(teacher_probs, temperature),
+                soften(student_probs, temperature)
+            ) * temperature ** 2
+            loss = alpha * hard_loss + (1 - alpha) * soft_loss
+        gradients = tape.gradient(loss, student.trainable_variables)
+        optimizer.apply_gradients(zip(gradients, student.trainable_variables))
+        return loss
+
+    for epoch in range(1, epochs + 1):
+        losses = [float(train_step(images, labels)) for images, labels in train_set]
+        logger.info(f"Epoch {epoch}/{epochs} - distillation loss: {np.mean(losses):.4f}")
+
+def evaluate_accuracy(model, dataset):
+    """Top-1 accuracy of a model on a labelled dataset"""
+    image_size = model.input_shape[1]
+    correct, total = 0, 0
+    for images, labels in dataset:
+        images = tf.image.resize(images, (image_size, image_size))
+        predictions = model(images, training=False)
+        correct += int(tf.reduce_sum(tf.cast(tf.argmax(predictions, 1) == tf.argmax(labels, 1), tf.int32)))
+        total += int(labels.shape[0])
+    return correct / max(total, 1)
+
+def measure_latency(model, batch_size=1, runs=50):
+    """Median CPU latency in milliseconds for one forward pass"""
+    image_size = model.input_shape[1]
+    batch = tf.random.uniform((batch_size, image_size, image_size, 3))
+    model(batch, training=False)  # Warm-up
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        model(batch, training=False)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+def describe(model, model_path, valid_set):
+    """Accuracy / latency / size summary for one model"""
+    with tf.device('/CPU:0'):
+        single_ms = measure_latency(model, batch_size=1)
+        batch_ms = measure_latency(model, batch_size=32, runs=10)
+    return {
+        'path': model_path,
+        'input_size': int(model.input_shape[1]),
+        'parameters': int(model.count_params()),
+        'size_mb': round(os.path.getsize(model_path) / (1024 * 1024), 2),
+        'val_accuracy': round(evaluate_accuracy(model, valid_set), 4),
+        'latency_ms': round(single_ms, 2),
+        'throughput_images_per_s': round(32 / (batch_ms / 1000), 1)
+    }
+
+def main():
+    """Distill, evaluate and export the student model"""
+    parser = argparse.ArgumentParser(description="Distill a compact student from the plant disease CNN")
+    parser.add_argument('--data-dir', default='Dataset1', help="Dataset root with train/ and valid/ folders")
+    parser.add_argument('--teacher', default='trained_plant_disease_model.keras')
+    parser.add_argument('--output', default='student_plant_disease_model.keras')
+    parser.add_argument('--report', default='student_report.json')
+    parser.add_argument('--image-size', type=int, default=128, help="Student input resolution")
+    parser.add_argument('--width', type=float, default=1.0, help="Student filter-count multiplier")
+    parser.add_argument('--epochs', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--temperature', type=float, default=4.0)
+    parser.add_argument('--alpha', type=float, default=0.1)
+    parser.add_argument('--learning-rate', type=float, default=0.001)
+    args = parser.parse_args()
+
+    train_set = load_dataset(os.path.join(args.data_dir, 'train'), args.batch_size, shuffle=True)
+    valid_set = load_dataset(os.path.join(args.data_dir, 'valid'), args.batch_size, shuffle=False)
+
+    teacher = tf.keras.models.load_model(args.teacher)
+    student = build_student(args.image_size, args.width)
+    student.summary(print_fn=logger.info)
+
+    logger.info("Distilling student...")
+    distill(teacher, student, train_set, args.epochs, args.temperature, args.alpha, args.learning_rate)
+    student.save(args.output)
+    logger.info(f"✓ Student saved to {args.output}")
+
+    logger.info("Evaluating teacher and student...")
+    report = {
+        'teacher': describe(teacher, args.teacher, valid_set),
+        'student': describe(student, args.output, valid_set),
+        'settings': vars(args)
+    }
+    report['speedup'] = round(report['teacher']['latency_ms'] / report['student']['latency_ms'], 2)
+    report['size_ratio'] = round(report['teacher']['size_mb'] / report['student']['size_mb'], 2)
+
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    logger.info(f"{'':10}{'Accuracy':>10}{'Latency':>12}{'Img/s':>10}{'Size':>10}")
+    for name in ('teacher', 'student'):
+        r = report[name]
+        logger.info(f"{name:10}{r['val_accuracy']:>10.2%}{r['latency_ms']:>10.1f}ms"
+                    f"{r['throughput_images_per_s']:>10.0f}{r['size_mb']:>8.1f}MB")
+    logger.info(f"Speed-up: {report['speedup']}x, size reduction: {report['size_ratio']}x")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
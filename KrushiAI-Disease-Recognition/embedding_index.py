@@ -0,0 +1,177 @@
+"""
+Embedding Index for Similar Case Retrieval
+Stores int8-quantized CNN embeddings of labelled reference images on disk
+and finds the nearest references to a query embedding, either exactly or
+approximately through an inverted file (IVF) of k-means clusters.
+
+Index layout (one directory):
+    meta.json       - dimensions, labels, cluster offsets
+    codes.npy       - int8 codes, rows grouped by cluster (memory-mapped)
+    scales.npy      - per-dimension dequantization scale
+    centroids.npy   - k-means cluster centres used for approximate search
+    thumbnails/     - optional <row>.jpg preview of every reference, so the
+                      index can be deployed without the dataset
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize row vectors so dot products are cosine similarities"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-8)
+
+def _kmeans(vectors: np.ndarray, n_clusters: int, iterations: int = 20, sample_size: int = 20000,
+            seed: int = 42) -> np.ndarray:
+    """Spherical k-means on a sample of the vectors; returns the centroids"""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample_size:
+        vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        for cluster in range(n_clusters):
+            members = vectors[assignment == cluster]
+            if len(members):
+                centroids[cluster] = members.mean(axis=0)
+        centroids = normalize(centroids)
+    return centroids
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = 8192) -> np.ndarray:
+    """Nearest centroid for every vector"""
+    return np.concatenate([
+        np.argmax(vectors[start:start + chunk_size] @ centroids.T, axis=1)
+        for start in range(0, len(vectors), chunk_size)
+    ])
+
+def build_index(embeddings: np.ndarray, labels: List[str], index_dir: str, n_clusters: int = 256,
+                thumbnails: Optional[List[bytes]] = None) -> Dict[str, Any]:
+    """
+    Quantize embeddings and write an index directory
+
+    Args:
+        embeddings: Float array of shape (count, dimensions)
+        labels: Class name of each reference image
+        index_dir: Output directory
+        n_clusters: Number of IVF clusters for approximate search
+        thumbnails: Optional JPEG-encoded preview of each reference image
+
+    Returns:
+        The index metadata
+    """
+    vectors = normalize(embeddings)
+    n_clusters = max(1, min(n_clusters, len(vectors)))
+
+    centroids = _kmeans(vectors, n_clusters)
+    assignment = _assign(vectors, centroids)
+    order = np.argsort(assignment, kind='stable')
+    offsets = np.searchsorted(assignment[order], np.arange(n_clusters + 1))
+
+    # Symmetric per-dimension int8 quantization
+    scales = np.maximum(np.abs(vectors).max(axis=0), 1e-8) / 127.0
+    codes = np.clip(np.round(vectors[order] / scales), -127, 127).astype(np.int8)
+
+    os.makedirs(index_dir, exist_ok=True)
+    np.save(os.path.join(index_dir, 'codes.npy'), codes)
+    np.save(os.path.join(index_dir, 'scales.npy'), scales.astype(np.float32))
+    np.save(os.path.join(index_dir, 'centroids.npy'), centroids.astype(np.float32))
+    if thumbnails is not None:
+        os.makedirs(os.path.join(index_dir, 'thumbnails'), exist_ok=True)
+        for row, i in enumerate(order):
+            with open(os.path.join(index_dir, 'thumbnails', f"{row}.jpg"), 'wb') as f:
+                f.write(thumbnails[i])
+
+    meta = {
+        'count': int(len(vectors)),
+        'dimensions': int(vectors.shape[1]),
+        'n_clusters': int(n_clusters),
+        'cluster_offsets': offsets.tolist(),
+        'labels': [labels[i] for i in order],
+        'thumbnails': thumbnails is not None
+    }
+    with open(os.path.join(index_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    return meta
+
+class EmbeddingIndex:
+    """Memory-mapped nearest-neighbour index over reference image embeddings"""
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, 'meta.json'), 'r') as f:
+            self.meta = json.load(f)
+        self.codes = np.load(os.path.join(index_dir, 'codes.npy'), mmap_mode='r')
+        self.scales = np.load(os.path.join(index_dir, 'scales.npy'))
+        self.centroids = np.load(os.path.join(index_dir, 'centroids.npy'))
+        self.offsets = np.asarray(self.meta['cluster_offsets'])
+        logger.info(f"Embedding index loaded: {self.meta['count']} references from {index_dir}")
+
+    def __len__(self):
+        return self.meta['count']
+
+    def _score_rows(self, query: np.ndarray, start: int, end: int, chunk_size: int = 16384):
+        """Similarity of the query to the rows in [start, end), in chunks"""
+        for chunk_start in range(start, end, chunk_size):
+            chunk_end = min(chunk_start + chunk_size, end)
+            yield chunk_start, self.codes[chunk_start:chunk_end].astype(np.float32) @ query
+
+    def search(self, embedding: np.ndarray, k: int = 5, mode: str = 'approximate',
+               n_probe: int = 8) -> List[Dict[str, Any]]:
+        """
+        Find the k most similar reference images
+
+        Args:
+            embedding: Query embedding (from ModelPredictor.embed)
+            k: Number of neighbours to return
+            mode: 'exact' scans every reference; 'approximate' scans only the
+                n_probe clusters closest to the query
+            n_probe: Clusters scanned in approximate mode
+
+        Returns:
+            Neighbours ordered by decreasing cosine similarity, with their
+            'label', 'thumbnail' path (or None) and 'similarity'
+        """
+        query = normalize(np.ravel(embedding))
+        # Fold the dequantization scales into the query: (codes * scales) @ q == codes @ (scales * q)
+        scaled_query = query * self.scales
+
+        if mode == 'exact':
+            ranges = [(0, len(self))]
+        else:
+            closest = np.argsort(self.centroids @ query)[::-1][:n_probe]
+            ranges = [(self.offsets[c], self.offsets[c + 1]) for c in closest]
+
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start, end in ranges:
+            for chunk_start, scores in self._score_rows(scaled_query, int(start), int(end)):
+                rows = np.arange(chunk_start, chunk_start + len(scores))
+                best_rows = np.concatenate([best_rows, rows])
+                best_scores = np.concatenate([best_scores, scores])
+                if len(best_scores) > k:
+                    keep = np.argpartition(best_scores, -k)[-k:]
+                    best_rows, best_scores = best_rows[keep], best_scores[keep]
+
+        ranking = np.argsort(best_scores)[::-1]
+        return [
+            {
+                'label': self.meta['labels'][best_rows[i]],
+                'thumbnail': self.thumbnail_path(int(best_rows[i])),
+                'similarity': float(best_scores[i])
+            }
+            for i in ranking
+        ]
+
+    def thumbnail_path(self, row: int) -> Optional[str]:
+        """Path of a reference's thumbnail, or None when the index was built without them"""
+        if not self.meta.get('thumbnails'):
+            return None
+        return os.path.join(self.index_dir, 'thumbnails', f"{row}.jpg")
@@ -51,7 +51,9 @@ def check_model_files():
         'trained_plant_disease_model.keras',
         'training_hist.json',
         'utils.py',
-        'disease_info.py'
+        'disease_info.py',
+        'disease_info.json',
+        'app_styles.css'
     ]
     
     missing_files = []
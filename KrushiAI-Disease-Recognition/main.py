@@ -21,19 +21,25 @@ try:
     import pandas as pd
     import plotly.express as px
     import plotly.graph_objects as go
+    import plotly.io as pio
     from plotly.subplots import make_subplots
+    import html
     import json
     import os
     from datetime import datetime
     from PIL import Image
     from streamlit_option_menu import option_menu
-    import base64
     from io import BytesIO
     
     # Import custom modules with error handling
     logger.info("Loading custom modules...")
     from utils import ImageProcessor, ModelPredictor, ModelAnalyzer, format_disease_name, get_severity_color, create_confidence_message
-    from disease_info import get_disease_info, get_all_diseases, get_diseases_by_plant, get_severity_stats
+    from prediction_cache import NearDuplicateCache, perceptual_hash
+    from embedding_index import EmbeddingIndex
+    from disease_search import DiseaseSearchIndex
+    from static_assets import build_static_assets, minify_css
+    from client_uploader import client_image_uploader
+    from disease_info import get_disease_info, get_all_diseases, get_all_plants, get_diseases_by_plant, get_severity_stats
     logger.info("All modules loaded successfully")
     
 except ImportError as e:
@@ -46,6 +52,30 @@ except Exception as e:
     st.error(f"Unexpected error: {str(e)}")
     st.stop()
 
+# Model served by the app; set KRUSHIAI_MODEL_PATH to serve e.g. the
+# distilled student produced by distill_student.py
+MODEL_PATH = os.environ.get("KRUSHIAI_MODEL_PATH", "trained_plant_disease_model.keras")
+
+# Optional fast/full cascade calibrated by calibrate_cascade.py
+CASCADE_CONFIG_PATH = os.environ.get("KRUSHIAI_CASCADE_CONFIG", "cascade_config.json")
+
+# Optional similar-case index built by build_embedding_index.py
+EMBEDDING_INDEX_DIR = os.environ.get("KRUSHIAI_EMBEDDING_INDEX", "embedding_index")
+
+# Public URL of the static knowledge base rendered by build_static_kb.py
+STATIC_KB_URL = os.environ.get("KRUSHIAI_STATIC_KB_URL", "")
+
+# Streamlit serves this folder at /app/static (server.enableStaticServing)
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+APP_CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_styles.css")
+
+# Longest side photos are resized to in the browser before upload; 0 uses the standard uploader
+CLIENT_RESIZE_MAX_SIDE = int(os.environ.get("KRUSHIAI_CLIENT_RESIZE_MAX_SIDE", "1024"))
+
+# Photos per forward pass in batch mode; results are shown after every batch
+BATCH_ANALYSIS_SIZE = int(os.environ.get("KRUSHIAI_BATCH_ANALYSIS_SIZE", "8"))
+BATCH_CARDS_PER_ROW = 4
+
 # ============================
 # PAGE CONFIGURATION
 # ============================
@@ -66,205 +96,19 @@ st.set_page_config(
 # CUSTOM CSS STYLING (DARK THEME)
 # ============================
 
-st.markdown("""
-<style>
-    /* Main theme colors */
-    .main {
-        background-color: #0e1117;
-        color: #fafafa;
-    }
-    
-    /* Hide Streamlit branding */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    
-    /* Custom header styling */
-    .main-header {
-        background: linear-gradient(90deg, #1e3c72, #2a5298);
-        padding: 2rem;
-        border-radius: 10px;
-        margin-bottom: 2rem;
-        text-align: center;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-    }
-    
-    .main-header h1 {
-        color: white;
-        font-size: 3rem;
-        font-weight: 700;
-        margin: 0;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-    }
-    
-    .main-header p {
-        color: #e0e6ed;
-        font-size: 1.2rem;
-        margin-top: 0.5rem;
-    }
-    
-    /* Card styling */
-    .info-card {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 1.5rem;
-        border-radius: 15px;
-        margin: 1rem 0;
-        box-shadow: 0 8px 32px 0 rgba(31, 38, 135, 0.37);
-        backdrop-filter: blur(4px);
-        border: 1px solid rgba(255, 255, 255, 0.18);
-        color: white;
-    }
-    
-    .metric-card {
-        background: rgba(255, 255, 255, 0.1);
-        padding: 1.5rem;
-        border-radius: 15px;
-        margin: 1rem 0;
-        text-align: center;
-        backdrop-filter: blur(10px);
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        transition: transform 0.3s ease;
-    }
-    
-    .metric-card:hover {
-        transform: translateY(-5px);
-    }
-    
-    /* Prediction result styling */
-    .prediction-result {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 2rem;
-        border-radius: 20px;
-        margin: 2rem 0;
-        border-left: 5px solid #4CAF50;
-        box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-    }
-    
-    .confidence-bar {
-        background: rgba(255,255,255,0.2);
-        border-radius: 10px;
-        height: 20px;
-        margin: 10px 0;
-        overflow: hidden;
-    }
-    
-    .confidence-fill {
-        height: 100%;
-        border-radius: 10px;
-        transition: width 0.5s ease;
-    }
-    
-    /* Sidebar styling */
-    .sidebar .sidebar-content {
-        background: linear-gradient(180deg, #2C3E50 0%, #34495E 100%);
-    }
-    
-    /* Button styling */
-    .stButton > button {
-        background: linear-gradient(45deg, #667eea, #764ba2);
-        color: white;
-        border: none;
-        border-radius: 25px;
-        padding: 0.75rem 2rem;
-        font-size: 1rem;
-        font-weight: 600;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.2);
-    }
-    
-    .stButton > button:hover {
-        background: linear-gradient(45deg, #764ba2, #667eea);
-        transform: translateY(-2px);
-        box-shadow: 0 6px 20px rgba(0,0,0,0.3);
-    }
-    
-    /* File uploader styling */
-    .uploadedFile {
-        border: 2px dashed #667eea;
-        border-radius: 15px;
-        padding: 2rem;
-        text-align: center;
-        background: rgba(102, 126, 234, 0.1);
-        transition: all 0.3s ease;
-    }
-    
-    /* Disease info styling */
-    .disease-info {
-        background: rgba(255, 255, 255, 0.05);
-        padding: 1.5rem;
-        border-radius: 15px;
-        margin: 1rem 0;
-        border-left: 4px solid #667eea;
-    }
-    
-    /* Statistics card */
-    .stat-card {
-        background: linear-gradient(135deg, #1e3c72, #2a5298);
-        color: white;
-        padding: 1.5rem;
-        border-radius: 15px;
-        text-align: center;
-        box-shadow: 0 8px 25px rgba(0,0,0,0.2);
-        transition: transform 0.3s ease;
-    }
-    
-    .stat-card:hover {
-        transform: scale(1.05);
-    }
-    
-    /* Success/Error message styling */
-    .success-message {
-        background: linear-gradient(135deg, #4CAF50, #45a049);
-        color: white;
-        padding: 1rem;
-        border-radius: 10px;
-        margin: 1rem 0;
-    }
-    
-    .error-message {
-        background: linear-gradient(135deg, #f44336, #da190b);
-        color: white;
-        padding: 1rem;
-        border-radius: 10px;
-        margin: 1rem 0;
-    }
-    
-    /* Animation classes */
-    @keyframes fadeIn {
-        from { opacity: 0; transform: translateY(20px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-    
-    .fade-in {
-        animation: fadeIn 0.5s ease-in-out;
-    }
-    
-    /* Progress bar styling */
-    .stProgress .st-bo {
-        background-color: #667eea;
-    }
-    
-    /* Selectbox styling */
-    .stSelectbox > div > div {
-        background-color: rgba(255, 255, 255, 0.1);
-        border-radius: 10px;
-    }
-</style>
-""", unsafe_allow_html=True)
+# The stylesheet lives in app_styles.css and is minified once per process
+@st.cache_resource
+def load_app_css():
+    """Read and minify the app stylesheet (cached)"""
+    with open(APP_CSS_PATH, "r", encoding="utf-8") as f:
+        return minify_css(f.read())
+
+st.markdown(f"<style>{load_app_css()}</style>", unsafe_allow_html=True)
 
 # ============================
 # HELPER FUNCTIONS
 # ============================
 
-@st.cache_data
-def load_image_as_base64(image_path):
-    """Load image and convert to base64 for display"""
-    try:
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    except:
-        return None
-
 @st.cache_resource
 def load_model_predictor():
     """Load the model predictor (cached)"""
@@ -272,7 +116,7 @@ def load_model_predictor():
         logger.info("Attempting to load model predictor...")
         
         # Check if model file exists first
-        model_path = "trained_plant_disease_model.keras"
+        model_path = MODEL_PATH
         if not os.path.exists(model_path):
             logger.error(f"Model file not found: {model_path}")
             st.error(f"Model file '{model_path}' not found. Please ensure the model file is in the project directory.")
@@ -290,6 +134,14 @@ def load_model_predictor():
         # Try to load the predictor
         predictor = ModelPredictor(model_path)
         logger.info("Model predictor loaded successfully")
+        
+        # Enable the two-stage cascade when it has been calibrated
+        if os.path.exists(CASCADE_CONFIG_PATH):
+            try:
+                predictor.load_cascade_config(CASCADE_CONFIG_PATH)
+            except Exception as e:
+                logger.error(f"Cascade disabled, could not load {CASCADE_CONFIG_PATH}: {str(e)}")
+        
         return predictor
         
     except Exception as e:
@@ -303,13 +155,49 @@ def load_model_predictor():
         # Provide troubleshooting information
         with st.expander("🔧 Troubleshooting Information"):
             st.write("**Possible solutions:**")
-            st.write("1. Ensure the model file 'trained_plant_disease_model.keras' exists")
+            st.write(f"1. Ensure the model file '{MODEL_PATH}' exists")
             st.write("2. Check if TensorFlow is properly installed")
             st.write("3. Verify the model file is not corrupted")
             st.write("4. Try restarting the application")
             
         return None
 
+@st.cache_resource
+def load_static_assets():
+    """Publish content-hashed display copies of the app images (cached)"""
+    try:
+        return build_static_assets(STATIC_DIR, images={'banner': 'Diseases.png'}, sample_dir='test')
+    except Exception as e:
+        logger.error(f"Error publishing static assets: {str(e)}")
+        return None
+
+@st.cache_resource
+def load_prediction_cache():
+    """Near-duplicate prediction cache shared by all sessions"""
+    return NearDuplicateCache(capacity=2048, max_distance=6)
+
+@st.cache_resource
+def load_embedding_index(dimensions):
+    """Load the similar-case embedding index if it has been built for this model's features (cached)"""
+    if not os.path.exists(os.path.join(EMBEDDING_INDEX_DIR, 'meta.json')):
+        return None
+    try:
+        index = EmbeddingIndex(EMBEDDING_INDEX_DIR)
+        if index.meta['dimensions'] != dimensions:
+            # Built with another model, e.g. the teacher while the student is served
+            logger.warning(f"Embedding index {EMBEDDING_INDEX_DIR} has {index.meta['dimensions']} dimensions, "
+                           f"the served model {dimensions}; similar cases disabled")
+            return None
+        return index
+    except Exception as e:
+        logger.error(f"Error loading embedding index: {str(e)}")
+        return None
+
+@st.cache_resource
+def load_disease_search():
+    """Build the disease knowledge base search index once (cached)"""
+    return DiseaseSearchIndex.from_database()
+
 @st.cache_resource
 def load_model_analyzer():
     """Load the model analyzer (cached)"""
@@ -332,21 +220,16 @@ def load_model_analyzer():
         # Don't show error to user as this is non-critical
         return None
 
-def create_feature_comparison_chart(features):
-    """Create a feature comparison chart"""
-    if not features:
-        return None
-    
-    # Create radar chart for image features
+# Figures are built once per distinct input and cached as plotly JSON;
+# st.cache_data keys each entry by a hash of the arguments
+
+@st.cache_data(max_entries=256)
+def build_feature_chart_json(values):
+    """Build the image feature radar chart as plotly JSON (cached)"""
     categories = ['Brightness', 'Contrast', 'Edge Density']
-    values = [
-        features.get('brightness', 0) / 255,  # Normalize brightness
-        features.get('contrast', 0) / 100,    # Normalize contrast
-        features.get('edge_density', 0) * 10  # Scale edge density
-    ]
     
     fig = go.Figure(data=go.Scatterpolar(
-        r=values,
+        r=list(values),
         theta=categories,
         fill='toself',
         name='Image Features',
@@ -366,20 +249,28 @@ def create_feature_comparison_chart(features):
         font=dict(color='white')
     )
     
-    return fig
+    return fig.to_json()
 
-def create_confidence_chart(top_predictions):
-    """Create a confidence comparison chart"""
-    if not top_predictions:
+def create_feature_comparison_chart(features):
+    """Create a feature comparison chart"""
+    if not features:
         return None
     
-    classes = [format_disease_name(pred['class']) for pred in top_predictions]
-    confidences = [pred['percentage'] for pred in top_predictions]
-    
+    # Normalize brightness and contrast, scale edge density
+    values = (
+        round(features.get('brightness', 0) / 255, 3),
+        round(features.get('contrast', 0) / 100, 3),
+        round(features.get('edge_density', 0) * 10, 3)
+    )
+    return pio.from_json(build_feature_chart_json(values))
+
+@st.cache_data(max_entries=256)
+def build_confidence_chart_json(classes, confidences):
+    """Build the top predictions bar chart as plotly JSON (cached)"""
     fig = go.Figure(data=[
         go.Bar(
-            x=confidences,
-            y=classes,
+            x=list(confidences),
+            y=list(classes),
             orientation='h',
             marker_color=['#667eea' if i == 0 else '#a8b3f0' for i in range(len(classes))],
             text=[f"{conf:.1f}%" for conf in confidences],
@@ -397,7 +288,389 @@ def create_confidence_chart(top_predictions):
         height=400
     )
     
-    return fig
+    return fig.to_json()
+
+def create_confidence_chart(top_predictions):
+    """Create a confidence comparison chart"""
+    if not top_predictions:
+        return None
+    
+    classes = tuple(format_disease_name(pred['class']) for pred in top_predictions)
+    confidences = tuple(round(pred['percentage'], 2) for pred in top_predictions)
+    return pio.from_json(build_confidence_chart_json(classes, confidences))
+
+@st.cache_data
+def build_training_history_json(history):
+    """Build the training history subplots as plotly JSON (cached per history content)"""
+    fig = make_subplots(
+        rows=1, cols=2,
+        subplot_titles=('Model Accuracy', 'Model Loss'),
+        specs=[[{"secondary_y": False}, {"secondary_y": False}]]
+    )
+    
+    epochs = list(range(1, len(history['accuracy']) + 1))
+    
+    # Accuracy plot
+    fig.add_trace(
+        go.Scatter(x=epochs, y=history['accuracy'], name='Training Accuracy', line=dict(color='#667eea')),
+        row=1, col=1
+    )
+    fig.add_trace(
+        go.Scatter(x=epochs, y=history['val_accuracy'], name='Validation Accuracy', line=dict(color='#764ba2')),
+        row=1, col=1
+    )
+    
+    # Loss plot
+    fig.add_trace(
+        go.Scatter(x=epochs, y=history['loss'], name='Training Loss', line=dict(color='#ff7b7b')),
+        row=1, col=2
+    )
+    fig.add_trace(
+        go.Scatter(x=epochs, y=history['val_loss'], name='Validation Loss', line=dict(color='#ffa07a')),
+        row=1, col=2
+    )
+    
+    fig.update_layout(
+        title="Training History",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        height=500
+    )
+    
+    return fig.to_json()
+
+@st.cache_data
+def build_severity_pie_json(severity_stats):
+    """Build the severity distribution pie chart as plotly JSON (cached)"""
+    fig_pie = px.pie(
+        values=list(severity_stats.values()),
+        names=list(severity_stats.keys()),
+        title="Disease Severity Distribution",
+        color_discrete_map={
+            'Critical': '#FF4B4B',
+            'High': '#FF8C42',
+            'Medium': '#FFD93D',
+            'Low': '#6BCF7F',
+            'None': '#4CAF50'
+        }
+    )
+    fig_pie.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white')
+    )
+    return fig_pie.to_json()
+
+def show_similar_cases(neighbours):
+    """Display the closest labelled reference images"""
+    st.markdown("### 🖼️ Similar Confirmed Cases")
+    cols = st.columns(len(neighbours))
+    for col, neighbour in zip(cols, neighbours):
+        with col:
+            if neighbour['thumbnail'] and os.path.exists(neighbour['thumbnail']):
+                st.image(neighbour['thumbnail'], use_column_width=True)
+            st.caption(f"{format_disease_name(neighbour['label'])} · {neighbour['similarity']:.0%} similar")
+
+def show_tiled_results(tiled, class_names):
+    """Display the disease map and summary of a tiled field photo analysis"""
+    st.markdown("---")
+    st.markdown("<h3 style='color: #667eea;'>🗺️ Field Disease Map</h3>", unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Tiles Analyzed", tiled['total_tiles'])
+    with col2:
+        st.metric("Confident Tiles", tiled['confident_tiles'],
+                  help=f"Tiles classified with at least {tiled['min_confidence']:.0%} confidence")
+    with col3:
+        st.metric("Diseased Area", f"{tiled['diseased_share']:.0%}")
+    
+    # Signed score per tile: positive for disease, negative for healthy, scaled by confidence
+    labels = [[format_disease_name(class_names[idx]) for idx in class_row] for class_row in tiled['class_map']]
+    scores = [
+        [conf if not class_names[idx].endswith('healthy') else -conf for idx, conf in zip(class_row, conf_row)]
+        for class_row, conf_row in zip(tiled['class_map'], tiled['confidence_map'])
+    ]
+    fig = go.Figure(data=go.Heatmap(
+        z=scores,
+        text=labels,
+        hovertemplate="%{text}<extra></extra>",
+        colorscale=[[0, '#4CAF50'], [0.5, '#FFD93D'], [1, '#FF4B4B']],
+        zmin=-1,
+        zmax=1,
+        showscale=False
+    ))
+    fig.update_layout(
+        title="Disease by Image Region (red = diseased, green = healthy)",
+        yaxis=dict(autorange='reversed', showticklabels=False),
+        xaxis=dict(showticklabels=False),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        height=450
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    if tiled['summary']:
+        st.markdown("### 📋 Conditions Found")
+        for item in tiled['summary']:
+            st.write(f"• **{format_disease_name(item['class'])}** - {item['tiles']} tiles "
+                     f"({item['share']:.0%} of the field, {item['mean_confidence']:.0%} average confidence)")
+    else:
+        st.warning("⚠️ No tile could be classified confidently. Try a closer photo.")
+
+def decode_image(uploaded_file, processor, preview_side=None):
+    """
+    Decode an upload into its browser preview and a downscaled working copy
+    
+    The full-resolution photo is only held while the two are made.
+    """
+    with Image.open(uploaded_file) as image:
+        image.load()
+        return {
+            'file_id': uploaded_file.file_id,
+            'image': processor.make_working_copy(image),
+            'preview': processor.make_preview(image, max_side=preview_side)
+        }
+
+def decode_upload(uploaded_file, processor):
+    """Decode an upload once per file and keep it in the session"""
+    upload = st.session_state.get('decoded_upload')
+    if upload is None or upload['file_id'] != uploaded_file.file_id:
+        upload = decode_image(uploaded_file, processor)
+        st.session_state.decoded_upload = upload
+    return upload
+
+def prepare_upload(uploaded_file, upload, processor, skip_quality_check=False, with_features=False):
+    """
+    Quality gate and preprocessing shared by single and batch uploads
+    
+    Args:
+        uploaded_file: Uploaded image file
+        upload: The decoded upload (see decode_image)
+        processor: ImageProcessor for the predictor's input size
+        skip_quality_check: Accept the photo even if it fails the quality gate
+        with_features: Also extract the image features shown on the results page
+        
+    Returns:
+        Dictionary with 'quality' for a rejected photo, otherwise the
+        preprocessed 'image' and its 'features'
+    """
+    # Save uploaded file temporarily
+    temp_path = f"temp_{uploaded_file.file_id}_{os.path.basename(uploaded_file.name)}"
+    with open(temp_path, "wb") as f:
+        f.write(uploaded_file.getvalue())
+    
+    try:
+        # Reject unusable photos before running the model
+        if not skip_quality_check:
+            quality = processor.assess_quality(temp_path)
+            if not quality['passed']:
+                return {'quality': quality}
+        
+        # Process the image decoded for the preview instead of decoding it again
+        return {
+            'image': processor.prepare_image(upload['image']),
+            'features': processor.extract_features(temp_path) if with_features else {}
+        }
+    finally:
+        # Clean up temp file
+        os.remove(temp_path)
+
+def predict_cached(predictor, images, plant=None, use_tta=False, with_embeddings=False):
+    """
+    Predict preprocessed images, reusing results for recent near-duplicates
+    
+    Cache misses are predicted together with ModelPredictor.predict_images,
+    so the model runs once for all of them. With with_embeddings, results
+    carry the 'embedding' of the same forward pass; a cached result made
+    without one gets it from ModelPredictor.embed.
+    
+    Returns:
+        List of prediction dictionaries, one per image
+    """
+    prediction_cache = load_prediction_cache()
+    cache_context = (plant, use_tta)
+    hashes = [perceptual_hash(image) for image in images]
+    results = [prediction_cache.lookup(image_hash, cache_context) for image_hash in hashes]
+    
+    misses = [i for i, result in enumerate(results) if result is None]
+    if misses:
+        predictions = predictor.predict_images([images[i] for i in misses], plant=plant, tta=use_tta,
+                                               with_embeddings=with_embeddings)
+        for i, result in zip(misses, predictions):
+            prediction_cache.store(hashes[i], result, cache_context)
+            results[i] = result
+    
+    if with_embeddings:
+        processor = ImageProcessor(target_size=predictor.input_size)
+        for i, result in enumerate(results):
+            if result.get('embedding') is None:
+                results[i] = dict(result, embedding=predictor.embed(processor.to_array(images[i]))[0])
+    return results
+
+def analyze_upload(uploaded_file, upload, processor, predictor, plant=None, skip_quality_check=False,
+                   use_tta=False, tiled=False, with_embedding=False):
+    """
+    Run one photo through the quality gate and then the prediction cache and
+    model cascade, or tiled analysis for field photos
+    
+    With with_embedding, the result also carries the photo's 'embedding'
+    for the similar-case search.
+    
+    Returns:
+        Dictionary with 'quality' for a rejected photo, 'tiled' for tiled
+        analysis, or 'result', 'image' and 'features'
+    """
+    analysis = prepare_upload(uploaded_file, upload, processor, skip_quality_check=skip_quality_check,
+                              with_features=not tiled)
+    if 'quality' in analysis:
+        return analysis
+    if tiled:
+        return {'tiled': predictor.predict_tiled(analysis['image'], plant=plant)}
+    analysis['result'] = predict_cached(predictor, [analysis['image']], plant=plant, use_tta=use_tta,
+                                        with_embeddings=with_embedding)[0]
+    return analysis
+
+def show_batch_card(file_name, preview, analysis):
+    """Compact result card for one photo of a batch"""
+    st.image(preview, use_column_width=True)
+    if 'quality' in analysis:
+        issues = ', '.join(issue.replace('_', ' ') for issue in analysis['quality']['issues'])
+        st.markdown(f"""
+        <div class="disease-info" style="border-left: 4px solid #FFD93D; padding: 0.75rem;">
+            <p style="margin: 0; opacity: 0.7; font-size: 0.85rem;">{html.escape(file_name)}</p>
+            <p style="margin: 0.25rem 0; font-weight: bold;">📷 Please retake</p>
+            <p style="margin: 0; font-size: 0.9rem;">{html.escape(issues)}</p>
+        </div>
+        """, unsafe_allow_html=True)
+        return
+    
+    primary = analysis['result']['primary_prediction']
+    severity = get_disease_info(primary['class']).get('severity', 'Unknown')
+    severity_color = get_severity_color(severity)
+    st.markdown(f"""
+    <div class="disease-info" style="border-left: 4px solid {severity_color}; padding: 0.75rem;">
+        <p style="margin: 0; opacity: 0.7; font-size: 0.85rem;">{html.escape(file_name)}</p>
+        <p style="margin: 0.25rem 0; font-weight: bold;">{format_disease_name(primary['class'])}</p>
+        <p style="margin: 0; font-size: 0.9rem;">{primary['percentage']:.1f}% ·
+           <span style="color: {severity_color};">{severity}</span></p>
+    </div>
+    """, unsafe_allow_html=True)
+
+def analyze_batch(uploaded_files, processor, predictor, plant=None, skip_quality_check=False, use_tta=False):
+    """
+    Analyze a group of photos with one batched prediction
+    
+    Every photo passes the quality gate and the prediction cache first; the
+    remaining photos are predicted together (see predict_cached).
+    
+    Returns:
+        (results, failed): dictionaries keyed by file_id with the photo's
+        'name', 'preview' and 'analysis', and the names of unreadable files
+    """
+    results, failed, pending = {}, [], []
+    for uploaded_file in uploaded_files:
+        try:
+            uploaded_file.seek(0)
+            upload = decode_image(uploaded_file, processor, preview_side=320)
+            analysis = prepare_upload(uploaded_file, upload, processor, skip_quality_check=skip_quality_check)
+        except Exception as e:
+            logger.warning(f"Could not analyze {uploaded_file.name}: {str(e)}")
+            failed.append(uploaded_file.name)
+            continue
+        results[uploaded_file.file_id] = {'name': uploaded_file.name, 'preview': upload['preview'], 'analysis': {}}
+        if 'quality' in analysis:
+            results[uploaded_file.file_id]['analysis']['quality'] = analysis['quality']
+        else:
+            pending.append((uploaded_file.file_id, analysis['image']))
+    
+    if pending:
+        predictions = predict_cached(predictor, [image for _, image in pending], plant=plant, use_tta=use_tta)
+        for (file_id, _), result in zip(pending, predictions):
+            results[file_id]['analysis']['result'] = result
+    return results, failed
+
+def show_batch_analysis(uploaded_files, predictor, plant=None, skip_quality_check=False, use_tta=False):
+    """
+    Analyze several photos in batches, showing each batch's results as soon as it is done
+    
+    Photos go through the same quality gate, prediction cache and model
+    cascade as a single upload, BATCH_ANALYSIS_SIZE at a time. Results are
+    kept in the session, so photos that arrive later (the client-side
+    uploader sends them as they are resized) only add their own analysis.
+    
+    Args:
+        uploaded_files: Uploaded image files received so far
+        predictor: Loaded ModelPredictor
+        plant: Optional plant to restrict the diagnosis to
+        skip_quality_check: Analyze photos even if they fail the quality gate
+        use_tta: Re-check low confidence results with test-time augmentation
+    """
+    # Photos still being resized and uploaded in the browser count towards the total
+    total = max([len(uploaded_files)] + [getattr(uploaded_file, 'batch_total', 0) for uploaded_file in uploaded_files])
+    options = (plant, skip_quality_check, use_tta)
+    previous = st.session_state.get('batch_results', {})
+    results = {
+        uploaded_file.file_id: previous[uploaded_file.file_id]
+        for uploaded_file in uploaded_files
+        if uploaded_file.file_id in previous and previous[uploaded_file.file_id]['options'] == options
+    }
+    st.session_state.batch_results = results
+    
+    st.markdown("---")
+    processor = ImageProcessor(target_size=predictor.input_size)
+    progress = st.progress(len(results) / total, text=f"Analyzed {len(results)} of {total} images")
+    failed = []
+    columns = []
+    shown = 0
+    
+    for start in range(0, len(uploaded_files), BATCH_ANALYSIS_SIZE):
+        group = uploaded_files[start:start + BATCH_ANALYSIS_SIZE]
+        new_files = [uploaded_file for uploaded_file in group if uploaded_file.file_id not in results]
+        if new_files:
+            analyzed, group_failed = analyze_batch(new_files, processor, predictor, plant=plant,
+                                                   skip_quality_check=skip_quality_check, use_tta=use_tta)
+            for item in analyzed.values():
+                # Only what the cards and summary need is kept between reruns
+                item['options'] = options
+            results.update(analyzed)
+            failed.extend(group_failed)
+            progress.progress(len(results) / total, text=f"Analyzed {len(results)} of {total} images")
+        
+        for uploaded_file in group:
+            if uploaded_file.file_id not in results:
+                continue
+            if shown % BATCH_CARDS_PER_ROW == 0:
+                columns = st.columns(BATCH_CARDS_PER_ROW)
+            item = results[uploaded_file.file_id]
+            with columns[shown % BATCH_CARDS_PER_ROW]:
+                show_batch_card(item['name'], item['preview'], item['analysis'])
+            shown += 1
+    
+    if failed:
+        st.warning(f"⚠️ Could not read {len(failed)} file(s): {', '.join(failed)}")
+    diagnoses = {}
+    for item in results.values():
+        if 'result' in item['analysis']:
+            label = format_disease_name(item['analysis']['result']['primary_prediction']['class'])
+            diagnoses[label] = diagnoses.get(label, 0) + 1
+    if diagnoses:
+        st.markdown("### 📋 Batch Summary")
+        summary = pd.DataFrame(sorted(diagnoses.items(), key=lambda item: -item[1]), columns=["Diagnosis", "Images"])
+        st.dataframe(summary, hide_index=True, use_container_width=True)
+
+def show_quality_feedback(quality):
+    """Explain why an image was rejected by the quality gate"""
+    tips = ''.join(f"<li>{tip}</li>" for tip in quality['feedback'])
+    st.markdown(f"""
+    <div class="error-message">
+        <h3>📷 This photo can't be analyzed reliably</h3>
+        <ul>{tips}</ul>
+        <p>Please retake the photo, or tick "Skip image quality check" to analyze it anyway.</p>
+    </div>
+    """, unsafe_allow_html=True)
 
 def display_model_performance():
     """Display model performance metrics"""
@@ -446,41 +719,7 @@ def display_model_performance():
         
         # Training history chart
         if analyzer.history:
-            fig = make_subplots(
-                rows=1, cols=2,
-                subplot_titles=('Model Accuracy', 'Model Loss'),
-                specs=[[{"secondary_y": False}, {"secondary_y": False}]]
-            )
-            
-            epochs = list(range(1, len(analyzer.history['accuracy']) + 1))
-            
-            # Accuracy plot
-            fig.add_trace(
-                go.Scatter(x=epochs, y=analyzer.history['accuracy'], name='Training Accuracy', line=dict(color='#667eea')),
-                row=1, col=1
-            )
-            fig.add_trace(
-                go.Scatter(x=epochs, y=analyzer.history['val_accuracy'], name='Validation Accuracy', line=dict(color='#764ba2')),
-                row=1, col=1
-            )
-            
-            # Loss plot
-            fig.add_trace(
-                go.Scatter(x=epochs, y=analyzer.history['loss'], name='Training Loss', line=dict(color='#ff7b7b')),
-                row=1, col=2
-            )
-            fig.add_trace(
-                go.Scatter(x=epochs, y=analyzer.history['val_loss'], name='Validation Loss', line=dict(color='#ffa07a')),
-                row=1, col=2
-            )
-            
-            fig.update_layout(
-                title="Training History",
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white'),
-                height=500
-            )
+            fig = pio.from_json(build_training_history_json(analyzer.history))
             
             st.plotly_chart(fig, use_container_width=True)
         
@@ -563,6 +802,10 @@ def show_home_page():
             </p>
         </div>
         """, unsafe_allow_html=True)
+        
+        assets = load_static_assets()
+        if assets and assets.url('banner'):
+            st.markdown(assets.img_tag('banner', alt="Plant diseases recognised by KrushiAI", style="width: 100%; border-radius: 15px;"), unsafe_allow_html=True)
     
     st.markdown("---")
     
@@ -620,23 +863,7 @@ def show_home_page():
         
         with col1:
             # Severity distribution pie chart
-            fig_pie = px.pie(
-                values=list(severity_stats.values()),
-                names=list(severity_stats.keys()),
-                title="Disease Severity Distribution",
-                color_discrete_map={
-                    'Critical': '#FF4B4B',
-                    'High': '#FF8C42',
-                    'Medium': '#FFD93D',
-                    'Low': '#6BCF7F',
-                    'None': '#4CAF50'
-                }
-            )
-            fig_pie.update_layout(
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white')
-            )
+            fig_pie = pio.from_json(build_severity_pie_json(severity_stats))
             st.plotly_chart(fig_pie, use_container_width=True)
         
         with col2:
@@ -684,6 +911,9 @@ def show_home_page():
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+# Interactive pages run as fragments: widget changes rerun only the page,
+# not the header, styles and navigation menu
+@st.fragment
 def show_detection_page():
     """Display the disease detection page"""
     st.markdown('<div class="fade-in">', unsafe_allow_html=True)
@@ -700,46 +930,110 @@ def show_detection_page():
     # Image upload
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        uploaded_file = st.file_uploader(
-            "Choose an image...",
-            type=["jpg", "jpeg", "png"],
-            help="Upload a clear image of the plant leaf or affected area"
+        batch_mode = st.toggle(
+            "📚 Analyze several photos at once",
+            help="Upload many photos and see the results appear batch by batch"
         )
-    
-    if uploaded_file is not None:
-        # Display uploaded image
+        uploaded_file = None
+        uploaded_files = []
+        if CLIENT_RESIZE_MAX_SIDE > 0:
+            # Photos are shrunk in the browser before upload
+            if batch_mode:
+                uploaded_files = client_image_uploader(max_side=CLIENT_RESIZE_MAX_SIDE, multiple=True,
+                                                       batch_size=BATCH_ANALYSIS_SIZE, key="client_uploader_batch")
+            else:
+                uploaded_file = client_image_uploader(max_side=CLIENT_RESIZE_MAX_SIDE, key="client_uploader")
+        elif batch_mode:
+            uploaded_files = st.file_uploader(
+                "Choose images...",
+                type=["jpg", "jpeg", "png"],
+                accept_multiple_files=True,
+                help="Upload clear images of plant leaves or affected areas"
+            )
+        else:
+            uploaded_file = st.file_uploader(
+                "Choose an image...",
+                type=["jpg", "jpeg", "png"],
+                help="Upload a clear image of the plant leaf or affected area"
+            )
+        
+        # Optional crop restriction
+        plant_options = ["Not sure (check all plants)"] + get_all_plants()
+        growing = st.selectbox(
+            "🌱 I'm growing:",
+            plant_options,
+            help="Restrict the diagnosis to diseases of this plant for more focused results"
+        )
+        selected_plant = None if growing == plant_options[0] else growing
+    
+        if batch_mode:
+            # Batch photos are analyzed as they arrive, so the options come before the upload
+            option_col1, option_col2 = st.columns(2)
+            with option_col1:
+                batch_skip_quality_check = st.checkbox(
+                    "Skip image quality check",
+                    key="batch_skip_quality_check",
+                    help="Analyze photos even if they look blurry, badly exposed or do not show a leaf"
+                )
+            with option_col2:
+                batch_use_tta = st.checkbox(
+                    "Double-check uncertain results",
+                    key="batch_use_tta",
+                    help="When confidence is low, re-analyze flipped, rotated and cropped views of the image and "
+                         "combine them (slower, as ten extra views are analyzed)"
+                )
+    
+    if uploaded_files:
+        show_batch_analysis(uploaded_files, predictor, selected_plant,
+                            skip_quality_check=batch_skip_quality_check, use_tta=batch_use_tta)
+    elif uploaded_file is not None:
+        processor = ImageProcessor(target_size=predictor.input_size)
+        upload = decode_upload(uploaded_file, processor)
+        
+        # Display a downscaled preview instead of shipping the full photo back
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
-            image = Image.open(uploaded_file)
-            st.image(image, caption="Uploaded Image", use_column_width=True)
+            st.image(upload['preview'], caption="Uploaded Image", use_column_width=True)
         
-        # Analysis buttons
+        # Analysis options are submitted together with the Analyze button
         col1, col2, col3 = st.columns([1, 1, 1])
         with col2:
-            analyze_btn = st.button("🔍 Analyze Image", use_container_width=True)
+            with st.form("analysis_options", border=False):
+                skip_quality_check = st.checkbox(
+                    "Skip image quality check",
+                    help="Analyze the image even if it looks blurry, badly exposed or does not show a leaf"
+                )
+                tiled_mode = st.checkbox(
+                    "Field photo with many leaves",
+                    help="Split large canopy photos into overlapping tiles and map where each disease appears"
+                )
+                use_tta = st.checkbox(
+                    "Double-check uncertain results",
+                    help="When confidence is low, re-analyze flipped, rotated and cropped views of the image and "
+                         "combine them (slower, as ten extra views are analyzed)"
+                )
+                analyze_btn = st.form_submit_button("🔍 Analyze Image", use_container_width=True)
         
         if analyze_btn:
             with st.spinner("🧠 AI is analyzing your image..."):
                 try:
-                    # Save uploaded file temporarily
-                    temp_path = f"temp_{uploaded_file.name}"
-                    with open(temp_path, "wb") as f:
-                        f.write(uploaded_file.getvalue())
-                    
-                    # Process image
-                    processor = ImageProcessor()
-                    image_array = processor.preprocess_image(temp_path)
-                    features = processor.extract_features(temp_path)
-                    
-                    # Make prediction
-                    result = predictor.predict(image_array)
+                    embedding_index = load_embedding_index(predictor.feature_dimensions)
+                    analysis = analyze_upload(uploaded_file, upload, processor, predictor, plant=selected_plant,
+                                              skip_quality_check=skip_quality_check, use_tta=use_tta,
+                                              tiled=tiled_mode, with_embedding=embedding_index is not None)
+                    if 'quality' in analysis:
+                        show_quality_feedback(analysis['quality'])
+                        st.markdown('</div>', unsafe_allow_html=True)
+                        return
+                    if 'tiled' in analysis:
+                        show_tiled_results(analysis['tiled'], predictor.class_names)
+                        st.markdown('</div>', unsafe_allow_html=True)
+                        return
+                    result, features = analysis['result'], analysis['features']
                     
                     # Get disease information
                     disease_info = get_disease_info(result['primary_prediction']['class'])
                     
-                    # Clean up temp file
-                    os.remove(temp_path)
-                    
                     # Display results
                     st.markdown("---")
                     
@@ -759,9 +1053,21 @@ def show_detection_page():
                                  background: linear-gradient(90deg, #4CAF50, #45a049);"></div>
                         </div>
                         <p style="text-align: center; margin-top: 0.5rem;">Confidence: {primary['percentage']:.1f}%</p>
+                        {f'<p style="text-align: center; opacity: 0.8;">Restricted to {selected_plant} diseases</p>' if selected_plant else ''}
                     </div>
                     """, unsafe_allow_html=True)
                     
+                    if 'cache_hit' in result:
+                        st.caption("♻️ This photo was analyzed recently, showing the earlier result")
+                    if 'tta' in result:
+                        tta = result['tta']
+                        st.caption(f"🔁 Low confidence result re-checked on {tta['views']} views of the image "
+                                   f"({tta['agreement']:.0%} of views agree)")
+                    if result.get('cascade_stage') == 'fast':
+                        st.caption("⚡ Answered by the fast model")
+                    elif predictor.fast_model is not None:
+                        st.caption("🧠 Escalated to the full model for a closer look")
+                    
                     # Disease information and recommendations
                     col1, col2 = st.columns(2)
                     
@@ -856,11 +1162,18 @@ def show_detection_page():
                             disease_name = format_disease_name(pred['class'])
                             st.write(f"{i+1}. **{disease_name}** - {pred['percentage']:.1f}% confidence")
                     
+                    # Visual evidence from the labelled reference set, searched with the prediction's own features
+                    if embedding_index is not None:
+                        show_similar_cases(embedding_index.search(result['embedding'], k=4))
+                    
                 except Exception as e:
                     st.error(f"An error occurred during analysis: {str(e)}")
                     st.error("Please try uploading a different image or contact support.")
     
     else:
+        st.session_state.pop('decoded_upload', None)
+        st.session_state.pop('batch_results', None)
+        
         # Instructions for better results
         st.markdown("""
         <div class="info-card">
@@ -890,15 +1203,19 @@ def show_detection_page():
                     if os.path.exists(sample_path):
                         col1, col2, col3 = st.columns([1, 2, 1])
                         with col2:
-                            sample_image = Image.open(sample_path)
-                            st.image(sample_image, caption=f"Sample: {selected_sample}", use_column_width=True)
+                            assets = load_static_assets()
+                            asset_name = f"samples/{selected_sample}"
+                            if assets and assets.url(asset_name):
+                                st.markdown(assets.img_tag(asset_name, alt=selected_sample, style="width: 100%; border-radius: 10px;"), unsafe_allow_html=True)
+                                st.caption(f"Sample: {selected_sample}")
+                            else:
+                                st.image(Image.open(sample_path), caption=f"Sample: {selected_sample}", use_column_width=True)
                             
                             if st.button("🔍 Analyze Sample Image", use_container_width=True):
                                 with st.spinner("🧠 AI is analyzing the sample image..."):
                                     try:
-                                        processor = ImageProcessor()
-                                        image_array = processor.preprocess_image(sample_path)
-                                        result = predictor.predict(image_array)
+                                        processor = ImageProcessor(target_size=predictor.input_size)
+                                        result = predictor.predict_image(processor.load_image(sample_path))
                                         disease_info = get_disease_info(result['primary_prediction']['class'])
                                         
                                         primary = result['primary_prediction']
@@ -922,6 +1239,7 @@ def show_analytics_page():
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+@st.fragment
 def show_database_page():
     """Display the disease database page"""
     st.markdown('<div class="fade-in">', unsafe_allow_html=True)
@@ -929,48 +1247,52 @@ def show_database_page():
     st.markdown("<h2 style='text-align: center; color: #667eea;'>📚 Plant Disease Database</h2>", unsafe_allow_html=True)
     st.markdown("<p style='text-align: center; font-size: 1.1rem; margin-bottom: 2rem;'>Comprehensive database of plant diseases with detailed information</p>", unsafe_allow_html=True)
     
+    if STATIC_KB_URL:
+        st.markdown(f"<p style='text-align: center;'>⚡ Prefer a faster page? <a href='{STATIC_KB_URL}' target='_blank'>Browse the static database</a></p>", unsafe_allow_html=True)
+    
+    search_index = load_disease_search()
+    
     # Search and filter options
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        # Plant type filter
-        plant_types = ['All'] + list(set([info.get('plant', '') for info in [get_disease_info(disease) for disease in get_all_diseases()] if info.get('plant')]))
-        selected_plant = st.selectbox("Filter by Plant Type:", plant_types)
+        # Plant type filter with precomputed counts
+        plant_types = ['All'] + list(search_index.plant_counts)
+        selected_plant = st.selectbox(
+            "Filter by Plant Type:", plant_types,
+            format_func=lambda plant: plant if plant == 'All' else f"{plant} ({search_index.plant_counts[plant]})"
+        )
     
     with col2:
         # Severity filter
         severity_levels = ['All', 'Critical', 'High', 'Medium', 'Low', 'None']
-        selected_severity = st.selectbox("Filter by Severity:", severity_levels)
+        selected_severity = st.selectbox(
+            "Filter by Severity:", severity_levels,
+            format_func=lambda level: level if level == 'All' else f"{level} ({search_index.severity_counts.get(level, 0)})"
+        )
     
     with col3:
         # Search box
-        search_term = st.text_input("🔍 Search diseases:", placeholder="Enter disease name...")
-    
-    # Get filtered diseases
-    all_diseases = get_all_diseases()
-    filtered_diseases = []
+        search_term = st.text_input("🔍 Search diseases:", placeholder="Name, symptom, cause or treatment...")
     
-    for disease_key in all_diseases:
-        disease_info = get_disease_info(disease_key)
-        
-        # Apply filters
-        if selected_plant != 'All' and disease_info.get('plant', '') != selected_plant:
-            continue
-        if selected_severity != 'All' and disease_info.get('severity', '') != selected_severity:
-            continue
-        if search_term and search_term.lower() not in disease_info.get('name', '').lower():
-            continue
-        
-        filtered_diseases.append((disease_key, disease_info))
+    # Ranked, typo-tolerant search over the inverted index
+    search = search_index.search(
+        search_term,
+        plant=None if selected_plant == 'All' else selected_plant,
+        severity=None if selected_severity == 'All' else selected_severity
+    )
+    matching_keys = [disease_key for disease_key, _ in search['results']]
+    if search['unmatched']:
+        st.caption(f"No matches for: {', '.join(search['unmatched'])}")
     
     # Display results count
-    st.markdown(f"<p style='text-align: center; margin: 1rem 0;'>Found {len(filtered_diseases)} diseases</p>", unsafe_allow_html=True)
+    st.markdown(f"<p style='text-align: center; margin: 1rem 0;'>Found {len(matching_keys)} diseases</p>", unsafe_allow_html=True)
     
     # Display diseases in a grid
-    if filtered_diseases:
+    if matching_keys:
         # Create pagination
         diseases_per_page = 12
-        total_pages = (len(filtered_diseases) - 1) // diseases_per_page + 1
+        total_pages = (len(matching_keys) - 1) // diseases_per_page + 1
         
         if 'page' not in st.session_state:
             st.session_state.page = 1
@@ -978,19 +1300,23 @@ def show_database_page():
         # Pagination controls
         col1, col2, col3, col4, col5 = st.columns(5)
         with col3:
-            page = st.selectbox("Page:", range(1, total_pages + 1), index=st.session_state.page - 1)
+            page = st.selectbox("Page:", range(1, total_pages + 1), index=min(st.session_state.page, total_pages) - 1)
             st.session_state.page = page
         
         # Calculate start and end indices
         start_idx = (page - 1) * diseases_per_page
-        end_idx = min(start_idx + diseases_per_page, len(filtered_diseases))
+        end_idx = min(start_idx + diseases_per_page, len(matching_keys))
+        
+        # Fetch full entries only for the current page
+        page_diseases = {disease_key: get_disease_info(disease_key) for disease_key in matching_keys[start_idx:end_idx]}
         
         # Display diseases for current page
         for i in range(start_idx, end_idx, 3):
             cols = st.columns(3)
             for j, col in enumerate(cols):
                 if i + j < end_idx:
-                    disease_key, disease_info = filtered_diseases[i + j]
+                    disease_key = matching_keys[i + j]
+                    disease_info = page_diseases[disease_key]
                     
                     with col:
                         severity_color = get_severity_color(disease_info.get('severity', 'Unknown'))
@@ -1242,7 +1568,7 @@ def run_app():
         logger.info(f"Streamlit version: {st.__version__}")
         
         # Check critical files exist
-        critical_files = ['utils.py', 'disease_info.py', 'trained_plant_disease_model.keras']
+        critical_files = ['utils.py', 'disease_info.py', MODEL_PATH]
         missing_files = [f for f in critical_files if not os.path.exists(f)]
         
         if missing_files:
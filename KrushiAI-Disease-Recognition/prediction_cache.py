@@ -0,0 +1,137 @@
+"""
+Near-Duplicate Prediction Cache
+Reuses earlier predictions for photos that were re-compressed or resized
+(e.g. forwarded through messaging apps) by matching perceptual hashes
+within a Hamming distance instead of exact bytes.
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+def perceptual_hash(image: Image.Image, hash_size: int = 8) -> int:
+    """
+    Compute a DCT-based perceptual hash (pHash)
+
+    Args:
+        image: PIL Image object
+        hash_size: Side of the low-frequency DCT block; yields hash_size**2 bits
+
+    Returns:
+        Hash as a Python integer
+    """
+    side = hash_size * 4
+    gray = np.asarray(image.convert('L').resize((side, side), Image.LANCZOS), dtype=np.float32)
+    low_freq = cv2.dct(gray)[:hash_size, :hash_size]
+    # The DC term only reflects overall brightness, so leave it out of the median
+    median = np.median(low_freq.flatten()[1:])
+    bits = (low_freq > median).flatten()
+    return int(''.join('1' if bit else '0' for bit in bits), 2)
+
+def hamming_distance(hash_a: int, hash_b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return bin(hash_a ^ hash_b).count('1')
+
+class NearDuplicateCache:
+    """
+    Bounded LRU cache of prediction results keyed by perceptual hash
+
+    Lookups use a multi-index hash table: the hash is split into
+    max_distance + 1 chunks, and by the pigeonhole principle any hash within
+    max_distance bits agrees exactly with the query on at least one chunk.
+    Only entries sharing a chunk are compared, so lookups stay fast as the
+    cache grows, and evicting old uploads is a constant-time operation.
+    """
+
+    def __init__(self, capacity: int = 2048, max_distance: int = 6, hash_bits: int = 64):
+        self.capacity = capacity
+        self.max_distance = max_distance
+        self.hash_bits = hash_bits
+        self.hits = 0
+        self.misses = 0
+
+        boundaries = np.linspace(0, hash_bits, max_distance + 2).astype(int)
+        self._chunks = [(int(start), int(end - start)) for start, end in zip(boundaries[:-1], boundaries[1:])]
+        self._tables: List[Dict[int, set]] = [{} for _ in self._chunks]
+        self._entries: "OrderedDict[Tuple[int, Hashable], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _chunk_values(self, image_hash: int) -> List[int]:
+        """Split a hash into the chunk values used as table keys"""
+        return [(image_hash >> start) & ((1 << length) - 1) for start, length in self._chunks]
+
+    def lookup(self, image_hash: int, context: Hashable = None) -> Optional[Dict[str, Any]]:
+        """
+        Find the closest cached result within max_distance
+
+        Args:
+            image_hash: Perceptual hash of the query image
+            context: Prediction settings the result must have been made with
+
+        Returns:
+            Copy of the cached result with a 'cache_hit' entry, or None
+        """
+        with self._lock:
+            candidates = set()
+            for table, value in zip(self._tables, self._chunk_values(image_hash)):
+                candidates |= table.get(value, set())
+
+            best_key, best_distance = None, self.max_distance + 1
+            for key in candidates:
+                if key[1] != context:
+                    continue
+                distance = hamming_distance(image_hash, key[0])
+                if distance < best_distance:
+                    best_key, best_distance = key, distance
+
+            if best_key is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(best_key)
+            result = copy.deepcopy(self._entries[best_key])
+
+        result['cache_hit'] = {'distance': best_distance}
+        return result
+
+    def store(self, image_hash: int, result: Dict[str, Any], context: Hashable = None):
+        """
+        Cache a prediction result, evicting the least recently used entry when full
+
+        Args:
+            image_hash: Perceptual hash of the analyzed image
+            result: Prediction dictionary from ModelPredictor
+            context: Prediction settings the result was made with
+        """
+        key = (image_hash, context)
+        with self._lock:
+            if key not in self._entries:
+                for table, value in zip(self._tables, self._chunk_values(image_hash)):
+                    table.setdefault(value, set()).add(key)
+            self._entries[key] = copy.deepcopy(result)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.capacity:
+                old_key, _ = self._entries.popitem(last=False)
+                for table, value in zip(self._tables, self._chunk_values(old_key[0])):
+                    bucket = table.get(value)
+                    if bucket is not None:
+                        bucket.discard(old_key)
+                        if not bucket:
+                            del table[value]
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache size and hit statistics"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
@@ -0,0 +1,145 @@
+"""
+Static Asset Publishing
+Writes display-sized copies of the app's images into the Streamlit static
+folder (served at /app/static when server.enableStaticServing is on) under
+content-hashed file names, and records them in a manifest.
+
+Streamlit serves that folder with Tornado's StaticFileHandler, which sends an
+ETag for every file and a long Cache-Control max-age when the URL carries a
+``v`` query argument. Because a file name changes whenever its content does,
+browsers can keep each asset for good and only download what changed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, features
+
+logger = logging.getLogger(__name__)
+
+STATIC_URL_PREFIX = "app/static"
+MANIFEST_NAME = "manifest.json"
+
+class StaticAssets:
+    """Content-hashed image assets in the Streamlit static folder"""
+
+    def __init__(self, static_dir: str, url_prefix: str = STATIC_URL_PREFIX):
+        self.static_dir = static_dir
+        self.url_prefix = url_prefix
+        self.manifest: Dict[str, Dict] = {}
+        # WebP is far smaller than PNG/JPEG for these photos; fall back if Pillow lacks it
+        self.image_format = "WEBP" if features.check("webp") else "JPEG"
+
+    def _encode(self, image: Image.Image, max_size: Optional[Tuple[int, int]], quality: int) -> bytes:
+        """Downscale and re-encode an image for display"""
+        image = image.copy()
+        if max_size:
+            image.thumbnail(max_size, Image.LANCZOS)
+        if self.image_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        buffer = BytesIO()
+        if self.image_format == "WEBP":
+            image.save(buffer, format="WEBP", quality=quality, method=4)
+        else:
+            image.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+        return buffer.getvalue()
+
+    def publish_image(self, name: str, source_path: str, max_size: Optional[Tuple[int, int]] = None,
+                      quality: int = 80) -> Dict:
+        """
+        Publish an image under a content-hashed file name
+
+        Args:
+            name: Logical asset name used with url()
+            source_path: Original image file
+            max_size: Bounding box for the display copy
+            quality: Encoder quality
+
+        Returns:
+            Manifest entry of the asset
+        """
+        with Image.open(source_path) as image:
+            data = self._encode(image, max_size, quality)
+            with Image.open(BytesIO(data)) as encoded:
+                width, height = encoded.size
+
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        extension = "webp" if self.image_format == "WEBP" else "jpg"
+        file_name = f"{stem}.{digest}.{extension}"
+
+        path = os.path.join(self.static_dir, file_name)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(data)
+
+        entry = {"file": file_name, "hash": digest, "width": width, "height": height, "bytes": len(data)}
+        self.manifest[name] = entry
+        return entry
+
+    def url(self, name: str) -> Optional[str]:
+        """Cache-busting URL of a published asset, or None if it is unknown"""
+        entry = self.manifest.get(name)
+        if entry is None:
+            return None
+        return f"{self.url_prefix}/{entry['file']}?v={entry['hash']}"
+
+    def img_tag(self, name: str, alt: str = "", style: str = "width: 100%;") -> str:
+        """HTML <img> element for a published asset with its intrinsic size"""
+        entry = self.manifest[name]
+        return (f'<img src="{self.url(name)}" alt="{alt}" width="{entry["width"]}" height="{entry["height"]}" '
+                f'loading="lazy" style="{style} height: auto;">')
+
+    def write_manifest(self):
+        """Save the manifest and delete stale hashed files"""
+        current = {entry["file"] for entry in self.manifest.values()}
+        for file_name in os.listdir(self.static_dir):
+            if file_name != MANIFEST_NAME and file_name not in current:
+                os.remove(os.path.join(self.static_dir, file_name))
+        with open(os.path.join(self.static_dir, MANIFEST_NAME), "w") as f:
+            json.dump(self.manifest, f, indent=2)
+
+def build_static_assets(static_dir: str, images: Dict[str, str] = None, sample_dir: str = None,
+                        image_max_size: Tuple[int, int] = (1024, 1024),
+                        sample_max_size: Tuple[int, int] = (480, 480)) -> StaticAssets:
+    """
+    Publish the app's images to the static folder
+
+    Args:
+        static_dir: Streamlit static folder (next to the main script)
+        images: Mapping of logical name to image path, e.g. {'banner': 'Diseases.png'}
+        sample_dir: Folder of sample images, published as 'samples/<file name>'
+        image_max_size: Bounding box for the named images
+        sample_max_size: Bounding box for sample thumbnails
+
+    Returns:
+        StaticAssets with the manifest of everything published
+    """
+    os.makedirs(static_dir, exist_ok=True)
+    assets = StaticAssets(static_dir)
+
+    for name, path in (images or {}).items():
+        if os.path.exists(path):
+            assets.publish_image(name, path, image_max_size)
+
+    if sample_dir and os.path.isdir(sample_dir):
+        for file_name in sorted(os.listdir(sample_dir)):
+            if file_name.lower().endswith(('.jpg', '.jpeg', '.png')):
+                assets.publish_image(f"samples/{file_name}", os.path.join(sample_dir, file_name), sample_max_size)
+
+    assets.write_manifest()
+    total = sum(entry["bytes"] for entry in assets.manifest.values())
+    logger.info(f"Published {len(assets.manifest)} static assets ({total / 1024:.0f} KB) to {static_dir}")
+    return assets
+
+def minify_css(css: str) -> str:
+    """Strip comments and redundant whitespace from a stylesheet"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};:,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
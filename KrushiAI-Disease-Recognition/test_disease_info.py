@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for rebuilding the disease knowledge base database from its JSON file
+Run with: python -m pytest test_disease_info.py
+"""
+
+import os
+import threading
+
+import pytest
+
+import disease_info
+
+def entry(name):
+    return {'name': name, 'plant': 'Tomato', 'severity': 'High', 'symptoms': ['Lesions on leaves']}
+
+@pytest.fixture
+def knowledge_base(tmp_path, monkeypatch):
+    """Point the module at a JSON file and database in a temporary directory"""
+    json_path, db_path = str(tmp_path / "disease_info.json"), str(tmp_path / "disease_info.db")
+    monkeypatch.setattr(disease_info, "KB_JSON_PATH", json_path)
+    monkeypatch.setattr(disease_info, "KB_DB_PATH", db_path)
+    monkeypatch.setattr(disease_info, "_verified", None)
+    monkeypatch.setattr(disease_info, "_local", threading.local())
+    disease_info.write_json({'Tomato___Late_blight': entry('Late Blight')}, 1, json_path)
+    return json_path, db_path
+
+def test_database_is_built_on_first_lookup(knowledge_base):
+    _, db_path = knowledge_base
+    assert disease_info.get_disease_info('Tomato___Late_blight')['name'] == 'Late Blight'
+    assert os.path.exists(db_path)
+
+def test_changed_json_with_old_mtime_is_rebuilt(knowledge_base):
+    """A new JSON whose modification time is older than the database still replaces it"""
+    json_path, db_path = knowledge_base
+    disease_info.get_disease_info('Tomato___Late_blight')
+    old_time = os.stat(json_path).st_mtime_ns
+
+    disease_info.write_json({'Tomato___Late_blight': entry('Tomato Late Blight')}, 2, json_path)
+    os.utime(json_path, ns=(old_time, old_time))
+    assert os.stat(json_path).st_mtime_ns < os.stat(db_path).st_mtime_ns
+    assert disease_info.get_disease_info('Tomato___Late_blight')['name'] == 'Tomato Late Blight'
+    assert disease_info.get_knowledge_base_version() == '2'
+
+def test_fresh_process_checks_content(knowledge_base):
+    """A database built from other content is replaced even if it is newer than the JSON"""
+    _, db_path = knowledge_base
+    disease_info.build_database({'Tomato___Late_blight': entry('Stale')}, db_path, 1, "stale")
+    assert disease_info.get_disease_info('Tomato___Late_blight')['name'] == 'Late Blight'
+
+def test_touched_json_is_not_rebuilt(knowledge_base):
+    """A newer modification time alone re-checks the hash but keeps the database"""
+    json_path, db_path = knowledge_base
+    disease_info.get_disease_info('Tomato___Late_blight')
+    built = os.stat(db_path).st_ino
+
+    os.utime(json_path)
+    assert disease_info.get_disease_info('Tomato___Late_blight')['name'] == 'Late Blight'
+    assert os.stat(db_path).st_ino == built
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the disease knowledge base search
+Run with: python -m pytest test_disease_search.py
+"""
+
+import pytest
+
+from disease_search import DiseaseSearchIndex, _edit_distance, tokenize
+
+ENTRIES = {
+    'Tomato___Late_blight': {
+        'name': 'Late Blight', 'plant': 'Tomato', 'severity': 'Critical',
+        'symptoms': ['Dark water-soaked lesions on leaves'], 'treatment': ['Copper fungicide']
+    },
+    'Tomato___Early_blight': {
+        'name': 'Early Blight', 'plant': 'Tomato', 'severity': 'High',
+        'symptoms': ['Concentric rings on older leaves'], 'treatment': ['Remove infected leaves']
+    },
+    'Grape___Black_rot': {
+        'name': 'Black Rot', 'plant': 'Grape', 'severity': 'High',
+        'symptoms': ['Brown circular lesions, fruit mummifies'], 'causes': ['Fungus favoured by late rain']
+    },
+    'Apple___healthy': {
+        'name': 'Healthy Apple', 'plant': 'Apple', 'severity': 'None',
+        'symptoms': ['No lesions']
+    }
+}
+
+@pytest.fixture(scope="module")
+def index():
+    return DiseaseSearchIndex(ENTRIES)
+
+def keys(result):
+    return [key for key, _ in result['results']]
+
+def test_tokenize_drops_stop_words():
+    assert tokenize("Lesions on the Leaves, and fruit") == ['lesions', 'leaves', 'fruit']
+
+def test_edit_distance_counts_transpositions_once():
+    assert _edit_distance("blight", "bligth", 2) == 1
+    assert _edit_distance("blight", "flight", 2) == 1
+    assert _edit_distance("blight", "rot", 2) == 3
+
+def test_name_match_outranks_body_match(index):
+    """A word in the disease name ranks above the same word in another field"""
+    assert keys(index.search("late"))[:2] == ['Tomato___Late_blight', 'Grape___Black_rot']
+
+def test_documents_matching_every_word_come_first(index):
+    """All-word matches rank ahead of entries matching only some words"""
+    ranked = keys(index.search("late blight"))
+    assert ranked[0] == 'Tomato___Late_blight'
+    assert set(ranked[1:]) == {'Tomato___Early_blight', 'Grape___Black_rot'}
+
+def test_typos_are_corrected(index):
+    """Misspelled words within the allowed edit distance still match"""
+    assert keys(index.search("bligth"))[:2] == keys(index.search("blight"))[:2]
+    assert keys(index.search("fungicde")) == ['Tomato___Late_blight']
+    assert index.search("bligth")['unmatched'] == []
+
+def test_short_words_need_exact_or_prefix_match(index):
+    """Very short words get no typo tolerance, but prefixes match while typing"""
+    assert index.search("rat")['unmatched'] == ['rat']
+    assert keys(index.search("bla")) == ['Grape___Black_rot']
+
+def test_typo_scores_below_exact_match(index):
+    exact = dict(index.search("blight")['results'])
+    fuzzy = dict(index.search("bligth")['results'])
+    assert fuzzy['Tomato___Late_blight'] < exact['Tomato___Late_blight']
+
+def test_unknown_words_are_reported(index):
+    result = index.search("xyzzyq")
+    assert result['results'] == []
+    assert result['unmatched'] == ['xyzzyq']
+
+def test_facet_filters_and_counts(index):
+    """Facet counts cover every match; filters narrow the results"""
+    result = index.search("lesions")
+    assert result['plant_counts'] == {'Apple': 1, 'Grape': 1, 'Tomato': 1}
+    assert keys(index.search("lesions", plant='Grape')) == ['Grape___Black_rot']
+    assert keys(index.search("", severity='High')) == ['Tomato___Early_blight', 'Grape___Black_rot']
+
+def test_knowledge_base_search():
+    """The bundled knowledge base finds both late blights despite a typo"""
+    ranked = keys(DiseaseSearchIndex.from_database().search("late bligth", limit=2))
+    assert sorted(ranked) == ['Potato___Late_blight', 'Tomato___Late_blight']
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the near-duplicate prediction cache
+Run with: python -m pytest test_prediction_cache.py
+"""
+
+import os
+from io import BytesIO
+
+from PIL import Image
+
+from prediction_cache import NearDuplicateCache, hamming_distance, perceptual_hash
+
+TEST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test")
+
+def load(name):
+    return Image.open(os.path.join(TEST_DIR, name)).convert('RGB')
+
+def recompress(image, quality=40, scale=0.6):
+    """Resize and re-encode an image the way messaging apps do"""
+    small = image.resize((int(image.width * scale), int(image.height * scale)), Image.LANCZOS)
+    buffer = BytesIO()
+    small.save(buffer, format='JPEG', quality=quality)
+    return Image.open(BytesIO(buffer.getvalue())).convert('RGB')
+
+def test_recompressed_photo_hashes_close():
+    """A resized, re-encoded copy stays within the cache's distance; another photo does not"""
+    original = perceptual_hash(load("AppleScab1.JPG"))
+    assert hamming_distance(original, perceptual_hash(recompress(load("AppleScab1.JPG")))) <= 6
+    assert hamming_distance(original, perceptual_hash(load("CornCommonRust1.JPG"))) > 6
+
+def test_near_duplicate_hit_and_miss():
+    """Near-duplicates hit the cached result, unrelated photos miss"""
+    cache = NearDuplicateCache(capacity=16, max_distance=6)
+    original = perceptual_hash(load("AppleScab1.JPG"))
+    cache.store(original, {'primary_prediction': {'class': 'Apple___Apple_scab'}})
+
+    hit = cache.lookup(perceptual_hash(recompress(load("AppleScab1.JPG"))))
+    assert hit['primary_prediction']['class'] == 'Apple___Apple_scab'
+    assert hit['cache_hit']['distance'] <= 6
+    assert cache.lookup(perceptual_hash(load("CornCommonRust1.JPG"))) is None
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+def test_every_hash_within_distance_hits():
+    """Flipping up to max_distance bits anywhere still finds the entry"""
+    cache = NearDuplicateCache(capacity=16, max_distance=6)
+    image_hash = 0x0123456789ABCDEF
+    cache.store(image_hash, {'value': 1})
+    for bits in ([0], [63], [0, 10, 20, 30, 40, 63], list(range(58, 64))):
+        query = image_hash
+        for bit in bits:
+            query ^= 1 << bit
+        assert cache.lookup(query) is not None
+    assert cache.lookup(image_hash ^ 0b1111111) is None
+
+def test_context_must_match():
+    """Results made with other settings (plant, TTA) are not reused"""
+    cache = NearDuplicateCache()
+    cache.store(42, {'value': 1}, context=('Tomato', False))
+    assert cache.lookup(42, context=('Tomato', False)) is not None
+    assert cache.lookup(42, context=(None, False)) is None
+
+def test_least_recently_used_entry_is_evicted():
+    """A full cache drops the entry looked up least recently"""
+    cache = NearDuplicateCache(capacity=2, max_distance=2)
+    first, second, third = 0, (1 << 64) - 1, 0x00000000FFFFFFFF
+    cache.store(first, {'value': 1})
+    cache.store(second, {'value': 2})
+    cache.lookup(first)
+    cache.store(third, {'value': 3})
+    assert cache.lookup(second) is None
+    assert cache.lookup(first)['value'] == 1
+    assert cache.stats()['entries'] == 2
+
+def test_cached_results_are_copies():
+    """Changing a returned or stored result does not change the cache"""
+    cache = NearDuplicateCache()
+    result = {'top_predictions': [{'class': 'a'}]}
+    cache.store(7, result)
+    result['top_predictions'].append({'class': 'b'})
+    cache.lookup(7)['top_predictions'].clear()
+    assert cache.lookup(7)['top_predictions'] == [{'class': 'a'}]
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Tests for ModelPredictor output handling and the analyses built on it
+Run with: python -m pytest test_predictor.py
+"""
+
+import os
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+tf = pytest.importorskip("tensorflow")
+
+from utils import ImageProcessor, ModelPredictor, ends_in_softmax
+from video_scanner import VideoScanner
+
+MODEL_PATH = "trained_plant_disease_model.keras"
+TEST_IMAGE = os.path.join("test", "AppleCedarRust1.JPG")
+
+@pytest.fixture(scope="module")
+def trained_predictor():
+    """ModelPredictor for the trained model, when it is present"""
+    if not os.path.exists(MODEL_PATH):
+        pytest.skip(f"{MODEL_PATH} not found")
+    return ModelPredictor(MODEL_PATH)
+
+def save_model(path, activation):
+    """Save a tiny image classifier with 38 outputs"""
+    model = tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(32, 32, 3)),
+        tf.keras.layers.GlobalAveragePooling2D(),
+        tf.keras.layers.Dense(38, activation=activation)
+    ])
+    model.save(path)
+    return model
+
+def test_ends_in_softmax():
+    """Softmax activations and Softmax layers are detected, logits are not"""
+    dense = tf.keras.Sequential([tf.keras.layers.Input(shape=(4,)), tf.keras.layers.Dense(3, activation='softmax')])
+    layer = tf.keras.Sequential([tf.keras.layers.Input(shape=(4,)), tf.keras.layers.Dense(3), tf.keras.layers.Softmax()])
+    logits = tf.keras.Sequential([tf.keras.layers.Input(shape=(4,)), tf.keras.layers.Dense(3)])
+    assert ends_in_softmax(dense)
+    assert ends_in_softmax(layer)
+    assert not ends_in_softmax(logits)
+
+def test_softmax_outputs_are_served_unchanged(tmp_path):
+    """A model ending in softmax is not passed through softmax a second time"""
+    path = str(tmp_path / "softmax.keras")
+    model = save_model(path, 'softmax')
+    predictor = ModelPredictor(path)
+    assert predictor.outputs_probabilities
+
+    image = np.random.default_rng(0).random((1, 32, 32, 3), dtype=np.float32)
+    expected = model.predict(image, verbose=0)[0]
+    result = predictor.predict(image)
+    np.testing.assert_allclose(result['all_probabilities'], expected, rtol=1e-5)
+
+def test_logit_outputs_get_softmax(tmp_path):
+    """Logit outputs are turned into a distribution"""
+    path = str(tmp_path / "logits.keras")
+    save_model(path, None)
+    predictor = ModelPredictor(path)
+    assert not predictor.outputs_probabilities
+
+    probabilities = predictor._to_probabilities(np.array([2.0, 0.0, -1.0]))
+    np.testing.assert_allclose(probabilities, tf.nn.softmax([2.0, 0.0, -1.0]).numpy(), rtol=1e-6)
+    assert probabilities.sum() == pytest.approx(1.0)
+
+def test_explicit_flag_overrides_detection(tmp_path):
+    """outputs_probabilities set by the caller is not replaced by detection"""
+    path = str(tmp_path / "logits.keras")
+    save_model(path, None)
+    predictor = ModelPredictor(path, outputs_probabilities=True)
+    outputs = np.array([0.7, 0.2, 0.1], dtype=np.float32)
+    np.testing.assert_array_equal(predictor._to_probabilities(outputs), outputs)
+
+def save_constant_model(path, top_logit):
+    """Save a tiny classifier that always favours class 0 by top_logit"""
+    tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(32, 32, 3)),
+        tf.keras.layers.GlobalAveragePooling2D(),
+        tf.keras.layers.Dense(38, activation='softmax', kernel_initializer='zeros',
+                              bias_initializer=tf.keras.initializers.Constant([top_logit] + [0.0] * 37))
+    ]).save(path)
+
+def test_tta_only_runs_when_uncertain(tmp_path):
+    """Confident predictions skip test-time augmentation, uncertain ones get it"""
+    image = Image.fromarray(np.random.default_rng(0).integers(0, 256, (32, 32, 3), dtype=np.uint8))
+
+    save_constant_model(str(tmp_path / "sure.keras"), 10.0)
+    sure = ModelPredictor(str(tmp_path / "sure.keras")).predict_image(image, tta=True)
+    assert sure['primary_prediction']['confidence'] > ModelPredictor.TTA_MAX_CONFIDENCE
+    assert 'tta' not in sure
+
+    save_constant_model(str(tmp_path / "unsure.keras"), 1.0)
+    unsure = ModelPredictor(str(tmp_path / "unsure.keras")).predict_image(image, tta=True)
+    assert unsure['primary_prediction']['confidence'] < ModelPredictor.TTA_MAX_CONFIDENCE
+    assert 'tta' in unsure
+
+def test_predict_images_matches_single_predictions(tmp_path):
+    """Batched predictions equal one predict_image call per image"""
+    path = str(tmp_path / "softmax.keras")
+    save_model(path, 'softmax')
+    predictor = ModelPredictor(path)
+    rng = np.random.default_rng(0)
+    images = [Image.fromarray(rng.integers(0, 256, (40, 40, 3), dtype=np.uint8)) for _ in range(5)]
+
+    batched = predictor.predict_images(images, plant='Tomato')
+    for image, result in zip(images, batched):
+        single = predictor.predict_image(image, plant='Tomato')
+        np.testing.assert_allclose(result['all_probabilities'], single['all_probabilities'], atol=1e-6)
+        assert result['cascade_stage'] == 'full'
+
+def test_embeddings_come_from_the_prediction_pass(tmp_path):
+    """Predictions made with embeddings match plain ones and carry embed()'s features"""
+    path = str(tmp_path / "softmax.keras")
+    save_model(path, 'softmax')
+    predictor = ModelPredictor(path)
+    image_arrays = np.random.default_rng(0).random((3, 32, 32, 3), dtype=np.float32)
+
+    plain = predictor.predict_batch(image_arrays)
+    embedded = predictor.predict_batch(image_arrays, with_embeddings=True)
+    features = predictor.embed(image_arrays)
+    for i, (expected, result) in enumerate(zip(plain, embedded)):
+        np.testing.assert_allclose(result['all_probabilities'], expected['all_probabilities'], atol=1e-6)
+        np.testing.assert_allclose(result['embedding'], features[i], atol=1e-6)
+    assert 'embedding' not in plain[0]
+
+def test_tiled_confidence_uses_served_scale(tmp_path):
+    """A model that is sure of every tile yields confident tiles and a summary"""
+    path = str(tmp_path / "sure.keras")
+    save_constant_model(path, 10.0)
+    predictor = ModelPredictor(path)
+
+    image = Image.fromarray(np.random.default_rng(0).integers(0, 256, (96, 96, 3), dtype=np.uint8))
+    tiled = predictor.predict_tiled(image)
+    assert tiled['confident_tiles'] == tiled['total_tiles']
+    assert tiled['summary'][0]['class'] == predictor.class_names[0]
+    assert tiled['summary'][0]['mean_confidence'] > 0.99
+
+def test_tiled_real_photo_has_confident_tiles(trained_predictor):
+    """Tiles of a real leaf photo reach the confidence threshold"""
+    image = ImageProcessor(target_size=trained_predictor.input_size).load_image(TEST_IMAGE)
+    tiled = trained_predictor.predict_tiled(image)
+    assert tiled['confident_tiles'] >= 1
+    assert tiled['summary']
+
+def write_video(path, image_paths, frames_per_image=10, fps=10):
+    """Write a video showing each image for frames_per_image frames"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (256, 256))
+    for image_path in image_paths:
+        frame = cv2.resize(cv2.imread(image_path), (256, 256))
+        for _ in range(frames_per_image):
+            writer.write(frame)
+    writer.release()
+
+def test_video_scan_builds_segments(tmp_path):
+    """Frames a model is sure of are merged into a segment"""
+    path = str(tmp_path / "sure.keras")
+    save_constant_model(path, 10.0)
+    video_path = str(tmp_path / "row.avi")
+    write_video(video_path, [os.path.join("test", f"AppleCedarRust{i}.JPG") for i in range(1, 5)])
+
+    result = VideoScanner(ModelPredictor(path), batch_size=4).scan(video_path)
+    assert result['frames_analyzed'] >= 1
+    assert len(result['segments']) == 1
+    assert result['segments'][0]['frames'] == result['frames_analyzed']
+
+def test_video_scan_real_frames_build_segment(trained_predictor, tmp_path):
+    """Real leaf frames run through the trained model yield at least one segment"""
+    video_path = str(tmp_path / "row.avi")
+    write_video(video_path, [os.path.join("test", f"TomatoYellowCurlVirus{i}.JPG") for i in range(1, 7)])
+
+    result = VideoScanner(trained_predictor, batch_size=4).scan(video_path)
+    assert result['segments']
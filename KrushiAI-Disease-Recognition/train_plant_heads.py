@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Train per-plant specialist heads for crop-restricted disease detection
+Each head is a small classifier over the shared CNN backbone features
+(the 1500-unit Dense layer), covering only one plant's classes.
+
+Usage:
+    python train_plant_heads.py --data-dir Dataset1 --epochs 5
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+import numpy as np
+import tensorflow as tf
+
+from disease_info import get_all_plants
+from utils import ModelPredictor, plant_slug
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def load_features(predictor, directory, class_names, batch_size):
+    """Extract backbone features for the images of the given classes"""
+    dataset = tf.keras.utils.image_dataset_from_directory(
+        directory,
+        labels="inferred",
+        label_mode="int",
+        class_names=class_names,
+        color_mode="rgb",
+        batch_size=batch_size,
+        image_size=(128, 128),
+        shuffle=False,
+        interpolation="bilinear"
+    )
+    # Match the normalisation applied by ImageProcessor at serving time
+    dataset = dataset.map(lambda x, y: (x / 255.0, y))
+
+    extractor = predictor._get_feature_extractor()
+    features, labels = [], []
+    for images, batch_labels in dataset:
+        features.append(extractor.predict(images, verbose=0))
+        labels.append(batch_labels.numpy())
+    return np.concatenate(features), np.concatenate(labels)
+
+def build_head(input_dim, num_classes):
+    """Build a small classification head over backbone features, outputting logits"""
+    head = tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(input_dim,)),
+        tf.keras.layers.Dropout(0.3),
+        tf.keras.layers.Dense(128, activation='relu'),
+        tf.keras.layers.Dense(num_classes)
+    ])
+    head.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=0.001),
+        loss=tf.keras.losses.SparseCategoricalCrossentropy(from_logits=True),
+        metrics=['accuracy']
+    )
+    return head
+
+def train_plant_head(predictor, plant, data_dir, output_dir, epochs, batch_size):
+    """Train and save the head for one plant; returns validation accuracy"""
+    indices = predictor.get_plant_class_indices(plant)
+    class_names = [predictor.class_names[idx] for idx in indices]
+    if len(class_names) < 2:
+        logger.info(f"Skipping {plant}: only one class, masking is exact")
+        return None
+
+    logger.info(f"Training head for {plant} ({len(class_names)} classes)")
+    x_train, y_train = load_features(predictor, os.path.join(data_dir, 'train'), class_names, batch_size)
+    x_valid, y_valid = load_features(predictor, os.path.join(data_dir, 'valid'), class_names, batch_size)
+
+    head = build_head(x_train.shape[1], len(class_names))
+    head.fit(x_train, y_train, validation_data=(x_valid, y_valid), epochs=epochs, batch_size=64, verbose=2)
+    _, val_accuracy = head.evaluate(x_valid, y_valid, verbose=0)
+
+    head_path = os.path.join(output_dir, f"{plant_slug(plant)}.keras")
+    head.save(head_path)
+    logger.info(f"✓ {plant}: validation accuracy {val_accuracy:.4f} -> {head_path}")
+    return val_accuracy
+
+def main():
+    """Train heads for every plant with more than one class"""
+    parser = argparse.ArgumentParser(description="Train per-plant specialist heads")
+    parser.add_argument('--data-dir', default='Dataset1', help="Dataset root with train/ and valid/ folders")
+    parser.add_argument('--model', default='trained_plant_disease_model.keras', help="Backbone model path")
+    parser.add_argument('--output-dir', default=ModelPredictor.PLANT_HEADS_DIR, help="Where to save the heads")
+    parser.add_argument('--plants', nargs='*', help="Only train heads for these plants")
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=64)
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    predictor = ModelPredictor(args.model)
+
+    results = {}
+    for plant in args.plants or get_all_plants():
+        results[plant] = train_plant_head(predictor, plant, args.data_dir, args.output_dir, args.epochs, args.batch_size)
+
+    logger.info("=" * 50)
+    for plant, accuracy in results.items():
+        logger.info(f"{plant}: {'skipped' if accuracy is None else f'{accuracy:.2%}'}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Update the Disease Knowledge Base
+Validates a knowledge base JSON file, makes it the new disease_info.json and
+swaps it into the SQLite store read by disease_info.py, so running apps serve
+the new content on their next lookup without a code deploy. Can also export
+the current store to JSON.
+
+Usage:
+    python update_disease_kb.py import new_disease_info.json --version 2
+    python update_disease_kb.py export current.json
+"""
+
+import argparse
+import json
+import logging
+import sys
+
+import disease_info
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def import_knowledge_base(json_path, version=None):
+    """Make a JSON knowledge base the source file and load it into the SQLite store"""
+    diseases, file_version = disease_info.load_json(json_path)
+    version = version if version is not None else file_version
+    current = disease_info.get_knowledge_base_version()
+    # The database is rebuilt from disease_info.json whenever its content differs,
+    # so the import has to land there as well or it would be overwritten
+    disease_info.validate_diseases(diseases)
+    source_hash = disease_info.write_json(diseases, version, disease_info.KB_JSON_PATH)
+    count = disease_info.build_database(diseases, disease_info.KB_DB_PATH, version, source_hash)
+    logger.info(f"✓ Knowledge base updated from v{current} to v{version} ({count} diseases)")
+    return True
+
+def export_knowledge_base(json_path):
+    """Write the current SQLite store back to JSON"""
+    diseases = {key: disease_info.get_disease_info(key) for key in disease_info.get_all_diseases()}
+    version = disease_info.get_knowledge_base_version()
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'diseases': diseases}, f, indent=2, ensure_ascii=False)
+    logger.info(f"✓ Exported {len(diseases)} diseases (v{version}) to {json_path}")
+    return True
+
+def main():
+    """Import or export the knowledge base from the command line"""
+    parser = argparse.ArgumentParser(description="Update or export the disease knowledge base")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    import_parser = subparsers.add_parser('import', help="Replace the knowledge base with a JSON file")
+    import_parser.add_argument('json_path')
+    import_parser.add_argument('--version', help="Version to record (defaults to the file's 'version')")
+    export_parser = subparsers.add_parser('export', help="Export the knowledge base to a JSON file")
+    export_parser.add_argument('json_path')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'import':
+            return import_knowledge_base(args.json_path, args.version)
+        return export_knowledge_base(args.json_path)
+    except (OSError, KeyError, ValueError) as e:
+        logger.error(f"Knowledge base {args.command} failed: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
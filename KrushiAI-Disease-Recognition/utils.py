@@ -9,19 +9,38 @@ from PIL import Image, ImageEnhance, ImageFilter
 import cv2
 import json
 import os
+from io import BytesIO
 import logging
+import re
+import threading
 from typing import Tuple, Dict, List, Any
 
+from disease_info import get_diseases_by_plant
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ImageProcessor:
     """Advanced image processing for plant disease detection"""
+
+    # Quality gate settings (measured on a low-resolution copy of the upload)
+    QUALITY_MAX_SIDE = 256
+    MIN_SHARPNESS = 15.0          # Variance of the Laplacian
+    MIN_BRIGHTNESS = 35.0
+    MAX_BRIGHTNESS = 235.0
+    MAX_CLIPPED_FRACTION = 0.85   # Share of pixels that are pure black/white
+    MIN_LEAF_COVERAGE = 0.10      # Share of pixels with plant-like colour
+
+    # Longest side of the preview shown in the browser
+    PREVIEW_MAX_SIDE = 640
     
+    # Longest side of the copy kept for analysis between reruns
+    WORKING_MAX_SIDE = 1024
+
     def __init__(self, target_size=(128, 128)):
         self.target_size = target_size
-        
+
     def preprocess_image(self, image_path: str, enhance: bool = True) -> np.ndarray:
         """
         Advanced image preprocessing with optional enhancement
@@ -34,32 +53,183 @@ class ImageProcessor:
             Preprocessed image array
         """
         try:
-            # Load image
-            image = Image.open(image_path)
+            image = self.load_image(image_path, enhance)
+            return self.to_array(image)
             
-            # Convert to RGB if needed
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
+        except Exception as e:
+            logger.error(f"Error preprocessing image: {str(e)}")
+            raise
+    
+    def load_image(self, image_path: str, enhance: bool = True) -> Image.Image:
+        """
+        Decode an image once so it can be converted at several resolutions
+        
+        Args:
+            image_path: Path to the image file
+            enhance: Whether to apply image enhancement
             
-            # Apply enhancements if requested
-            if enhance:
-                image = self._enhance_image(image)
+        Returns:
+            RGB PIL Image object
+        """
+        # Load image
+        image = Image.open(image_path)
+        return self.prepare_image(image, enhance)
+    
+    def prepare_image(self, image: Image.Image, enhance: bool = True) -> Image.Image:
+        """
+        Convert an already decoded image to RGB and optionally enhance it
+        
+        Args:
+            image: PIL Image object (e.g. a video frame via Image.fromarray)
+            enhance: Whether to apply image enhancement
             
-            # Resize image
-            image = image.resize(self.target_size, Image.LANCZOS)
+        Returns:
+            RGB PIL Image object
+        """
+        # Convert to RGB if needed
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        
+        # Apply enhancements if requested
+        if enhance:
+            image = self._enhance_image(image)
+        
+        return image
+    
+    def to_array(self, image: Image.Image, target_size: Tuple[int, int] = None) -> np.ndarray:
+        """
+        Resize and normalize a decoded image into a model input batch
+        
+        Args:
+            image: RGB PIL Image object
+            target_size: Output size, defaults to the processor's target size
             
-            # Convert to array and normalize
-            image_array = np.array(image, dtype=np.float32)
-            image_array = image_array / 255.0
+        Returns:
+            Array of shape (1, height, width, 3) scaled to [0, 1]
+        """
+        # Resize image
+        image = image.resize(target_size or self.target_size, Image.LANCZOS)
+        
+        # Convert to array and normalize
+        image_array = np.array(image, dtype=np.float32)
+        image_array = image_array / 255.0
+        
+        # Add batch dimension
+        return np.expand_dims(image_array, axis=0)
+    
+    def make_preview(self, image: Image.Image, max_side: int = None, quality: int = 80) -> bytes:
+        """
+        Encode a bounded-size JPEG preview of a decoded image
+        
+        Args:
+            image: Decoded PIL Image object (left unchanged)
+            max_side: Longest side of the preview, defaults to PREVIEW_MAX_SIDE
+            quality: JPEG quality
             
-            # Add batch dimension
-            image_array = np.expand_dims(image_array, axis=0)
+        Returns:
+            JPEG bytes
+        """
+        max_side = max_side or self.PREVIEW_MAX_SIDE
+        preview = image.copy()
+        # reducing_gap lets Pillow shrink with a fast box reduce before the final resample
+        preview.thumbnail((max_side, max_side), Image.LANCZOS, reducing_gap=3.0)
+        if preview.mode != 'RGB':
+            preview = preview.convert('RGB')
+        
+        buffer = BytesIO()
+        preview.save(buffer, format='JPEG', quality=quality, optimize=True)
+        return buffer.getvalue()
+    
+    def make_working_copy(self, image: Image.Image, max_side: int = None) -> Image.Image:
+        """
+        Downscaled RGB copy of a decoded image for analysis
+        
+        Still well above the model input size, and enough for tiled analysis
+        of field photos, while taking a fraction of the memory of a full
+        camera photo.
+        
+        Args:
+            image: Decoded PIL Image object (left unchanged)
+            max_side: Longest side of the copy, defaults to WORKING_MAX_SIDE
             
-            return image_array
+        Returns:
+            RGB PIL Image object
+        """
+        max_side = max_side or self.WORKING_MAX_SIDE
+        working = image.copy() if image.mode == 'RGB' else image.convert('RGB')
+        working.thumbnail((max_side, max_side), Image.LANCZOS, reducing_gap=3.0)
+        return working
+    
+    def build_tta_batch(self, image_array: np.ndarray, crop_fraction: float = 0.85) -> np.ndarray:
+        """
+        Build a test-time augmentation batch from a preprocessed image
+        
+        All views are derived from the already-normalized array (flips,
+        rotations and corner/centre crops resized back), so the original
+        file is not decoded again.
+        
+        Args:
+            image_array: Array of shape (1, height, width, 3) from to_array
+            crop_fraction: Side length of the crops relative to the image
             
-        except Exception as e:
-            logger.error(f"Error preprocessing image: {str(e)}")
-            raise
+        Returns:
+            Array of shape (views, height, width, 3); view 0 is the original
+        """
+        image = image_array[0]
+        height, width = image.shape[:2]
+        views = [
+            image,
+            image[:, ::-1],
+            image[::-1, :],
+            np.rot90(image, 1),
+            np.rot90(image, 2),
+            np.rot90(image, 3)
+        ]
+        
+        crop_h, crop_w = int(height * crop_fraction), int(width * crop_fraction)
+        offsets = [
+            ((height - crop_h) // 2, (width - crop_w) // 2),
+            (0, 0),
+            (0, width - crop_w),
+            (height - crop_h, 0),
+            (height - crop_h, width - crop_w)
+        ]
+        for top, left in offsets:
+            crop = image[top:top + crop_h, left:left + crop_w]
+            views.append(cv2.resize(crop, (width, height), interpolation=cv2.INTER_LINEAR))
+        
+        return np.stack(views).astype(np.float32, copy=False)
+    
+    def tile_origins(self, length: int, tile_size: int, stride: int) -> np.ndarray:
+        """
+        Tile start offsets along one image axis
+        
+        A final tile aligned with the far edge is added when the stride does
+        not land on it, so the right and bottom strips are always covered.
+        """
+        origins = np.arange(0, length - tile_size + 1, stride)
+        if origins[-1] != length - tile_size:
+            origins = np.append(origins, length - tile_size)
+        return origins
+    
+    def tile_views(self, image: np.ndarray, tile_size: int,
+                   stride: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Cut an image into overlapping square tiles without copying pixels
+        
+        Args:
+            image: Decoded image array of shape (height, width, 3)
+            tile_size: Tile side in pixels
+            stride: Step between tile origins in pixels
+            
+        Returns:
+            (windows, row_origins, col_origins): windows[top, left] is a
+            read-only view of the tile whose top-left corner is (top, left);
+            the origins cover the whole image, edges included
+        """
+        windows = np.lib.stride_tricks.sliding_window_view(image, (tile_size, tile_size, 3))[:, :, 0]
+        height, width = image.shape[:2]
+        return windows, self.tile_origins(height, tile_size, stride), self.tile_origins(width, tile_size, stride)
     
     def _enhance_image(self, image: Image.Image) -> Image.Image:
         """
@@ -131,12 +301,106 @@ class ImageProcessor:
             logger.error(f"Error extracting features: {str(e)}")
             return {}
 
+    def assess_quality(self, image_path: str) -> Dict[str, Any]:
+        """
+        Cheap quality and plausibility check to run before model inference
+
+        The image is decoded at reduced resolution (JPEG draft mode) and blur,
+        exposure and leaf coverage are measured in a single pass over the
+        small copy, so rejecting a bad photo costs far less than a CNN call.
+
+        Args:
+            image_path: Path to the image file
+
+        Returns:
+            Dictionary with 'passed', 'issues', 'feedback' and 'metrics'
+        """
+        max_side = self.QUALITY_MAX_SIDE
+        with Image.open(image_path) as image:
+            image.draft('RGB', (max_side, max_side))
+            image = image.convert('RGB')
+            image.thumbnail((max_side, max_side))
+            rgb = np.asarray(image)
+
+        gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+        hsv = cv2.cvtColor(rgb, cv2.COLOR_RGB2HSV)
+        hue, saturation, value = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+
+        sharpness = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+        brightness = float(np.mean(gray))
+        clipped_fraction = float(np.mean((gray < 10) | (gray > 245)))
+        # Green through yellow/brown hues (OpenCV hue range is 0-180),
+        # ignoring grey backgrounds and deep shadows
+        leaf_mask = (hue >= 10) & (hue <= 90) & (saturation >= 40) & (value >= 30)
+        leaf_coverage = float(np.mean(leaf_mask))
+
+        issues = []
+        feedback = []
+        if sharpness < self.MIN_SHARPNESS:
+            issues.append('blurry')
+            feedback.append("The photo looks blurry. Hold the camera steady and tap the leaf to focus before shooting.")
+        if brightness < self.MIN_BRIGHTNESS:
+            issues.append('underexposed')
+            feedback.append("The photo is too dark. Move into daylight or turn towards the light source.")
+        elif brightness > self.MAX_BRIGHTNESS:
+            issues.append('overexposed')
+            feedback.append("The photo is too bright. Avoid direct sunlight on the leaf or use shade.")
+        elif clipped_fraction > self.MAX_CLIPPED_FRACTION:
+            issues.append('clipped')
+            feedback.append("Most of the photo is pure black or white. Adjust the exposure so the leaf is clearly visible.")
+        if leaf_coverage < self.MIN_LEAF_COVERAGE:
+            issues.append('no_leaf')
+            feedback.append("No plant leaf was found. Fill the frame with a single leaf, preferably on a plain background.")
+
+        return {
+            'passed': not issues,
+            'issues': issues,
+            'feedback': feedback,
+            'metrics': {
+                'sharpness': sharpness,
+                'brightness': brightness,
+                'clipped_fraction': clipped_fraction,
+                'leaf_coverage': leaf_coverage
+            }
+        }
+
+def ends_in_softmax(model) -> bool:
+    """Whether a Keras model's last layer already outputs class probabilities"""
+    layer = model.layers[-1]
+    if isinstance(layer, tf.keras.layers.Softmax):
+        return True
+    return getattr(getattr(layer, 'activation', None), '__name__', None) == 'softmax'
+
 class ModelPredictor:
     """Advanced model prediction with confidence analysis"""
     
-    def __init__(self, model_path: str):
+    # Directory holding the optional per-plant specialist heads
+    PLANT_HEADS_DIR = 'plant_heads'
+    
+    # Served probability of the top class below which test-time augmentation
+    # is run (the Low and Very Low levels of _analyze_confidence)
+    TTA_MAX_CONFIDENCE = 0.7
+    
+    def __init__(self, model_path: str, outputs_probabilities: bool = None):
+        """
+        Args:
+            model_path: Path to the trained Keras model
+            outputs_probabilities: Whether the model's outputs are already
+                class probabilities (its last layer applies softmax) rather
+                than logits; detected from the last layer when None
+        """
         self.model_path = model_path
         self.model = None
+        self.outputs_probabilities = outputs_probabilities
+        self.input_size = (128, 128)
+        self._lock = threading.Lock()
+        self.fast_model = None
+        self.fast_input_size = None
+        self.fast_outputs_probabilities = False
+        self.cascade_min_confidence = 1.0
+        self.cascade_max_entropy = 0.0
+        self._feature_extractor = None
+        self._plant_heads = {}
         self.class_names = [
             'Apple___Apple_scab', 'Apple___Black_rot', 'Apple___Cedar_apple_rust', 'Apple___healthy',
             'Blueberry___healthy', 'Cherry_(including_sour)___Powdery_mildew', 
@@ -159,62 +423,486 @@ class ModelPredictor:
         """Load the trained model"""
         try:
             self.model = tf.keras.models.load_model(self.model_path)
+            self.input_size = tuple(self.model.input_shape[1:3])
+            if self.outputs_probabilities is None:
+                self.outputs_probabilities = ends_in_softmax(self.model)
             logger.info("Model loaded successfully")
         except Exception as e:
             logger.error(f"Error loading model: {str(e)}")
             raise
     
-    def predict(self, image_array: np.ndarray) -> Dict[str, Any]:
+    def predict(self, image_array: np.ndarray, plant: str = None) -> Dict[str, Any]:
         """
         Make prediction with confidence analysis
         
         Args:
             image_array: Preprocessed image array
+            plant: Optional plant name; restricts the prediction to that
+                plant's classes (see disease_info.get_diseases_by_plant)
             
         Returns:
             Dictionary containing prediction results
         """
         try:
+            if plant:
+                return self._predict_for_plant(image_array, plant)
+            
             # Make prediction
             predictions = self.model.predict(image_array, verbose=0)
             
             # Get probabilities
-            probabilities = tf.nn.softmax(predictions[0]).numpy()
-            
-            # Get top predictions
-            top_indices = np.argsort(probabilities)[::-1][:5]
-            top_predictions = [
-                {
-                    'class': self.class_names[idx],
-                    'confidence': float(probabilities[idx]),
-                    'percentage': float(probabilities[idx] * 100)
-                }
-                for idx in top_indices
-            ]
-            
-            # Primary prediction
-            primary_idx = np.argmax(probabilities)
-            primary_prediction = {
-                'class': self.class_names[primary_idx],
-                'confidence': float(probabilities[primary_idx]),
-                'percentage': float(probabilities[primary_idx] * 100)
-            }
+            probabilities = self._to_probabilities(predictions[0])
             
-            # Confidence analysis
-            confidence_level = self._analyze_confidence(probabilities[primary_idx])
-            
-            return {
-                'primary_prediction': primary_prediction,
-                'top_predictions': top_predictions,
-                'confidence_level': confidence_level,
-                'all_probabilities': probabilities.tolist(),
-                'prediction_entropy': float(-np.sum(probabilities * np.log(probabilities + 1e-8)))
-            }
+            return self._build_result(probabilities)
             
         except Exception as e:
             logger.error(f"Error making prediction: {str(e)}")
             raise
     
+    def _to_probabilities(self, outputs: np.ndarray, from_logits: bool = None) -> np.ndarray:
+        """
+        Convert raw model outputs to class probabilities
+        
+        Args:
+            outputs: Output row of a model
+            from_logits: Whether outputs are logits that still need a
+                softmax; defaults to the main model's (see outputs_probabilities)
+        """
+        if from_logits is None:
+            from_logits = not self.outputs_probabilities
+        if not from_logits:
+            return np.asarray(outputs, dtype=np.float32)
+        return tf.nn.softmax(outputs).numpy()
+    
+    def _build_result(self, probabilities: np.ndarray) -> Dict[str, Any]:
+        """
+        Build the prediction result dictionary from class probabilities
+        
+        Args:
+            probabilities: Probability for each entry of class_names
+            
+        Returns:
+            Dictionary containing prediction results
+        """
+        # Get top predictions (classes ruled out by a plant filter are skipped)
+        top_indices = [idx for idx in np.argsort(probabilities)[::-1][:5] if probabilities[idx] > 0]
+        top_predictions = [
+            {
+                'class': self.class_names[idx],
+                'confidence': float(probabilities[idx]),
+                'percentage': float(probabilities[idx] * 100)
+            }
+            for idx in top_indices
+        ]
+        
+        # Primary prediction
+        primary_idx = np.argmax(probabilities)
+        primary_prediction = {
+            'class': self.class_names[primary_idx],
+            'confidence': float(probabilities[primary_idx]),
+            'percentage': float(probabilities[primary_idx] * 100)
+        }
+        
+        # Confidence analysis
+        confidence_level = self._analyze_confidence(probabilities[primary_idx])
+        
+        return {
+            'primary_prediction': primary_prediction,
+            'top_predictions': top_predictions,
+            'confidence_level': confidence_level,
+            'all_probabilities': probabilities.tolist(),
+            'prediction_entropy': float(-np.sum(probabilities * np.log(probabilities + 1e-8)))
+        }
+    
+    def get_plant_class_indices(self, plant: str) -> List[int]:
+        """
+        Get the model output indices belonging to a plant
+        
+        Args:
+            plant: Plant name as used in the disease database
+            
+        Returns:
+            Sorted list of indices into class_names
+        """
+        plant_classes = set(get_diseases_by_plant(plant))
+        return [idx for idx, name in enumerate(self.class_names) if name in plant_classes]
+    
+    def _get_feature_extractor(self):
+        """Model that returns the activations feeding the output layer (built on first use)"""
+        with self._lock:
+            if self._feature_extractor is None:
+                self._feature_extractor = tf.keras.Model(
+                    inputs=self.model.inputs,
+                    outputs=self.model.layers[-1].input
+                )
+            return self._feature_extractor
+    
+    @property
+    def feature_dimensions(self) -> int:
+        """Size of the penultimate-layer features used by plant heads and embeddings"""
+        return int(self._get_feature_extractor().output_shape[-1])
+    
+    def embed(self, image_array: np.ndarray) -> np.ndarray:
+        """
+        Compute image embeddings from the penultimate layer
+        
+        For the trained CNN these are the 1500-unit Dense layer activations
+        that feed the 38-way softmax.
+        
+        Args:
+            image_array: Preprocessed image batch
+            
+        Returns:
+            Array of shape (batch, embedding_dimensions)
+        """
+        return self._get_feature_extractor().predict(image_array, verbose=0)
+    
+    def _classify_features(self, features: np.ndarray) -> np.ndarray:
+        """Raw model outputs from penultimate-layer features (the model's last layer only)"""
+        return np.asarray(self.model.layers[-1](features))
+    
+    def _load_plant_head(self, plant: str):
+        """
+        Load the specialist head for a plant on first use
+        
+        Heads are small classifiers trained on the shared backbone features by
+        train_plant_heads.py and stored as <PLANT_HEADS_DIR>/<slug>.keras.
+        A head trained on another model's features (e.g. the teacher's when
+        the distilled student is served) does not fit and is ignored.
+        
+        Returns:
+            Keras model, or None when no usable head has been trained for the plant
+        """
+        slug = plant_slug(plant)
+        feature_dimensions = self.feature_dimensions
+        with self._lock:
+            if slug not in self._plant_heads:
+                head_path = os.path.join(self.PLANT_HEADS_DIR, f"{slug}.keras")
+                head = None
+                if os.path.exists(head_path):
+                    try:
+                        head = tf.keras.models.load_model(head_path)
+                        if head.input_shape[-1] != feature_dimensions:
+                            logger.warning(
+                                f"Ignoring plant head {head_path}: expects {head.input_shape[-1]} features, "
+                                f"the served model has {feature_dimensions}"
+                            )
+                            head = None
+                        else:
+                            logger.info(f"Loaded plant head: {head_path}")
+                    except Exception as e:
+                        logger.error(f"Error loading plant head {head_path}: {str(e)}")
+                self._plant_heads[slug] = head
+            return self._plant_heads[slug]
+    
+    def _predict_for_plant(self, image_array: np.ndarray, plant: str) -> Dict[str, Any]:
+        """
+        Predict among a single plant's classes
+        
+        Uses the plant's specialist head when one is available, otherwise
+        masks the full model output to the plant's classes and renormalizes.
+        Plants with a single class report the full model's probability for it.
+        """
+        probabilities, inference_mode = self._plant_probabilities(image_array, plant)
+        result = self._build_result(probabilities[0])
+        result['plant_filter'] = plant
+        result['inference_mode'] = inference_mode
+        return result
+    
+    def _plant_probabilities(self, image_arrays: np.ndarray, plant: str,
+                             features: np.ndarray = None) -> Tuple[np.ndarray, str]:
+        """
+        Probabilities restricted to a plant's classes for a batch of images
+        
+        Args:
+            image_arrays: Preprocessed image batch
+            plant: Plant name
+            features: Penultimate-layer features of the batch when already
+                computed (see embed); the backbone is then not run again
+        
+        Returns:
+            (array of shape (batch, classes), 'plant_head' or 'masked')
+        """
+        indices = self.get_plant_class_indices(plant)
+        if not indices:
+            raise ValueError(f"No classes found for plant: {plant}")
+        
+        probabilities = np.zeros((len(image_arrays), len(self.class_names)), dtype=np.float32)
+        head = self._load_plant_head(plant) if len(indices) > 1 else None
+        if head is not None:
+            if features is None:
+                features = self.embed(image_arrays)
+            head_logits = not ends_in_softmax(head)
+            for i, output in enumerate(head.predict(features, verbose=0)):
+                probabilities[i, indices] = self._to_probabilities(output, from_logits=head_logits)
+            return probabilities, 'plant_head'
+        
+        if features is not None:
+            outputs = self._classify_features(features)
+        else:
+            outputs = self.model.predict(image_arrays, verbose=0)
+        for i, output in enumerate(outputs):
+            probabilities[i] = self._restrict_to_classes(self._to_probabilities(output), indices)
+        return probabilities, 'masked'
+    
+    def _restrict_to_classes(self, probabilities: np.ndarray, indices: List[int]) -> np.ndarray:
+        """
+        Zero out all classes except indices and renormalize
+        
+        The sum is taken in float64, so tiny but non-zero probabilities are
+        still renormalized exactly; when every selected probability has
+        underflowed to zero the result is uniform over indices.
+        
+        A plant with a single class keeps the unrestricted probability of
+        that class, since renormalizing would always report 100%.
+        """
+        if len(indices) == 1:
+            restricted = np.zeros_like(probabilities)
+            # Kept above zero so the class stays the primary prediction
+            restricted[indices] = max(float(probabilities[indices[0]]), float(np.finfo(np.float32).tiny))
+            return restricted
+        
+        selected = probabilities[indices].astype(np.float64)
+        total = float(np.sum(selected))
+        restricted = np.zeros_like(probabilities)
+        if total > 0 and np.isfinite(total):
+            restricted[indices] = selected / total
+        else:
+            restricted[indices] = 1.0 / len(indices)
+        return restricted
+    
+    def load_cascade_config(self, config_path: str):
+        """
+        Enable the two-stage cascade from a calibration file
+        
+        The file is written by calibrate_cascade.py and holds the fast model
+        path (relative to the file) together with the confidence and entropy
+        thresholds.
+        
+        Args:
+            config_path: Path to the cascade JSON configuration
+        """
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+        
+        fast_model_path = os.path.join(os.path.dirname(os.path.abspath(config_path)), config['fast_model_path'])
+        self.fast_model = tf.keras.models.load_model(fast_model_path)
+        self.fast_input_size = tuple(self.fast_model.input_shape[1:3])
+        self.fast_outputs_probabilities = ends_in_softmax(self.fast_model)
+        self.cascade_min_confidence = float(config['min_confidence'])
+        self.cascade_max_entropy = float(config['max_entropy'])
+        logger.info(
+            f"Cascade enabled: {config['fast_model_path']} at {self.fast_input_size}, "
+            f"confidence >= {self.cascade_min_confidence}, entropy <= {self.cascade_max_entropy}"
+        )
+    
+    def predict_with_tta(self, image_array: np.ndarray, plant: str = None,
+                         base_result: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Predict by averaging probabilities over augmented views of the image
+        
+        The augmented views are scored in a single batched forward pass,
+        through the plant's specialist head when one is used for the plant.
+        This costs about one extra batch of ten images, so it is only run
+        when requested.
+        
+        Args:
+            image_array: Preprocessed image array of shape (1, height, width, 3)
+            plant: Optional plant name to restrict the prediction to
+            base_result: Prediction already made for the original image
+                (see predict); reused as the first view instead of scoring
+                the image again
+            
+        Returns:
+            Prediction dictionary with an extra 'tta' summary
+        """
+        if base_result is None:
+            base_result = self.predict(image_array, plant=plant)
+        
+        # View 0 of the batch is the original image, which base_result already covers
+        batch = ImageProcessor(target_size=self.input_size).build_tta_batch(image_array)[1:]
+        if plant:
+            view_probabilities, inference_mode = self._plant_probabilities(batch, plant)
+        else:
+            outputs = self.model.predict(batch, verbose=0)
+            view_probabilities = np.stack([self._to_probabilities(row) for row in outputs])
+        original = np.asarray(base_result['all_probabilities'], dtype=np.float32)
+        view_probabilities = np.concatenate([original[np.newaxis], view_probabilities])
+        
+        probabilities = view_probabilities.mean(axis=0)
+        result = self._build_result(probabilities)
+        if plant:
+            result['plant_filter'] = plant
+            result['inference_mode'] = inference_mode
+        result['tta'] = {
+            'views': len(view_probabilities),
+            'agreement': float(np.mean(np.argmax(view_probabilities, axis=1) == np.argmax(probabilities)))
+        }
+        return result
+    
+    def predict_tiled(self, image: Image.Image, tile_size: int = None, overlap: float = 0.25,
+                      batch_size: int = 32, min_confidence: float = 0.5, plant: str = None) -> Dict[str, Any]:
+        """
+        Analyze a large multi-leaf photo tile by tile
+        
+        Tiles are views over the decoded pixel buffer; only one batch of
+        resized tiles is materialized at a time, which bounds memory.
+        
+        Args:
+            image: RGB PIL Image (see ImageProcessor.load_image)
+            tile_size: Tile side in pixels, defaults to the model input size
+            overlap: Fraction of overlap between neighbouring tiles
+            batch_size: Tiles per forward pass
+            min_confidence: Tiles whose top class probability, as served by
+                predict, is below this are left out of the summary
+            plant: Optional plant name to restrict the prediction to
+            
+        Returns:
+            Dictionary with per-tile class/confidence maps and a summary
+        """
+        pixels = np.asarray(image)
+        height, width = pixels.shape[:2]
+        tile_size = min(tile_size or self.input_size[0], height, width)
+        stride = max(1, int(tile_size * (1 - overlap)))
+        
+        processor = ImageProcessor(target_size=self.input_size)
+        windows, row_origins, col_origins = processor.tile_views(pixels, tile_size, stride)
+        rows, cols = len(row_origins), len(col_origins)
+        total_tiles = rows * cols
+        indices = self.get_plant_class_indices(plant) if plant else None
+        
+        buffer = np.empty((batch_size, self.input_size[0], self.input_size[1], 3), dtype=np.float32)
+        tile_probabilities = np.empty((total_tiles, len(self.class_names)), dtype=np.float32)
+        for start in range(0, total_tiles, batch_size):
+            count = min(batch_size, total_tiles - start)
+            for i in range(count):
+                # Index the view by tile origin; fancy indexing would copy every tile
+                row, col = divmod(start + i, cols)
+                tile = windows[row_origins[row], col_origins[col]]
+                buffer[i] = cv2.resize(tile, self.input_size[::-1], interpolation=cv2.INTER_AREA)
+            buffer[:count] /= 255.0
+            outputs = self.model.predict(buffer[:count], verbose=0)
+            for i, output in enumerate(outputs):
+                probabilities = self._to_probabilities(output)
+                if indices:
+                    probabilities = self._restrict_to_classes(probabilities, indices)
+                tile_probabilities[start + i] = probabilities
+        
+        class_map = np.argmax(tile_probabilities, axis=1)
+        confidence_map = tile_probabilities.max(axis=1)
+        confident = confidence_map >= min_confidence
+        
+        summary = []
+        for class_idx in np.unique(class_map[confident]):
+            members = confident & (class_map == class_idx)
+            summary.append({
+                'class': self.class_names[class_idx],
+                'tiles': int(np.sum(members)),
+                'share': float(np.sum(members) / max(np.sum(confident), 1)),
+                'mean_confidence': float(np.mean(confidence_map[members]))
+            })
+        summary.sort(key=lambda item: item['tiles'], reverse=True)
+        diseased = sum(item['tiles'] for item in summary if not item['class'].endswith('healthy'))
+        
+        return {
+            'grid_shape': (rows, cols),
+            'tile_size': tile_size,
+            'stride': stride,
+            'class_map': class_map.reshape(rows, cols).tolist(),
+            'confidence_map': confidence_map.reshape(rows, cols).tolist(),
+            'summary': summary,
+            'total_tiles': int(total_tiles),
+            'confident_tiles': int(np.sum(confident)),
+            'min_confidence': min_confidence,
+            'diseased_share': float(diseased / max(np.sum(confident), 1))
+        }
+    
+    def predict_image(self, image: Image.Image, plant: str = None, tta: bool = False) -> Dict[str, Any]:
+        """
+        Predict from a decoded image, using the cascade when it is enabled
+        
+        The fast low-resolution model answers first; the image is escalated
+        to the full model only when the fast answer's confidence is below
+        cascade_min_confidence or its entropy is above cascade_max_entropy.
+        
+        Args:
+            image: RGB PIL Image (see ImageProcessor.load_image)
+            plant: Optional plant name to restrict the prediction to
+            tta: Re-score results whose confidence is below
+                TTA_MAX_CONFIDENCE with test-time augmentation (see
+                predict_with_tta)
+            
+        Returns:
+            Prediction dictionary; 'cascade_stage' records which model answered
+        """
+        return self.predict_images([image], plant=plant, tta=tta)[0]
+    
+    def predict_images(self, images: List[Image.Image], plant: str = None, tta: bool = False,
+                       with_embeddings: bool = False) -> List[Dict[str, Any]]:
+        """
+        Predict several decoded images, batching every stage of the cascade
+        
+        All images go through the fast model in one forward pass; the ones
+        it cannot answer confidently are scored together by predict_batch,
+        so the full model runs once per call instead of once per image.
+        
+        Args:
+            images: RGB PIL Images (see ImageProcessor.load_image)
+            plant: Optional plant name to restrict the predictions to
+            tta: Re-score results whose confidence is below
+                TTA_MAX_CONFIDENCE with test-time augmentation
+            with_embeddings: Add each image's penultimate-layer 'embedding'
+                (see embed); images scored by the full model reuse its
+                forward pass, only fast-stage answers need a backbone pass
+            
+        Returns:
+            List of prediction dictionaries, one per image (see predict_image)
+        """
+        processor = ImageProcessor(target_size=self.input_size)
+        results = [None] * len(images)
+        pending = list(range(len(images)))
+        
+        if self.fast_model is not None and pending:
+            indices = None
+            if plant:
+                indices = self.get_plant_class_indices(plant)
+                if not indices:
+                    raise ValueError(f"No classes found for plant: {plant}")
+            fast_arrays = np.concatenate([processor.to_array(image, self.fast_input_size) for image in images])
+            for i, output in enumerate(self.fast_model.predict(fast_arrays, verbose=0)):
+                probabilities = self._to_probabilities(output, from_logits=not self.fast_outputs_probabilities)
+                if indices:
+                    probabilities = self._restrict_to_classes(probabilities, indices)
+                result = self._build_result(probabilities)
+                
+                if (result['primary_prediction']['confidence'] >= self.cascade_min_confidence
+                        and result['prediction_entropy'] <= self.cascade_max_entropy):
+                    if plant:
+                        result['plant_filter'] = plant
+                        result['inference_mode'] = 'masked'
+                    result['cascade_stage'] = 'fast'
+                    results[i] = result
+            answered = [i for i in pending if results[i] is not None]
+            pending = [i for i in pending if results[i] is None]
+            if with_embeddings and answered:
+                embeddings = self.embed(np.concatenate([processor.to_array(images[i]) for i in answered]))
+                for i, embedding in zip(answered, embeddings):
+                    results[i]['embedding'] = embedding
+        
+        if pending:
+            image_arrays = np.concatenate([processor.to_array(images[i]) for i in pending])
+            batch_results = self.predict_batch(image_arrays, plant=plant, with_embeddings=with_embeddings)
+            for position, result in enumerate(batch_results):
+                if tta and result['primary_prediction']['confidence'] < self.TTA_MAX_CONFIDENCE:
+                    embedding = result.get('embedding')
+                    result = self.predict_with_tta(image_arrays[position:position + 1], plant=plant,
+                                                   base_result=result)
+                    if embedding is not None:
+                        result['embedding'] = embedding
+                result['cascade_stage'] = 'full'
+                results[pending[position]] = result
+        return results
+    
     def _analyze_confidence(self, confidence: float) -> str:
         """
         Analyze confidence level and return descriptive text
@@ -236,6 +924,41 @@ class ModelPredictor:
         else:
             return "Very Low"
     
+    def predict_batch(self, image_arrays: np.ndarray, plant: str = None,
+                      with_embeddings: bool = False) -> List[Dict[str, Any]]:
+        """
+        Predict a stack of preprocessed images in a single forward pass
+        
+        Args:
+            image_arrays: Array of shape (batch, height, width, 3)
+            plant: Optional plant name to restrict the predictions to
+            with_embeddings: Add each image's penultimate-layer 'embedding';
+                the predictions are then computed from those features, so
+                the backbone still runs once
+            
+        Returns:
+            List of prediction dictionaries, one per image
+        """
+        features = self.embed(image_arrays) if with_embeddings else None
+        if plant:
+            # The plant's specialist head is used when one is available, as in predict
+            probabilities, inference_mode = self._plant_probabilities(image_arrays, plant, features=features)
+        elif features is not None:
+            probabilities = [self._to_probabilities(row) for row in self._classify_features(features)]
+        else:
+            probabilities = [self._to_probabilities(row) for row in self.model.predict(image_arrays, verbose=0)]
+        
+        results = []
+        for i, row in enumerate(probabilities):
+            result = self._build_result(row)
+            if plant:
+                result['plant_filter'] = plant
+                result['inference_mode'] = inference_mode
+            if features is not None:
+                result['embedding'] = features[i]
+            results.append(result)
+        return results
+    
     def batch_predict(self, image_paths: List[str]) -> List[Dict[str, Any]]:
         """
         Make predictions on multiple images
@@ -247,7 +970,7 @@ class ModelPredictor:
             List of prediction dictionaries
         """
         results = []
-        processor = ImageProcessor()
+        processor = ImageProcessor(target_size=self.input_size)
         
         for image_path in image_paths:
             try:
@@ -391,6 +1114,18 @@ def format_disease_name(disease_key: str) -> str:
     
     return ' '.join(formatted_words)
 
+def plant_slug(plant: str) -> str:
+    """
+    Turn a plant name into a file-system friendly identifier
+    
+    Args:
+        plant: Plant name, e.g. "Corn/Maize"
+        
+    Returns:
+        Slug, e.g. "corn_maize"
+    """
+    return re.sub(r'[^a-z0-9]+', '_', plant.lower()).strip('_')
+
 def get_severity_color(severity: str) -> str:
     """
     Get color code for disease severity
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Video Scanning for Crop-Row Footage
+Reads a walking video, samples frames adaptively, drops near-identical
+consecutive frames with a cheap difference check and runs the remaining
+frames through batched ModelPredictor inference to build a timeline of
+detections.
+
+Decoding runs in a background thread that feeds a bounded queue of small
+preprocessed frames, so memory stays flat regardless of video length.
+
+Usage:
+    python video_scanner.py row_walk.mp4 --output timeline.json
+"""
+
+import argparse
+import json
+import logging
+import queue
+import sys
+import threading
+from typing import Any, Callable, Dict, List
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from utils import ImageProcessor, ModelPredictor, format_disease_name
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class VideoScanner:
+    """Adaptive frame sampling and batched disease detection for videos"""
+
+    # Size of the grayscale thumbnail used for the frame difference check
+    DIFF_SIZE = (64, 36)
+
+    def __init__(self, predictor: ModelPredictor, sample_interval: float = 0.5,
+                 min_interval: float = 0.2, max_interval: float = 2.0,
+                 diff_threshold: float = 6.0, batch_size: int = 16,
+                 queue_size: int = 64, min_confidence: float = 0.6):
+        """
+        Args:
+            predictor: Loaded ModelPredictor
+            sample_interval: Starting time between sampled frames (seconds)
+            min_interval: Shortest sampling interval while the scene changes
+            max_interval: Longest sampling interval while the scene is static
+            diff_threshold: Mean absolute grayscale difference below which a
+                sampled frame counts as a near-duplicate of the last kept one
+            batch_size: Frames per forward pass
+            queue_size: Preprocessed frames buffered between decoder and model
+            min_confidence: Detections whose probability, as served by
+                ModelPredictor.predict_batch, is below this are not merged
+                into timeline segments
+        """
+        self.predictor = predictor
+        self.processor = ImageProcessor(target_size=predictor.input_size)
+        self.sample_interval = sample_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.diff_threshold = diff_threshold
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.min_confidence = min_confidence
+
+    def _preprocess_frame(self, frame_bgr: np.ndarray) -> np.ndarray:
+        """Shrink a decoded frame and apply the serving preprocessing"""
+        height, width = self.predictor.input_size
+        # Downscale before enhancement so full-HD frames stay cheap
+        small = cv2.resize(frame_bgr, (width * 2, height * 2), interpolation=cv2.INTER_AREA)
+        image = self.processor.prepare_image(Image.fromarray(cv2.cvtColor(small, cv2.COLOR_BGR2RGB)))
+        return self.processor.to_array(image)[0]
+
+    def _decode(self, video_path: str, frames: queue.Queue, stats: Dict[str, Any], stop: threading.Event):
+        """Background thread: sample, de-duplicate and preprocess frames"""
+        try:
+            capture = cv2.VideoCapture(video_path)
+            if not capture.isOpened():
+                raise IOError(f"Could not open video: {video_path}")
+            fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+            stats['fps'] = fps
+            stats['frames_total'] = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+
+            interval = self.sample_interval
+            next_sample = 0.0
+            last_kept = None
+            frame_index = -1
+            while not stop.is_set():
+                # grab() advances without decoding; only sampled frames are retrieved
+                if not capture.grab():
+                    break
+                frame_index += 1
+                timestamp = frame_index / fps
+                if timestamp < next_sample:
+                    continue
+
+                ok, frame = capture.retrieve()
+                if not ok:
+                    break
+                stats['frames_sampled'] += 1
+
+                thumbnail = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), self.DIFF_SIZE,
+                                       interpolation=cv2.INTER_AREA).astype(np.int16)
+                if last_kept is not None and np.mean(np.abs(thumbnail - last_kept)) < self.diff_threshold:
+                    # Static scene: back off
+                    interval = min(interval * 1.5, self.max_interval)
+                    next_sample = timestamp + interval
+                    continue
+
+                # Scene changed: sample more densely
+                interval = max(interval / 1.5, self.min_interval)
+                next_sample = timestamp + interval
+                last_kept = thumbnail
+                frames.put((frame_index, timestamp, self._preprocess_frame(frame)))
+            capture.release()
+        except Exception as e:
+            stats['error'] = e
+        finally:
+            frames.put(None)
+
+    def _flush(self, batch: List, plant: str) -> List[Dict[str, Any]]:
+        """Run one batch of frames through the model"""
+        results = self.predictor.predict_batch(np.stack([item[2] for item in batch]), plant=plant)
+        return [
+            {
+                'frame': frame_index,
+                'time': round(timestamp, 2),
+                'class': result['primary_prediction']['class'],
+                'confidence': result['primary_prediction']['confidence']
+            }
+            for (frame_index, timestamp, _), result in zip(batch, results)
+        ]
+
+    def scan(self, video_path: str, plant: str = None,
+             progress_callback: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+        """
+        Scan a video file and build a detection timeline
+
+        Args:
+            video_path: Path to the video file
+            plant: Optional plant name to restrict predictions to
+            progress_callback: Called with the latest detections after each batch
+
+        Returns:
+            Dictionary with frame statistics, per-frame timeline and merged segments
+        """
+        frames = queue.Queue(maxsize=self.queue_size)
+        stats = {'fps': None, 'frames_total': 0, 'frames_sampled': 0, 'error': None}
+        stop = threading.Event()
+        decoder = threading.Thread(target=self._decode, args=(video_path, frames, stats, stop), daemon=True)
+        decoder.start()
+
+        timeline = []
+        batch = []
+        try:
+            while True:
+                item = frames.get()
+                if item is not None:
+                    batch.append(item)
+                if batch and (item is None or len(batch) >= self.batch_size):
+                    detections = self._flush(batch, plant)
+                    timeline.extend(detections)
+                    batch = []
+                    if progress_callback:
+                        progress_callback({'detections': detections, 'analyzed': len(timeline), **stats})
+                if item is None:
+                    break
+        finally:
+            stop.set()
+            # Unblock the decoder if it is waiting on a full queue
+            while decoder.is_alive():
+                try:
+                    frames.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+        if stats['error'] is not None:
+            raise stats['error']
+
+        return {
+            'video': video_path,
+            'fps': stats['fps'],
+            'frames_total': stats['frames_total'],
+            'frames_sampled': stats['frames_sampled'],
+            'frames_analyzed': len(timeline),
+            'timeline': timeline,
+            'segments': self.build_segments(timeline)
+        }
+
+    def build_segments(self, timeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge consecutive confident detections of the same class"""
+        segments = []
+        for detection in timeline:
+            if detection['confidence'] < self.min_confidence:
+                continue
+            last = segments[-1] if segments else None
+            if last and last['class'] == detection['class']:
+                last['end'] = detection['time']
+                last['frames'] += 1
+                last['confidence_sum'] += detection['confidence']
+            else:
+                segments.append({
+                    'class': detection['class'],
+                    'start': detection['time'],
+                    'end': detection['time'],
+                    'frames': 1,
+                    'confidence_sum': detection['confidence']
+                })
+        for segment in segments:
+            segment['mean_confidence'] = segment.pop('confidence_sum') / segment['frames']
+        return segments
+
+def main():
+    """Scan a video from the command line"""
+    parser = argparse.ArgumentParser(description="Scan crop-row video for plant diseases")
+    parser.add_argument('video', help="Video file to scan")
+    parser.add_argument('--model', default='trained_plant_disease_model.keras')
+    parser.add_argument('--plant', help="Restrict detection to this plant's diseases")
+    parser.add_argument('--interval', type=float, default=0.5, help="Starting sampling interval in seconds")
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--min-confidence', type=float, default=0.6,
+                        help="Lowest detection probability merged into segments")
+    parser.add_argument('--output', help="Write the timeline as JSON to this file")
+    args = parser.parse_args()
+
+    scanner = VideoScanner(ModelPredictor(args.model), sample_interval=args.interval, batch_size=args.batch_size,
+                           min_confidence=args.min_confidence)
+
+    def report(progress):
+        logger.info(f"Analyzed {progress['analyzed']} frames ({progress['frames_sampled']} sampled)")
+
+    result = scanner.scan(args.video, plant=args.plant, progress_callback=report)
+
+    for segment in result['segments']:
+        logger.info(f"{segment['start']:8.1f}s - {segment['end']:8.1f}s  {format_disease_name(segment['class'])} "
+                    f"({segment['frames']} frames, {segment['mean_confidence']:.0%})")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        logger.info(f"✓ Timeline saved to {args.output}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
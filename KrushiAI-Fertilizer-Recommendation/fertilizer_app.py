@@ -75,7 +75,7 @@ st.markdown("""
     }
     
     /* Button styling */
-    .stButton > button {
+    .stButton > button, .stFormSubmitButton > button {
         background: linear-gradient(45deg, #4CAF50 0%, #45a049 100%);
         color: white;
         border: none;
@@ -87,7 +87,7 @@ st.markdown("""
         box-shadow: 0 4px 15px rgba(76, 175, 80, 0.3);
     }
     
-    .stButton > button:hover {
+    .stButton > button:hover, .stFormSubmitButton > button:hover {
         background: linear-gradient(45deg, #45a049 0%, #4CAF50 100%);
         transform: translateY(-2px);
         box-shadow: 0 6px 20px rgba(76, 175, 80, 0.4);
@@ -143,7 +143,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Helper functions
-@st.cache_data
+@st.cache_resource
 def load_model_components():
     """Load all model components with error handling"""
     try:
@@ -262,71 +262,72 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Sidebar for inputs
+# Sidebar for inputs; a form so editing a value does not rerun the app until submitted
 with st.sidebar:
-    st.markdown("### 🌱 Agricultural Input Parameters")
-    
-    # Environmental factors
-    st.markdown("#### 🌤️ Environmental Conditions")
-    temp = st.number_input(
-        "🌡️ Temperature (°C)", 
-        min_value=0.0, max_value=60.0, value=26.0, step=0.5,
-        help="Average temperature during crop growth period"
-    )
-    
-    humidity = st.number_input(
-        "💧 Humidity (%)", 
-        min_value=0.0, max_value=100.0, value=52.0, step=1.0,
-        help="Relative humidity percentage"
-    )
-    
-    moisture = st.number_input(
-        "🌿 Soil Moisture (%)", 
-        min_value=0.0, max_value=100.0, value=38.0, step=1.0,
-        help="Soil moisture content percentage"
-    )
-    
-    # Soil and crop selection
-    st.markdown("#### 🌱 Crop & Soil Information")
-    soil = st.selectbox(
-        "🟤 Soil Type", 
-        options=soil_encoder.classes_,
-        help="Select the predominant soil type in your field"
-    )
-    
-    crop = st.selectbox(
-        "🌾 Crop Type", 
-        options=crop_encoder.classes_,
-        help="Select the crop you want to grow"
-    )
-    
-    # Nutrient levels
-    st.markdown("#### 🧪 Soil Nutrient Levels (mg/kg)")
-    nitrogen = st.number_input(
-        "🔵 Nitrogen (N)", 
-        min_value=0.0, max_value=300.0, value=37.0, step=1.0,
-        help="Available nitrogen content in soil"
-    )
-    
-    potassium = st.number_input(
-        "🟡 Potassium (K)", 
-        min_value=0.0, max_value=300.0, value=0.0, step=1.0,
-        help="Available potassium content in soil"
-    )
-    
-    phosphorous = st.number_input(
-        "🔴 Phosphorous (P)", 
-        min_value=0.0, max_value=300.0, value=0.0, step=1.0,
-        help="Available phosphorous content in soil"
-    )
-    
-    st.markdown("---")
-    
-    # Predict button
-    predict_button = st.button(
-        "🔮 Get Fertilizer Recommendation", 
-        help="Click to get AI-powered fertilizer recommendation"
-    )
+    with st.form("fertilizer_inputs"):
+        st.markdown("### 🌱 Agricultural Input Parameters")
+        
+        # Environmental factors
+        st.markdown("#### 🌤️ Environmental Conditions")
+        temp = st.number_input(
+            "🌡️ Temperature (°C)", 
+            min_value=0.0, max_value=60.0, value=26.0, step=0.5,
+            help="Average temperature during crop growth period"
+        )
+        
+        humidity = st.number_input(
+            "💧 Humidity (%)", 
+            min_value=0.0, max_value=100.0, value=52.0, step=1.0,
+            help="Relative humidity percentage"
+        )
+        
+        moisture = st.number_input(
+            "🌿 Soil Moisture (%)", 
+            min_value=0.0, max_value=100.0, value=38.0, step=1.0,
+            help="Soil moisture content percentage"
+        )
+        
+        # Soil and crop selection
+        st.markdown("#### 🌱 Crop & Soil Information")
+        soil = st.selectbox(
+            "🟤 Soil Type", 
+            options=soil_encoder.classes_,
+            help="Select the predominant soil type in your field"
+        )
+        
+        crop = st.selectbox(
+            "🌾 Crop Type", 
+            options=crop_encoder.classes_,
+            help="Select the crop you want to grow"
+        )
+        
+        # Nutrient levels
+        st.markdown("#### 🧪 Soil Nutrient Levels (mg/kg)")
+        nitrogen = st.number_input(
+            "🔵 Nitrogen (N)", 
+            min_value=0.0, max_value=300.0, value=37.0, step=1.0,
+            help="Available nitrogen content in soil"
+        )
+        
+        potassium = st.number_input(
+            "🟡 Potassium (K)", 
+            min_value=0.0, max_value=300.0, value=0.0, step=1.0,
+            help="Available potassium content in soil"
+        )
+        
+        phosphorous = st.number_input(
+            "🔴 Phosphorous (P)", 
+            min_value=0.0, max_value=300.0, value=0.0, step=1.0,
+            help="Available phosphorous content in soil"
+        )
+        
+        st.markdown("---")
+        
+        # Predict button
+        predict_button = st.form_submit_button(
+            "🔮 Get Fertilizer Recommendation", 
+            help="Click to get AI-powered fertilizer recommendation"
+        )
 
 # Main content area
 col1, col2 = st.columns([2, 1])
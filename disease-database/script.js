@@ -0,0 +1,93 @@
+// Client-side search and filtering for the pre-rendered disease database.
+// search-index.json is produced by build_static_kb.py alongside index.html.
+
+document.addEventListener("DOMContentLoaded", function () {
+  const menuBtn = document.querySelector('#menu-btn');
+  const navbar = document.querySelector('.navbar');
+
+  if (menuBtn) {
+    menuBtn.addEventListener('click', () => {
+      navbar.classList.toggle('active');
+      menuBtn.classList.toggle('fa-times');
+    });
+  }
+
+  const cards = Array.from(document.querySelectorAll('.disease-card'));
+  const plantFilter = document.querySelector('#plant-filter');
+  const severityFilter = document.querySelector('#severity-filter');
+  const searchBox = document.querySelector('#search-box');
+  const resultCount = document.querySelector('#result-count');
+  const stopWords = new Set(['a', 'an', 'and', 'are', 'as', 'at', 'by', 'for', 'from', 'in', 'is', 'it',
+                             'of', 'on', 'or', 'the', 'to', 'with']);
+
+  let terms = null;
+  let termKeys = [];
+
+  fetch('search-index.json')
+    .then(response => response.json())
+    .then(index => {
+      terms = index.terms;
+      termKeys = Object.keys(terms);
+      applyFilters();
+    })
+    .catch(() => {
+      // Without the index, fall back to matching the card text
+      terms = null;
+    });
+
+  // Entry positions containing a word that starts with the query token
+  function matchToken(token) {
+    const matches = new Set();
+    termKeys.forEach(key => {
+      if (key.startsWith(token)) {
+        terms[key].forEach(position => matches.add(position));
+      }
+    });
+    return matches;
+  }
+
+  function searchPositions(query) {
+    const tokens = (query.toLowerCase().match(/[a-z0-9]+/g) || []).filter(token => !stopWords.has(token));
+    if (tokens.length === 0) {
+      return null;
+    }
+    if (terms === null) {
+      return new Set(cards
+        .filter(card => tokens.every(token => card.textContent.toLowerCase().includes(token)))
+        .map(card => Number(card.dataset.index)));
+    }
+
+    // Every query word has to match
+    let result = matchToken(tokens[0]);
+    tokens.slice(1).forEach(token => {
+      const matches = matchToken(token);
+      result = new Set([...result].filter(position => matches.has(position)));
+    });
+    return result;
+  }
+
+  function applyFilters() {
+    const plant = plantFilter.value;
+    const severity = severityFilter.value;
+    const positions = searchPositions(searchBox.value);
+    let visible = 0;
+
+    cards.forEach(card => {
+      const show = (plant === 'All' || card.dataset.plant === plant) &&
+                   (severity === 'All' || card.dataset.severity === severity) &&
+                   (positions === null || positions.has(Number(card.dataset.index)));
+      card.classList.toggle('hidden', !show);
+      if (show) {
+        visible += 1;
+      }
+    });
+
+    resultCount.textContent = visible > 0
+      ? `Found ${visible} diseases`
+      : 'No diseases found matching your search criteria.';
+  }
+
+  plantFilter.addEventListener('change', applyFilters);
+  severityFilter.addEventListener('change', applyFilters);
+  searchBox.addEventListener('input', applyFilters);
+});